@@ -13,7 +13,8 @@ import sqlite3
 import traceback
 from datetime import datetime, timezone
 from collections import defaultdict
-from functools import wraps
+from dataclasses import dataclass
+from functools import lru_cache, wraps
 from typing import Dict, List, Optional, Tuple
 from urllib.parse import quote
 
@@ -62,7 +63,7 @@ from models import (
     save_feedback, save_inline_feedback, has_inline_feedback,
     get_feedback_digest,
     get_city_snapshots, get_city_stats, get_cities_with_snapshots,
-    get_city_name_by_slug,
+    get_city_name_by_slug, with_db_session,
 )
 
 load_dotenv()
@@ -2860,12 +2861,36 @@ _DIM_PLACE_KEYS = {
 }
 
 
+# (tier2 dimension name, insight label, neighborhood_places key), in display order
+_NEIGHBORHOOD_DIMS = tuple(
+    (dim_name, label, _DIM_PLACE_KEYS[dim_name])
+    for dim_name, label in _DIM_LABELS.items()
+)
+
+
+@dataclass(frozen=True, slots=True)
+class _NeighborhoodDim:
+    """One scored neighbourhood dimension, as seen by the insight templates."""
+    name: str
+    label: str
+    score: int
+    has_places: bool
+    first_place_name: Optional[str]
+
+
+def _dim_score(dim):
+    """Sort key for _insight_neighborhood dimension entries."""
+    return dim.score
+
+
 def _nearest_walk_time(places):
     """Return the minimum walk_time_min from a list of place dicts, or None."""
     if not places:
         return None
-    times = [p.get("walk_time_min") for p in places if p.get("walk_time_min") is not None]
-    return min(times) if times else None
+    return min(
+        (t for t in (p.get("walk_time_min") for p in places) if t is not None),
+        default=None,
+    )
 
 
 def _join_labels(labels, conjunction="and"):
@@ -2890,72 +2915,84 @@ def _insight_neighborhood(neighborhood, tier2):
     if not neighborhood or not tier2:
         return {"text": None, "car_dependent": False}
 
-    # Build per-dimension info: {dim_name: {score, label, place_key, places}}
-    dims = []
-    for dim_name, label in _DIM_LABELS.items():
+    # The prose only depends on each dimension's score, whether it has any
+    # places, and the first place's name — freeze those into a hashable
+    # signature so identical inputs hit the cache.
+    signature = []
+    for dim_name, _label, place_key in _NEIGHBORHOOD_DIMS:
         score_entry = tier2.get(dim_name, {})
         score = score_entry.get("points", 0) if isinstance(score_entry, dict) else 0
-        place_key = _DIM_PLACE_KEYS[dim_name]
         places = neighborhood.get(place_key, [])
-        dims.append({
-            "name": dim_name,
-            "label": label,
-            "score": score,
-            "places": places,
-            "place_key": place_key,
-        })
+        first_name = places[0].get("name") if places else None
+        signature.append((score, bool(places), first_name))
+
+    text, car_dependent = _insight_neighborhood_cached(tuple(signature))
+    return {"text": text, "car_dependent": car_dependent}
+
+
+@lru_cache(maxsize=256)
+def _insight_neighborhood_cached(signature):
+    """Select the neighborhood prose for a frozen per-dimension signature.
+
+    signature: one (score, has_places, first_place_name) tuple per entry
+    in _NEIGHBORHOOD_DIMS.  Returns (text, car_dependent).
+    """
+    dims = [
+        _NeighborhoodDim(dim_name, label, score, has_places, first_name)
+        for (dim_name, label, _place_key), (score, has_places, first_name) in zip(
+            _NEIGHBORHOOD_DIMS, signature,
+        )
+    ]
 
     if not dims:
-        return {"text": None, "car_dependent": False}
+        return None, False
 
     # Classify
-    strong = [d for d in dims if d["score"] >= 7]
-    middling = [d for d in dims if 4 <= d["score"] < 7]
-    weak = [d for d in dims if d["score"] < 4]
+    strong = [d for d in dims if d.score >= 7]
+    middling = [d for d in dims if 4 <= d.score < 7]
+    weak = [d for d in dims if d.score < 4]
 
     # Sort each bucket by score descending
-    strong.sort(key=lambda d: d["score"], reverse=True)
-    middling.sort(key=lambda d: d["score"], reverse=True)
-    weak.sort(key=lambda d: d["score"], reverse=True)
+    strong.sort(key=_dim_score, reverse=True)
+    middling.sort(key=_dim_score, reverse=True)
+    weak.sort(key=_dim_score, reverse=True)
 
     # Get the lead place name from the highest-scoring dimension
-    all_sorted = sorted(dims, key=lambda d: d["score"], reverse=True)
-    lead = all_sorted[0]
-    lead_place_name = None
-    if lead["places"]:
-        lead_place_name = lead["places"][0].get("name")
+    # (max() keeps the first of equal scores, matching a stable sort)
+    lead = max(dims, key=_dim_score)
+    lead_place_name = lead.first_place_name if lead.has_places else None
 
     # Branch: all strong (4 dims >= 7)
     if len(strong) == 4:
-        lead_label = lead["label"]
-        others = [d["label"] for d in strong if d["name"] != lead["name"]]
+        lead_label = lead.label
+        others = [d.label for d in strong if d.name != lead.name]
         parts = []
         if lead_place_name:
             parts.append(f"{lead_place_name} is just a short walk away")
         else:
             parts.append(f"This area excels at {lead_label}")
         parts.append(f" \u2014 and {_join_labels(others)} are all within easy reach too.")
-        return {"text": "".join(parts), "car_dependent": False}
+        return "".join(parts), False
 
     # Branch: all weak (all < 4) — car-dependent location
     if len(weak) == 4:
         # Check if any places exist at all
-        any_places = any(d["places"] for d in weak)
+        any_places = any(d.has_places for d in weak)
         if not any_places:
-            return {"text": "We didn't find everyday amenities like grocery stores, coffee shops, or gyms nearby. You'll likely need a car for most errands.", "car_dependent": True}
+            return "We didn't find everyday amenities like grocery stores, coffee shops, or gyms nearby. You'll likely need a car for most errands.", True
         # Places exist but are far
-        return {"text": "Grocery stores, coffee shops, and other everyday spots exist in the area but are a significant drive away. Plan on needing a car for most errands.", "car_dependent": True}
+        return "Grocery stores, coffee shops, and other everyday spots exist in the area but are a significant drive away. Plan on needing a car for most errands.", True
 
     # Branch: all middling (all 4-6)
     if len(middling) == 4:
-        labels = [d["label"] for d in middling]
+        labels = [d.label for d in middling]
         lead_name = lead_place_name or "Everyday amenities"
-        return {"text": f"{lead_name} and other essentials are all within reach \u2014 {_join_labels(labels)} are accessible, though none are exceptional.", "car_dependent": False}
+        return f"{lead_name} and other essentials are all within reach \u2014 {_join_labels(labels)} are accessible, though none are exceptional.", False
 
     # Branch: mixed — has both strong and weak
     if strong and weak:
         # Lead from strongest
-        lead_label = lead["label"]
+        lead_label = lead.label
         lead_sentence = ""
         if lead_place_name:
             lead_sentence = f"{lead_place_name} ({lead_label}) is a standout nearby."
@@ -2963,12 +3000,12 @@ def _insight_neighborhood(neighborhood, tier2):
             lead_sentence = f"This area scores well for {lead_label}."
 
         # Others (strong + middling, excluding lead)
-        other_strong = [d for d in strong if d["name"] != lead["name"]]
-        all_other_labels = [d["label"] for d in other_strong + middling]
+        other_strong = [d for d in strong if d.name != lead.name]
+        all_other_labels = [d.label for d in other_strong + middling]
 
         # Weakness sentence
-        weak_labels = [d["label"] for d in weak]
-        any_weak_places = any(d["places"] for d in weak)
+        weak_labels = [d.label for d in weak]
+        any_weak_places = any(d.has_places for d in weak)
 
         weakness = ""
         if not any_weak_places:
@@ -2976,21 +3013,21 @@ def _insight_neighborhood(neighborhood, tier2):
         else:
             weakness = f" However, {_join_labels(weak_labels)} will take more effort to reach."
 
-        return {"text": lead_sentence + weakness, "car_dependent": False}
+        return lead_sentence + weakness, False
 
     # Branch: has strong dims, rest are middling (no weak)
     if strong and middling and not weak:
-        lead_label = lead["label"]
-        others = [d["label"] for d in dims if d["name"] != lead["name"]]
+        lead_label = lead.label
+        others = [d.label for d in dims if d.name != lead.name]
         if lead_place_name:
-            return {"text": f"{lead_place_name} ({lead_label}) is a standout nearby, and {_join_labels(others)} are all within reach too.", "car_dependent": False}
-        return {"text": f"This area excels at {lead_label}, and {_join_labels(others)} are all within reach too.", "car_dependent": False}
+            return f"{lead_place_name} ({lead_label}) is a standout nearby, and {_join_labels(others)} are all within reach too.", False
+        return f"This area excels at {lead_label}, and {_join_labels(others)} are all within reach too.", False
 
     # Branch: no strong, middling + weak
     if not strong and middling and weak:
-        lead_label = lead["label"]
-        weak_labels = [d["label"] for d in weak]
-        any_weak_places = any(d["places"] for d in weak)
+        lead_label = lead.label
+        weak_labels = [d.label for d in weak]
+        any_weak_places = any(d.has_places for d in weak)
 
         lead_sentence = ""
         if lead_place_name:
@@ -3004,9 +3041,9 @@ def _insight_neighborhood(neighborhood, tier2):
         else:
             weakness = f" But {_join_labels(weak_labels)} will take more effort to reach."
 
-        return {"text": lead_sentence + weakness, "car_dependent": False}
+        return lead_sentence + weakness, False
 
-    return {"text": None, "car_dependent": False}
+    return None, False
 
 
 def _insight_getting_around(urban, transit, walk_scores, freq_label, tier2):
@@ -3109,6 +3146,24 @@ def _insight_getting_around(urban, transit, walk_scores, freq_label, tier2):
     return result
 
 
+# OSM enrichment thresholds for park insight copy
+_PARK_ACRES_MIN_SQM = 20_234  # ~5 acres
+_SQM_PER_ACRE = 4047
+_PARK_PATHS_MIN = 3
+
+
+def _park_osm_details(area_sqm, has_trail, path_count):
+    """Return OSM enrichment phrases ("12 acres", "trails", "4 paths") for a park."""
+    details = []
+    if area_sqm and area_sqm >= _PARK_ACRES_MIN_SQM:
+        details.append(f"{int(area_sqm / _SQM_PER_ACRE + 0.5)} acres")
+    if has_trail:
+        details.append("trails")
+    if path_count >= _PARK_PATHS_MIN:
+        details.append(f"{path_count} paths")
+    return details
+
+
 def _insight_parks(green_escape, tier2):
     """Generate a narrative insight for the Parks & Green Space section."""
     if not green_escape:
@@ -3139,16 +3194,7 @@ def _insight_parks(green_escape, tier2):
     if score >= 7 and walk_min is not None and walk_min <= 15:
         parts.append(f"{name} is just {walk_min} minutes on foot \u2014 close enough for a morning run or afternoon walk")
 
-        # OSM enrichment
-        osm_details = []
-        if area_sqm and area_sqm >= 20_234:  # ~5 acres
-            acres = int(area_sqm / 4047 + 0.5)
-            osm_details.append(f"{acres} acres")
-        if has_trail:
-            osm_details.append("trails")
-        if path_count >= 3:
-            osm_details.append(f"{path_count} paths")
-
+        osm_details = _park_osm_details(area_sqm, has_trail, path_count)
         if osm_details:
             parts.append(f", with {_join_labels(osm_details)}")
 
@@ -3165,16 +3211,7 @@ def _insight_parks(green_escape, tier2):
             parts.append(f"{walk_min} minutes away, ")
         parts.append(f"a solid option for regular visits.")
 
-        # OSM enrichment
-        osm_details = []
-        if area_sqm and area_sqm >= 20_234:
-            acres = int(area_sqm / 4047 + 0.5)
-            osm_details.append(f"{acres} acres")
-        if has_trail:
-            osm_details.append("trails")
-        if path_count >= 3:
-            osm_details.append(f"{path_count} paths")
-
+        osm_details = _park_osm_details(area_sqm, has_trail, path_count)
         if osm_details:
             parts[-1] = parts[-1].rstrip(".")
             parts.append(f", with {_join_labels(osm_details)}.")
@@ -4008,6 +4045,7 @@ def _check_full_access(snapshot_id: str, user_email: str | None = None) -> bool:
 
 
 @app.route("/s/<snapshot_id>")
+@with_db_session
 def view_snapshot(snapshot_id):
     """Public, read-only snapshot page. No auth required."""
     snapshot = get_snapshot(snapshot_id)
@@ -5199,6 +5237,38 @@ def _handle_subscription_event(sub_obj: dict, event_type: str) -> None:
         update_subscription_status(sub_obj["id"], SUBSCRIPTION_EXPIRED)
 
 
+def _handle_checkout_completed(session_obj: dict) -> None:
+    """Mark the pending payment for a completed Checkout session as paid."""
+    payment = get_payment_by_session(session_obj["id"])
+    if payment:
+        update_payment_status(
+            payment["id"], PAYMENT_PAID, expected_status=PAYMENT_PENDING,
+        )
+        logger.info("Webhook: payment %s → paid", payment["id"])
+
+
+def _handle_invoice_payment_failed(inv_obj: dict) -> None:
+    """Flag the invoice's subscription past_due after a failed charge."""
+    sub_id = inv_obj.get("subscription")
+    if sub_id:
+        update_subscription_status(sub_id, SUBSCRIPTION_PAST_DUE)
+        logger.warning("Webhook: subscription %s → past_due (payment failed)", sub_id)
+
+
+# Stripe event type -> handler(event["data"]["object"]). Unlisted types are
+# acknowledged with 200 and otherwise ignored.
+_STRIPE_WEBHOOK_HANDLERS = {
+    "checkout.session.completed": _handle_checkout_completed,
+    "customer.subscription.created":
+        lambda obj: _handle_subscription_event(obj, "created"),
+    "customer.subscription.updated":
+        lambda obj: _handle_subscription_event(obj, "updated"),
+    "customer.subscription.deleted":
+        lambda obj: _handle_subscription_event(obj, "deleted"),
+    "invoice.payment_failed": _handle_invoice_payment_failed,
+}
+
+
 @app.route("/webhook/stripe", methods=["POST"])
 def stripe_webhook():
     """Handle Stripe webhook events (no CSRF — Stripe signs the payload)."""
@@ -5221,27 +5291,9 @@ def stripe_webhook():
             return jsonify({"error": "Invalid signature"}), 400
         raise
 
-    if event["type"] == "checkout.session.completed":
-        session_obj = event["data"]["object"]
-        stripe_session_id = session_obj["id"]
-        payment = get_payment_by_session(stripe_session_id)
-        if payment:
-            update_payment_status(
-                payment["id"], PAYMENT_PAID, expected_status=PAYMENT_PENDING,
-            )
-            logger.info("Webhook: payment %s → paid", payment["id"])
-    elif event["type"] == "customer.subscription.created":
-        _handle_subscription_event(event["data"]["object"], "created")
-    elif event["type"] == "customer.subscription.updated":
-        _handle_subscription_event(event["data"]["object"], "updated")
-    elif event["type"] == "customer.subscription.deleted":
-        _handle_subscription_event(event["data"]["object"], "deleted")
-    elif event["type"] == "invoice.payment_failed":
-        inv_obj = event["data"]["object"]
-        sub_id = inv_obj.get("subscription")
-        if sub_id:
-            update_subscription_status(sub_id, SUBSCRIPTION_PAST_DUE)
-            logger.warning("Webhook: subscription %s → past_due (payment failed)", sub_id)
+    handler = _STRIPE_WEBHOOK_HANDLERS.get(event["type"])
+    if handler is not None:
+        handler(event["data"]["object"])
 
     return jsonify({"status": "ok"}), 200
 
@@ -181,7 +181,7 @@ def _clean_place_name(raw_name: str) -> str:
 def _record_api(service: str, endpoint: str, t0: float,
                 status_code: int, ok: bool, note: str = "") -> None:
     """Record an API call to trace and health monitor."""
-    elapsed_ms = (time.time() - t0) * 1000
+    elapsed_ms = (time.monotonic() - t0) * 1000
     trace = get_trace()
     if trace:
         trace.record_api_call(
@@ -218,7 +218,7 @@ def _lookup_place(lat: float, lng: float) -> Optional[Dict[str, str]]:
       - county: county FIPS (only for county_subdivision)
     or None if no matching geography is found.
     """
-    t0 = time.time()
+    t0 = time.monotonic()
     params = {
         "x": lng,
         "y": lat,
@@ -327,7 +327,7 @@ def _fetch_acs_place(state: str, place: str, api_key: str,
     if api_key:
         params["key"] = api_key
 
-    t0 = time.time()
+    t0 = time.monotonic()
     try:
         resp = requests.get(_ACS_BASE, params=params, timeout=_ACS_TIMEOUT)
         _record_api("census_acs", endpoint, t0, resp.status_code, resp.ok)
@@ -10,9 +10,11 @@ import sqlite3
 import os
 import json
 import logging
+import threading
 import uuid
 import time
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache, wraps
 from typing import Optional, Tuple
 
 from coverage_config import _STATE_FIPS
@@ -40,16 +42,157 @@ PAYMENT_REDEEMED = "redeemed"
 PAYMENT_FAILED_REISSUED = "failed_reissued"
 
 
-def _get_db():
-    """Get a sqlite3 connection with WAL mode for concurrent reads."""
-    conn = sqlite3.connect(DB_PATH)
+@lru_cache(maxsize=1)
+def _iso_second(epoch_s: int) -> str:
+    return datetime.fromtimestamp(epoch_s, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _now_iso() -> str:
+    """Current UTC time as an ISO-8601 string with microsecond precision.
+
+    The date/time prefix is memoized per wall-clock second, so a burst of
+    inserts only formats the calendar fields once. Sub-second digits are
+    kept (and always zero-padded) so ORDER BY created_at stays FIFO.
+    """
+    ns = time.time_ns()
+    return f"{_iso_second(ns // 1_000_000_000)}.{ns // 1000 % 1_000_000:06d}+00:00"
+
+
+class _PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose close() parks it in _pool for reuse."""
+
+    _idle = False
+    _pinned = False
+
+    def close(self):
+        if self._pinned:
+            # Held by with_db_session: keep it, but still drop
+            # uncommitted work like a real close() would.
+            if self.in_transaction:
+                self.rollback()
+            return
+        _pool.release(self)
+
+
+class _ConnectionPool:
+    """Per-process LIFO stack of idle _get_db() connections.
+
+    Call sites keep the usual ``conn = _get_db() ... finally: conn.close()``
+    shape; close() hands the connection back here instead of tearing it
+    down, so the next _get_db() skips the open + PRAGMA round-trips.  A
+    connection is only ever held by one thread at a time.  The stack is
+    dropped when the PID or DB_PATH changes (gunicorn fork, test reloads).
+    """
+
+    def __init__(self, max_idle):
+        self.max_idle = max_idle
+        self._stack = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._path = None
+
+    def acquire(self, path):
+        with self._lock:
+            if self._pid != os.getpid() or self._path != path:
+                # Never reuse handles inherited across fork; just drop them.
+                self._stack = []
+                self._pid = os.getpid()
+                self._path = path
+            if self._stack:
+                conn = self._stack.pop()
+                conn._idle = False
+                return conn
+        return _open_conn(path, factory=_PooledConnection)
+
+    def release(self, conn):
+        if conn._idle:
+            return  # double close()
+        try:
+            if conn.in_transaction:
+                # Match sqlite3 close(): uncommitted work is discarded.
+                conn.rollback()
+        except sqlite3.Error:
+            sqlite3.Connection.close(conn)
+            return
+        with self._lock:
+            if (self._pid == os.getpid()
+                    and len(self._stack) < self.max_idle):
+                conn._idle = True
+                self._stack.append(conn)
+                return
+        sqlite3.Connection.close(conn)
+
+
+_pool = _ConnectionPool(max_idle=min(os.cpu_count() or 1, 8))
+
+
+_MMAP_SIZE = 256 * 1024 * 1024
+
+
+def _open_conn(path, factory=sqlite3.Connection):
+    conn = sqlite3.connect(path, factory=factory, check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    # page_size only takes effect on a brand-new file, so it has to run
+    # before journal_mode=WAL creates one; on an existing DB it is a no-op.
+    conn.execute("PRAGMA page_size=8192")
     conn.execute("PRAGMA journal_mode=WAL")
+    # In WAL mode NORMAL only fsyncs at checkpoints, not on every commit.
+    # The DB stays consistent after a crash; only the last commits before a
+    # power loss can roll back.
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
     conn.execute("PRAGMA busy_timeout=30000")
     conn.execute("PRAGMA foreign_keys=ON")
+    # Cached Overpass/Census responses are large TEXT blobs; memory-mapped
+    # I/O serves them from the OS page cache instead of copying through
+    # SQLite's private page buffer.
+    conn.execute(f"PRAGMA mmap_size={_MMAP_SIZE}")
     return conn
 
 
+_session = threading.local()
+
+
+def _get_db():
+    """Get a sqlite3 connection with WAL mode for concurrent reads.
+
+    Connections come from _pool; ``conn.close()`` returns them to it.
+    Inside with_db_session the thread's pinned connection is returned.
+    In-memory databases are never pooled (each connect() is a new DB).
+    """
+    if DB_PATH == ":memory:":
+        return _open_conn(DB_PATH)
+    conn = getattr(_session, "conn", None)
+    if conn is not None:
+        return conn
+    return _pool.acquire(DB_PATH)
+
+
+def with_db_session(fn):
+    """Pin one pooled connection to the thread for the duration of fn.
+
+    Every _get_db() made by fn (directly or through model helpers) gets
+    the same connection, so a request that runs several queries takes
+    the pool lock once instead of once per helper.  Helpers still commit
+    and close() as usual; close() on the pinned connection only rolls
+    back uncommitted work.  Nested sessions reuse the outer one.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if DB_PATH == ":memory:" or getattr(_session, "conn", None) is not None:
+            return fn(*args, **kwargs)
+        conn = _pool.acquire(DB_PATH)
+        conn._pinned = True
+        _session.conn = conn
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _session.conn = None
+            conn._pinned = False
+            conn.close()
+    return wrapper
+
+
 def _return_conn(conn):
     """Close a DB connection returned by _get_db().
 
@@ -132,6 +275,9 @@ def init_db():
         );
 
         CREATE INDEX IF NOT EXISTS idx_jobs_status ON evaluation_jobs(status);
+        -- claim_next_job(): WHERE status = 'queued' ORDER BY created_at
+        CREATE INDEX IF NOT EXISTS idx_jobs_status_created
+            ON evaluation_jobs(status, created_at);
 
         CREATE TABLE IF NOT EXISTS users (
             id              TEXT PRIMARY KEY,
@@ -491,9 +637,30 @@ def backfill_city_state():
         conn.close()
 
 
+# Snapshot IDs draw 4 bytes each from a shared os.urandom() block so that
+# minting many IDs (bulk import, replay) costs one syscall per 1024 IDs.
+# The buffer is tied to the owning PID: gunicorn workers fork after import
+# and must never hand out the same bytes as their siblings.
+_SNAPSHOT_ID_BYTES = 4
+_RAND_BUF_SIZE = 4096
+_rand_buf = b""
+_rand_pos = 0
+_rand_pid = None
+_rand_lock = threading.Lock()
+
+
 def generate_snapshot_id():
     """Short, URL-safe snapshot ID (8 chars)."""
-    return uuid.uuid4().hex[:8]
+    global _rand_buf, _rand_pos, _rand_pid
+    with _rand_lock:
+        pid = os.getpid()
+        if _rand_pid != pid or _rand_pos + _SNAPSHOT_ID_BYTES > len(_rand_buf):
+            _rand_buf = os.urandom(_RAND_BUF_SIZE)
+            _rand_pos = 0
+            _rand_pid = pid
+        chunk = _rand_buf[_rand_pos:_rand_pos + _SNAPSHOT_ID_BYTES]
+        _rand_pos += _SNAPSHOT_ID_BYTES
+    return chunk.hex()
 
 
 def save_snapshot(address_input, address_norm, result_dict, email=None, **kwargs):
@@ -508,7 +675,7 @@ def save_snapshot(address_input, address_norm, result_dict, email=None, **kwargs
     user_id = kwargs.get("user_id")
     is_preview = 1 if kwargs.get("is_preview") else 0
     snapshot_id = generate_snapshot_id()
-    now = datetime.now(timezone.utc).isoformat()
+    now = _now_iso()
     city, state_abbr = _extract_city_state(result_dict)
 
     conn = _get_db()
@@ -657,7 +824,7 @@ def check_snapshots_exist(snapshot_ids):
 
 def update_snapshot_email_sent(snapshot_id: str) -> None:
     """Mark that the report email was sent for this snapshot."""
-    now = datetime.now(timezone.utc).isoformat()
+    now = _now_iso()
     conn = _get_db()
     conn.execute(
         "UPDATE snapshots SET email_sent_at = ? WHERE snapshot_id = ?",
@@ -690,7 +857,7 @@ def log_event(event_type, snapshot_id=None, visitor_id=None, metadata=None):
                 return_visit, evaluation_error, snapshot_reused
     metadata:   optional dict of extra info
     """
-    now = datetime.now(timezone.utc).isoformat()
+    now = _now_iso()
     conn = _get_db()
     conn.execute(
         """INSERT INTO events (event_type, snapshot_id, visitor_id, metadata, created_at)
@@ -710,7 +877,7 @@ def log_event(event_type, snapshot_id=None, visitor_id=None, metadata=None):
 def save_feedback(snapshot_id, feedback_type, response_json,
                   address_norm=None, visitor_id=None):
     """Save a user feedback submission to the feedback table."""
-    now = datetime.now(timezone.utc).isoformat()
+    now = _now_iso()
     for attempt in range(3):
         try:
             conn = _get_db()
@@ -771,7 +938,7 @@ def save_inline_feedback(snapshot_id: str, user_id, visitor_id,
     if has_inline_feedback(snapshot_id, user_id, visitor_id):
         return False
 
-    now = datetime.now(timezone.utc).isoformat()
+    now = _now_iso()
     last_err = None
     for attempt in range(3):
         try:
@@ -1070,7 +1237,7 @@ def save_snapshot_for_place(
     If existing_snapshot_id is provided, update in place and return the same id.
     Otherwise, insert a new row and return the new snapshot_id.
     """
-    now = datetime.now(timezone.utc).isoformat()
+    now = _now_iso()
     evaluated_ts = evaluated_at or now
     norm = address_norm or address_input
     city, state_abbr = _extract_city_state(result_dict)
@@ -1235,7 +1402,7 @@ def create_job(address: str, visitor_id: str = None, request_id: str = None,
     concurrent writes from multiple gunicorn workers.
     """
     job_id = uuid.uuid4().hex[:12]
-    now = datetime.now(timezone.utc).isoformat()
+    now = _now_iso()
     last_err = None
     for attempt in range(3):
         try:
@@ -1288,31 +1455,27 @@ def get_job(job_id: str) -> Optional[dict]:
 
 
 def claim_next_job() -> Optional[dict]:
-    """Atomically claim the oldest queued job. Returns the job dict or None."""
-    now = datetime.now(timezone.utc).isoformat()
+    """Atomically claim the oldest queued job. Returns the job dict or None.
+
+    A single UPDATE ... RETURNING picks, claims and reads the job, so two
+    workers can never both see the same row as claimed.
+    """
+    now = _now_iso()
     conn = _get_db()
     try:
         row = conn.execute(
-            """SELECT job_id FROM evaluation_jobs
-               WHERE status = 'queued'
-               ORDER BY created_at ASC LIMIT 1"""
-        ).fetchone()
-        if not row:
-            return None
-        job_id = row["job_id"]
-        conn.execute(
             """UPDATE evaluation_jobs
                SET status = 'running', started_at = ?
-               WHERE job_id = ? AND status = 'queued'""",
-            (now, job_id),
-        )
-        conn.commit()
-        if conn.total_changes == 0:
-            return None
-        full = conn.execute(
-            "SELECT * FROM evaluation_jobs WHERE job_id = ?", (job_id,)
+               WHERE job_id = (
+                   SELECT job_id FROM evaluation_jobs
+                   WHERE status = 'queued'
+                   ORDER BY created_at ASC LIMIT 1
+               ) AND status = 'queued'
+               RETURNING *""",
+            (now,),
         ).fetchone()
-        return dict(full) if full else None
+        conn.commit()
+        return dict(row) if row else None
     finally:
         conn.close()
 
@@ -1330,7 +1493,7 @@ def update_job_stage(job_id: str, stage: str) -> None:
 
 def complete_job(job_id: str, snapshot_id: str) -> None:
     """Mark a job as done with its resulting snapshot_id."""
-    now = datetime.now(timezone.utc).isoformat()
+    now = _now_iso()
     conn = _get_db()
     conn.execute(
         """UPDATE evaluation_jobs
@@ -1345,7 +1508,7 @@ def complete_job(job_id: str, snapshot_id: str) -> None:
 
 def fail_job(job_id: str, error: str) -> None:
     """Mark a job as failed with an error message."""
-    now = datetime.now(timezone.utc).isoformat()
+    now = _now_iso()
     error = error[:2000] if error else error
     conn = _get_db()
     conn.execute(
@@ -1360,7 +1523,7 @@ def fail_job(job_id: str, error: str) -> None:
 
 def cancel_queued_job(job_id: str, reason: str) -> bool:
     """Cancel a job that is still queued. Returns True if cancelled, False if not queued."""
-    now = datetime.now(timezone.utc).isoformat()
+    now = _now_iso()
     conn = _get_db()
     cur = conn.execute(
         """UPDATE evaluation_jobs
@@ -1383,13 +1546,12 @@ def requeue_stale_running_jobs(max_age_seconds: int = 300) -> int:
     cutoff = (
         datetime.now(timezone.utc) - timedelta(seconds=max_age_seconds)
     ).isoformat()
-    conn.execute(
+    swept = conn.execute(
         """UPDATE evaluation_jobs
            SET status = 'queued', started_at = NULL, current_stage = NULL
            WHERE status = 'running' AND started_at < ?""",
         (cutoff,),
-    )
-    swept = conn.total_changes
+    ).rowcount
     conn.commit()
     conn.close()
     return swept
@@ -1407,7 +1569,7 @@ def create_payment(
     snapshot_id: Optional[str] = None,
 ) -> None:
     """Insert a new payment row in 'pending' status."""
-    now = datetime.now(timezone.utc).isoformat()
+    now = _now_iso()
     conn = _get_db()
     try:
         conn.execute(
@@ -1421,40 +1583,35 @@ def create_payment(
         conn.close()
 
 
-def get_payment_by_id(payment_id: str) -> Optional[dict]:
-    """Look up a payment by its primary key. Returns dict or None."""
+def _fetch_payment(column: str, value: str) -> Optional[sqlite3.Row]:
+    """Fetch one payments row by an indexed column.
+
+    The sqlite3.Row is returned as-is rather than copied into a dict:
+    callers only read columns by name (``payment["status"]``), which Row
+    supports directly.
+    """
     conn = _get_db()
     try:
-        row = conn.execute(
-            "SELECT * FROM payments WHERE id = ?", (payment_id,)
+        return conn.execute(
+            f"SELECT * FROM payments WHERE {column} = ?", (value,)
         ).fetchone()
-        return dict(row) if row else None
     finally:
         conn.close()
 
 
-def get_payment_by_session(session_id: str) -> Optional[dict]:
-    """Look up a payment by Stripe Checkout session ID. Returns dict or None."""
-    conn = _get_db()
-    try:
-        row = conn.execute(
-            "SELECT * FROM payments WHERE stripe_session_id = ?", (session_id,)
-        ).fetchone()
-        return dict(row) if row else None
-    finally:
-        conn.close()
+def get_payment_by_id(payment_id: str) -> Optional[sqlite3.Row]:
+    """Look up a payment by its primary key. Returns the row or None."""
+    return _fetch_payment("id", payment_id)
 
 
-def get_payment_by_job_id(job_id: str) -> Optional[dict]:
-    """Look up a payment by linked evaluation job ID. Returns dict or None."""
-    conn = _get_db()
-    try:
-        row = conn.execute(
-            "SELECT * FROM payments WHERE job_id = ?", (job_id,)
-        ).fetchone()
-        return dict(row) if row else None
-    finally:
-        conn.close()
+def get_payment_by_session(session_id: str) -> Optional[sqlite3.Row]:
+    """Look up a payment by Stripe Checkout session ID. Returns the row or None."""
+    return _fetch_payment("stripe_session_id", session_id)
+
+
+def get_payment_by_job_id(job_id: str) -> Optional[sqlite3.Row]:
+    """Look up a payment by linked evaluation job ID. Returns the row or None."""
+    return _fetch_payment("job_id", job_id)
 
 
 def update_payment_status(
@@ -1491,7 +1648,7 @@ def redeem_payment(payment_id: str, job_id: Optional[str] = None) -> bool:
     Sets redeemed_at timestamp and optionally links a job_id.
     Returns True if redemption succeeded, False otherwise.
     """
-    now = datetime.now(timezone.utc).isoformat()
+    now = _now_iso()
     conn = _get_db()
     try:
         cur = conn.execute(
@@ -1523,8 +1680,17 @@ def update_payment_job_id(payment_id: str, job_id: str) -> None:
 # Free tier usage
 # ---------------------------------------------------------------------------
 
+@lru_cache(maxsize=1024)
 def hash_email(email: str) -> str:
-    """Deterministic, case-insensitive SHA-256 hash of an email address."""
+    """Deterministic, case-insensitive SHA-256 hash of an email address.
+
+    Memoized: the same address is hashed repeatedly within a request and
+    across webhook replays.  free_tier_usage lookups on the result already
+    hit the email_hash PRIMARY KEY / idx_free_tier_email_hash index.
+
+    The digest is persisted, so the algorithm is part of the schema: a
+    faster hash would orphan every existing free_tier_usage row.
+    """
     normalised = email.strip().lower()
     return hashlib.sha256(normalised.encode()).hexdigest()
 
@@ -1547,13 +1713,10 @@ def check_free_tier_available(email_hash: str) -> bool:
         eval_count = row[0] or 0
         window_start = row[1]
         if window_start:
-            try:
-                ws = datetime.fromisoformat(window_start)
-                if ws.tzinfo is None:
-                    ws = ws.replace(tzinfo=timezone.utc)
-                if datetime.now(timezone.utc) - ws > timedelta(days=_FREE_TIER_WINDOW_DAYS):
-                    return True
-            except (ValueError, TypeError):
+            ws = _iso_to_epoch(str(window_start))
+            if ws is None:
+                return True
+            if time.time() - ws > _FREE_TIER_WINDOW_DAYS * 86400:
                 return True
         return eval_count < _FREE_TIER_MAX_EVALS
     finally:
@@ -1611,6 +1774,25 @@ def overpass_cache_key(query_string: str) -> str:
     return hashlib.sha256(query_string.encode()).hexdigest()
 
 
+def _utc_epoch(created: datetime) -> float:
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)
+    return created.timestamp()
+
+
+@lru_cache(maxsize=512)
+def _iso_to_epoch(created_str: str) -> Optional[float]:
+    """Parse a stored ISO timestamp to epoch seconds; None if unparseable.
+
+    Cache rows are re-checked many times within a request, so the parse
+    is memoized on the raw string.
+    """
+    try:
+        return _utc_epoch(datetime.fromisoformat(created_str))
+    except ValueError:
+        return None
+
+
 def _check_cache_ttl(created_str, ttl_days: int) -> bool:
     """Return True if a cache entry is still valid (younger than TTL).
 
@@ -1618,17 +1800,13 @@ def _check_cache_ttl(created_str, ttl_days: int) -> bool:
     """
     if not created_str:
         return True  # No timestamp → assume valid
-    try:
-        if isinstance(created_str, datetime):
-            created = created_str
-        else:
-            created = datetime.fromisoformat(str(created_str))
-        if created.tzinfo is None:
-            created = created.replace(tzinfo=timezone.utc)
-        age = datetime.now(timezone.utc) - created
-        return age <= timedelta(days=ttl_days)
-    except (ValueError, TypeError):
-        return True  # Can't parse → return data anyway
+    if isinstance(created_str, datetime):
+        created = _utc_epoch(created_str)
+    else:
+        created = _iso_to_epoch(str(created_str))
+        if created is None:
+            return True  # Can't parse → return data anyway
+    return time.time() - created <= ttl_days * 86400
 
 
 def get_overpass_cache(cache_key: str, ttl_days: Optional[int] = None) -> Optional[str]:
@@ -1691,7 +1869,7 @@ def set_overpass_cache(cache_key: str, response_json: str) -> None:
     try:
         conn = _get_db()
         try:
-            now = datetime.now(timezone.utc).isoformat()
+            now = _now_iso()
             conn.execute(
                 """INSERT OR REPLACE INTO overpass_cache (cache_key, response_json, created_at)
                    VALUES (?, ?, ?)""",
@@ -1745,7 +1923,7 @@ def set_weather_cache(cache_key: str, summary_json: str) -> None:
     try:
         conn = _get_db()
         try:
-            now = datetime.now(timezone.utc).isoformat()
+            now = _now_iso()
             conn.execute(
                 """INSERT OR REPLACE INTO weather_cache (cache_key, summary_json, created_at)
                    VALUES (?, ?, ?)""",
@@ -1799,7 +1977,7 @@ def set_census_cache(cache_key: str, data_json: str) -> None:
     try:
         conn = _get_db()
         try:
-            now = datetime.now(timezone.utc).isoformat()
+            now = _now_iso()
             conn.execute(
                 """INSERT OR REPLACE INTO census_cache (cache_key, data_json, created_at)
                    VALUES (?, ?, ?)""",
@@ -1853,7 +2031,7 @@ def set_canopy_cache(cache_key: str, data_json: str) -> None:
     try:
         conn = _get_db()
         try:
-            now = datetime.now(timezone.utc).isoformat()
+            now = _now_iso()
             conn.execute(
                 """INSERT OR REPLACE INTO canopy_cache (cache_key, data_json, created_at)
                    VALUES (?, ?, ?)""",
@@ -1918,7 +2096,7 @@ def save_evaluation_coverage(data: dict) -> None:
 
 def save_state_request(email: str, state_code: str) -> bool:
     """Record a state coverage request. Returns True on success, False on duplicate."""
-    now = datetime.now(timezone.utc).isoformat()
+    now = _now_iso()
     conn = _get_db()
     try:
         conn.execute(
@@ -1969,7 +2147,7 @@ def record_state_vote(state: str) -> bool:
     state = state.strip().upper()
     if state not in _US_STATES:
         return False
-    now = datetime.now(timezone.utc).isoformat()
+    now = _now_iso()
     conn = _get_db()
     try:
         conn.execute(
@@ -2018,7 +2196,7 @@ def get_or_create_user(email: str, name: str = None,
     Lookup order: google_sub → email → create new.
     Updates last_login_at on every call.
     """
-    now = datetime.now(timezone.utc).isoformat()
+    now = _now_iso()
     conn = _get_db()
     try:
         # Try google_sub first (stable identifier)
@@ -2173,7 +2351,7 @@ def create_subscription(
     """Create a new subscription record."""
     conn = _get_db()
     try:
-        now = datetime.now(timezone.utc).isoformat()
+        now = _now_iso()
         email_h = hash_email(user_email)
         conn.execute(
             "INSERT INTO subscriptions "
@@ -2216,7 +2394,7 @@ def update_subscription_status(
     """Update subscription status and optionally period dates and plan."""
     conn = _get_db()
     try:
-        now = datetime.now(timezone.utc).isoformat()
+        now = _now_iso()
         if period_start and period_end:
             if plan is not None:
                 conn.execute(
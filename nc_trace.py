@@ -1,7 +1,7 @@
 """
 Request-scoped tracing for NestCheck evaluation debugging.
 
-Provides a thread-local TraceContext that records:
+Provides a context-local TraceContext that records:
   - Per-stage timing (stage_name, start/end, elapsed_ms, api_calls, errors)
   - Per-outbound-call timing (service, endpoint, elapsed_ms, status, provider status)
   - End-of-request summary (total_elapsed, total_api_calls, outcome)
@@ -23,8 +23,8 @@ Usage:
 """
 
 import time
-import threading
 import logging
+from contextvars import ContextVar
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Any
 
@@ -35,7 +35,7 @@ logger = logging.getLogger(__name__)
 # Data classes for trace records
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class APICallRecord:
     """One outbound HTTP call (Google Maps, Overpass, WalkScore, etc.)."""
     service: str          # "google_maps" | "overpass" | "walkscore" | "website"
@@ -47,7 +47,7 @@ class APICallRecord:
     stage: str = ""             # which evaluation stage was running
 
 
-@dataclass
+@dataclass(slots=True)
 class StageRecord:
     """One evaluation stage (geocode, neighborhood, schools, tier1, etc.)."""
     stage_name: str
@@ -68,7 +68,10 @@ class StageRecord:
 class TraceContext:
     """Accumulates timing data for a single evaluation request."""
     trace_id: str
-    request_start: float = field(default_factory=time.time)
+    # Monotonic clock: durations stay correct across NTP/wall-clock jumps.
+    # Stage start/end timestamps passed to record_stage() should come from
+    # time.monotonic() too; only their difference is ever used.
+    request_start: float = field(default_factory=time.monotonic)
     stages: List[StageRecord] = field(default_factory=list)
     api_calls: List[APICallRecord] = field(default_factory=list)
     model_version: str = ""
@@ -158,10 +161,16 @@ class TraceContext:
 
     def summary_dict(self) -> Dict[str, Any]:
         """Return a summary dict suitable for logging and JSON responses."""
-        total_elapsed = int((time.time() - self.request_start) * 1000)
-        completed = [s for s in self.stages if not s.skipped and not s.error_class]
-        skipped = [s for s in self.stages if s.skipped]
-        errored = [s for s in self.stages if s.error_class and not s.skipped]
+        total_elapsed = int((time.monotonic() - self.request_start) * 1000)
+        # One pass over stages; only the counts are needed.
+        completed = skipped = errored = 0
+        for s in self.stages:
+            if s.skipped:
+                skipped += 1
+            elif s.error_class:
+                errored += 1
+            else:
+                completed += 1
 
         if errored and not completed:
             outcome = "error"
@@ -176,9 +185,9 @@ class TraceContext:
             "trace_id": self.trace_id,
             "total_elapsed_ms": total_elapsed,
             "total_api_calls": len(self.api_calls),
-            "stages_completed": len(completed),
-            "stages_skipped": len(skipped),
-            "stages_errored": len(errored),
+            "stages_completed": completed,
+            "stages_skipped": skipped,
+            "stages_errored": errored,
             "final_outcome": outcome,
         }
         if self.model_version:
@@ -246,22 +255,27 @@ class TraceContext:
 
 
 # =============================================================================
-# Thread-local storage
+# Context-local storage
 # =============================================================================
 
-_trace_local = threading.local()
+# A ContextVar behaves like threading.local for plain threads (each new
+# thread starts with an empty context) but also follows asyncio tasks and
+# contextvars.copy_context().run(), and get() is a single C-level lookup.
+_current_trace: ContextVar[Optional[TraceContext]] = ContextVar(
+    "nc_trace", default=None,
+)
 
 
 def get_trace() -> Optional[TraceContext]:
     """Get the current request's trace context, or None."""
-    return getattr(_trace_local, "ctx", None)
+    return _current_trace.get()
 
 
 def set_trace(ctx: Optional[TraceContext]):
     """Set the trace context for the current thread."""
-    _trace_local.ctx = ctx
+    _current_trace.set(ctx)
 
 
 def clear_trace():
     """Clear the current trace context."""
-    _trace_local.ctx = None
+    _current_trace.set(None)
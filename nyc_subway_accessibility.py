@@ -8,8 +8,8 @@ Each tuple: (lat, lng, step_free_entrance, has_elevator, ada_note)
   - ada_note: None for ADA 0/1, directional note string for ADA 2
 """
 
-from math import radians, cos, sqrt
-from typing import Optional, Tuple
+from math import radians, cos, floor, hypot, pi
+from typing import Dict, List, Optional, Tuple
 
 
 # (lat, lng, step_free_entrance, has_elevator, ada_note)
@@ -465,12 +465,48 @@ _NYC_SUBWAY_STATIONS: Tuple[Tuple[float, float, bool, bool, Optional[str]], ...]
 # Maximum distance in meters to match a station
 _MATCH_RADIUS_M = 300
 
+_EARTH_RADIUS_M = 6_371_000
+
+# Station columns pre-converted to radians (struct-of-arrays), so a lookup
+# does no per-station trig: only subtract/multiply/compare.
+_STATION_LAT_RAD: Tuple[float, ...] = tuple(radians(s[0]) for s in _NYC_SUBWAY_STATIONS)
+_STATION_LNG_RAD: Tuple[float, ...] = tuple(radians(s[1]) for s in _NYC_SUBWAY_STATIONS)
+_STATION_ACCESS: Tuple[Tuple[bool, bool, Optional[str]], ...] = tuple(
+    s[2:] for s in _NYC_SUBWAY_STATIONS
+)
+
+# Uniform grid over the stations: cell (floor(lat/_GRID_DEG), floor(lng/_GRID_DEG))
+# -> station indices.  0.005 deg is ~556 m of latitude and ~420 m of
+# longitude at NYC latitudes, both wider than _MATCH_RADIUS_M, so every
+# station within range of a point lies in the point's cell or one of its
+# eight neighbours.
+_GRID_DEG = 0.005
+
+
+def _grid_cell(lat: float, lng: float) -> Tuple[int, int]:
+    return floor(lat / _GRID_DEG), floor(lng / _GRID_DEG)
+
+
+def _build_station_grid() -> Dict[Tuple[int, int], Tuple[int, ...]]:
+    grid: Dict[Tuple[int, int], List[int]] = {}
+    for i, station in enumerate(_NYC_SUBWAY_STATIONS):
+        grid.setdefault(_grid_cell(station[0], station[1]), []).append(i)
+    return {cell: tuple(idxs) for cell, idxs in grid.items()}
+
+
+_STATION_GRID = _build_station_grid()
+
+
+# Degrees -> metres along a great circle, and degrees -> half-angle radians,
+# folded into constants so the scalar path does no radians() calls.
+_M_PER_DEG = pi / 180 * _EARTH_RADIUS_M
+_HALF_DEG_TO_RAD = pi / 360
+
 
 def _approx_distance_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
     """Fast approximate distance in meters using equirectangular projection."""
-    dlat = radians(lat2 - lat1)
-    dlng = radians(lng2 - lng1) * cos(radians((lat1 + lat2) / 2))
-    return sqrt(dlat * dlat + dlng * dlng) * 6_371_000
+    dlng = (lng2 - lng1) * cos((lat1 + lat2) * _HALF_DEG_TO_RAD)
+    return hypot(lat2 - lat1, dlng) * _M_PER_DEG
 
 
 def lookup_nyc_subway_accessibility(
@@ -483,11 +519,29 @@ def lookup_nyc_subway_accessibility(
     like "uptown only" for partially accessible (ADA=2) stations, or None
     for fully accessible / not accessible stations.
     """
-    best_dist = _MATCH_RADIUS_M
-    best_result: Optional[Tuple[bool, bool, Optional[str]]] = None
-    for slat, slng, step_free, elevator, note in _NYC_SUBWAY_STATIONS:
-        d = _approx_distance_m(lat, lng, slat, slng)
-        if d < best_dist:
-            best_dist = d
-            best_result = (step_free, elevator, note)
-    return best_result
+    # Same equirectangular metric as _approx_distance_m, but compared in
+    # squared radians.  Within 300 m the cosine at the query latitude and
+    # at the midpoint differ by millimetres.
+    qlat = radians(lat)
+    qlng = radians(lng)
+    cos_lat = cos(qlat)
+    best_d2 = (_MATCH_RADIUS_M / _EARTH_RADIUS_M) ** 2
+    best_idx = -1
+    row, col = _grid_cell(lat, lng)
+    candidates = []
+    for r in (row - 1, row, row + 1):
+        for c in (col - 1, col, col + 1):
+            candidates.extend(_STATION_GRID.get((r, c), ()))
+    # Ascending index order keeps the full scan's tie-break (first wins).
+    candidates.sort()
+    for i in candidates:
+        dlat = _STATION_LAT_RAD[i] - qlat
+        d2 = dlat * dlat
+        if d2 >= best_d2:
+            continue
+        dlng = (_STATION_LNG_RAD[i] - qlng) * cos_lat
+        d2 += dlng * dlng
+        if d2 < best_d2:
+            best_d2 = d2
+            best_idx = i
+    return _STATION_ACCESS[best_idx] if best_idx >= 0 else None
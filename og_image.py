@@ -9,6 +9,7 @@ Generates a 1200x630 branded card showing:
 
 import io
 import logging
+from functools import lru_cache
 from typing import Optional
 
 from PIL import Image, ImageDraw, ImageFont
@@ -32,6 +33,20 @@ TEXT_FAINT = "#888888"
 WIDTH = 1200
 HEIGHT = 630
 
+
+def _hex_to_rgb(color: str) -> tuple:
+    """'#rrggbb' -> (r, g, b)."""
+    return int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)
+
+
+# Colors parsed once at import; PIL gets ready-made tuples at draw time.
+_BAND_RGB = {band: _hex_to_rgb(color) for band, color in BAND_COLORS.items()}
+_BAND_RGB_DEFAULT = _hex_to_rgb(BRAND_PRIMARY)
+_BRAND_RGB = _BAND_RGB_DEFAULT
+_SURFACE_RGB = _hex_to_rgb(SURFACE_WHITE)
+_TEXT_MUTED_RGB = _hex_to_rgb(TEXT_MUTED)
+_TEXT_FAINT_RGB = _hex_to_rgb(TEXT_FAINT)
+
 # Font paths (DejaVu is standard on Linux)
 _FONT_BOLD = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
 _FONT_REGULAR = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
@@ -46,6 +61,39 @@ def _load_font(path: str, size: int) -> ImageFont.FreeTypeFont:
         return ImageFont.load_default()
 
 
+@lru_cache(maxsize=None)
+def _font(path: str, size: int) -> ImageFont.FreeTypeFont:
+    """_load_font, loaded once per (path, size) for the life of the process."""
+    return _load_font(path, size)
+
+
+@lru_cache(maxsize=None)
+def _band_template(band_rgb: tuple) -> Image.Image:
+    """Static parts of the card for one band color.
+
+    Background, accent strip, bottom border, brand mark and footer don't
+    depend on the snapshot, so they're drawn once per color and copied.
+    """
+    img = Image.new("RGB", (WIDTH, HEIGHT), _SURFACE_RGB)
+    draw = ImageDraw.Draw(img)
+
+    # Left accent strip
+    draw.rectangle([0, 0, 10, HEIGHT], fill=band_rgb)
+
+    # "NestCheck" brand text — top-left
+    draw.text((60, 40), "NestCheck", fill=_BRAND_RGB, font=_font(_FONT_BOLD, 42))
+
+    # Bottom-right: subtle domain
+    draw.text(
+        (WIDTH - 250, HEIGHT - 50), "nestcheck.app",
+        fill=_TEXT_FAINT_RGB, font=_font(_FONT_REGULAR, 22),
+    )
+
+    # Bottom border accent
+    draw.rectangle([0, HEIGHT - 6, WIDTH, HEIGHT], fill=band_rgb)
+    return img
+
+
 def generate_og_image(
     address: str,
     score: int,
@@ -54,27 +102,19 @@ def generate_og_image(
 ) -> Optional[bytes]:
     """Return PNG bytes for the OG image card, or None on failure."""
     try:
-        band_color = BAND_COLORS.get(band_css_class, BRAND_PRIMARY)
+        band_rgb = _BAND_RGB.get(band_css_class, _BAND_RGB_DEFAULT)
 
-        img = Image.new("RGB", (WIDTH, HEIGHT), SURFACE_WHITE)
+        img = _band_template(band_rgb).copy()
         draw = ImageDraw.Draw(img)
 
-        # Left accent strip
-        draw.rectangle([0, 0, 10, HEIGHT], fill=band_color)
-
         # Fonts
-        font_brand = _load_font(_FONT_BOLD, 42)
-        font_address = _load_font(_FONT_REGULAR, 28)
-        font_score = _load_font(_FONT_BOLD, 140)
-        font_verdict = _load_font(_FONT_REGULAR, 32)
-        font_footer = _load_font(_FONT_REGULAR, 22)
-
-        # "NestCheck" brand text — top-left
-        draw.text((60, 40), "NestCheck", fill=BRAND_PRIMARY, font=font_brand)
+        font_address = _font(_FONT_REGULAR, 28)
+        font_score = _font(_FONT_BOLD, 140)
+        font_verdict = _font(_FONT_REGULAR, 32)
 
         # Address — below brand, truncated if too long
         display_address = address if len(address) <= 60 else address[:57] + "..."
-        draw.text((60, 100), display_address, fill=TEXT_MUTED, font=font_address)
+        draw.text((60, 100), display_address, fill=_TEXT_MUTED_RGB, font=font_address)
 
         # Score number — centered, large
         score_text = str(score)
@@ -82,28 +122,24 @@ def generate_og_image(
         score_w = score_bbox[2] - score_bbox[0]
         score_x = (WIDTH - score_w) // 2
         score_y = 190
-        draw.text((score_x, score_y), score_text, fill=band_color, font=font_score)
+        draw.text((score_x, score_y), score_text, fill=band_rgb, font=font_score)
 
         # "/100" label — right of score
-        label_font = _load_font(_FONT_REGULAR, 48)
+        label_font = _font(_FONT_REGULAR, 48)
         label_x = score_x + score_w + 8
         label_y = score_y + 90  # baseline-align with score
-        draw.text((label_x, label_y), "/100", fill=TEXT_FAINT, font=label_font)
+        draw.text((label_x, label_y), "/100", fill=_TEXT_FAINT_RGB, font=label_font)
 
         # Verdict — centered below score
         verdict_bbox = draw.textbbox((0, 0), verdict, font=font_verdict)
         verdict_w = verdict_bbox[2] - verdict_bbox[0]
         verdict_x = (WIDTH - verdict_w) // 2
-        draw.text((verdict_x, 400), verdict, fill=TEXT_MUTED, font=font_verdict)
-
-        # Bottom-right: subtle domain
-        draw.text((WIDTH - 250, HEIGHT - 50), "nestcheck.app", fill=TEXT_FAINT, font=font_footer)
-
-        # Bottom border accent
-        draw.rectangle([0, HEIGHT - 6, WIDTH, HEIGHT], fill=band_color)
+        draw.text((verdict_x, 400), verdict, fill=_TEXT_MUTED_RGB, font=font_verdict)
 
+        # compress_level=1: ~3x faster encode than optimize=True for a
+        # modestly larger file — these are regenerated, cached cards.
         buf = io.BytesIO()
-        img.save(buf, format="PNG", optimize=True)
+        img.save(buf, format="PNG", compress_level=1)
         return buf.getvalue()
 
     except Exception:
@@ -4,28 +4,41 @@ Coordinated Overpass API HTTP layer.
 All Overpass HTTP requests in the application MUST go through this module.
 It provides:
 - SQLite cache check before any HTTP request (7-day TTL via models.py)
-- Process-local rate limiting: 1 request/second minimum spacing
-- Thread-safe request execution (no shared requests.Session)
-- Retry with exponential backoff on 429/5xx (2 attempts, 2s/4s)
+- Process-local rate limiting: adaptive token bucket, 1 request/second
+  steady with bursts of 2; the rate halves after a 429 and recovers on success
+- Thread-safe request execution over one shared keep-alive session
+- Retry on 429/5xx (2 attempts), honoring Retry-After, else jittered backoff
 - nc_trace integration for observability
 
 Rate limiting is per-process. With 2 gunicorn workers, worst case is
-2 req/s to the public Overpass endpoint. When self-hosting Overpass,
+2 req/s sustained (4 in a burst) to the public Overpass endpoint. When self-hosting Overpass,
 set OVERPASS_BASE_URL env var and increase/remove the rate limit.
 
 Cache: Uses models.overpass_cache_key() / get_overpass_cache() /
 set_overpass_cache() with 7-day TTL. Cache hits bypass the rate limiter
-entirely.
+entirely. In front of SQLite sits a small per-client, in-process LRU of parsed
+responses (MEMO_TTL seconds) so subqueries repeated within one evaluation
+skip both the DB round-trip and the JSON parse.
 """
 
 import json
 import logging
 import os
+import random
+import re
 import threading
 import time
-from typing import Any, Dict, Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from models import (
     get_overpass_cache,
@@ -37,36 +50,142 @@ from nc_trace import get_trace
 
 logger = logging.getLogger(__name__)
 
+# Overpass payloads run to megabytes; orjson parses them straight from
+# bytes several times faster than stdlib json.  Its JSONDecodeError
+# subclasses json.JSONDecodeError, so the except clauses cover both.
+if orjson is not None:
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+else:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+# Retryable: timeouts, server body errors, and 500/502/503/504 anywhere in
+# the message (same set the old substring checks accepted).
+_RETRYABLE_RE = re.compile(r"timeout|server error|50[0234]", re.IGNORECASE)
+
+
+@lru_cache(maxsize=256)
+def _is_retryable_msg(msg: str) -> bool:
+    """_RETRYABLE_RE match, memoized: a failing query repeats its message."""
+    return _RETRYABLE_RE.search(msg) is not None
+
+
+def _make_session() -> requests.Session:
+    """Session with a keep-alive pool sized for one host.
+
+    Requests are rate limited to about one a second, so a handful of pooled
+    connections covers every thread that may be waiting on the limiter.
+    Retries stay in query(), which knows about 429 and body errors.
+    """
+    session = requests.Session()
+    session.trust_env = False
+    adapter = HTTPAdapter(
+        pool_connections=4, pool_maxsize=8, max_retries=0
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# urllib3's pool is thread-safe; the session is shared by every client.
+_SESSION = _make_session()
+
 
 class OverpassRateLimitError(Exception):
     """Raised when Overpass returns 429 or rate-limit indicators after all retries are exhausted."""
 
-    pass
+    retry_after: Optional[float] = None  # seconds, from the Retry-After header
 
 
 class OverpassQueryError(Exception):
     """Raised when Overpass returns a non-retryable error after all retries are exhausted."""
 
-    pass
+    retry_after: Optional[float] = None  # seconds, from the Retry-After header
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Delta-seconds form of Retry-After, or None (HTTP-date is ignored)."""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        return None
+    return seconds if seconds >= 0 else None
+
+
+class _TokenBucket:
+    """Adaptive token bucket shared by every thread using one client.
+
+    acquire() takes a token, sleeping (outside the lock) until one is due;
+    a caller that must wait anyway (retry backoff) passes min_wait so the
+    two delays overlap in a single sleep instead of adding up.
+    on_failure() halves the refill rate down to min_rate after a 429;
+    on_success() wins back a tenth of the base rate per good response.
+    """
+
+    def __init__(self, capacity: float, rate: float, min_rate: float):
+        self.capacity = capacity
+        self.base_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, min_wait: float = 0.0) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            # Going negative reserves a future token, so concurrent callers
+            # queue up at 1/rate intervals without holding the lock.
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        wait = max(wait, min_wait)
+        if wait > 0:
+            time.sleep(wait)
+
+    def on_failure(self) -> None:
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.rate = min(self.base_rate, self.rate + self.base_rate / 10)
 
 
 class OverpassHTTPClient:
     DEFAULT_TIMEOUT = 10  # seconds
-    MIN_SPACING = 1.0  # seconds between HTTP requests
+    RATE_LIMIT = 1.0  # steady-state HTTP requests per second
+    RATE_BURST = 2  # requests allowed back-to-back after an idle spell
+    RATE_FLOOR = 0.25  # requests per second after repeated 429s
     MAX_RETRIES = 2
-    RETRY_BACKOFF = [2, 4]  # seconds
+    RETRY_BASE = 2.0  # seconds; first backoff is drawn from [base, 3*base]
+    MAX_BACKOFF = 30.0  # seconds; also caps a server-sent Retry-After
+    MEMO_TTL = 60.0  # seconds an in-process cache entry is trusted
+    MEMO_MAX = 256  # entries
 
     def __init__(self):
-        self._lock = threading.Lock()
-        self._last_request_time = 0.0
+        self._bucket = _TokenBucket(
+            self.RATE_BURST, self.RATE_LIMIT, self.RATE_FLOOR
+        )
+        # cache_key -> (monotonic stored-at, parsed response).  Hits hand
+        # back the same dict, so callers must treat results as read-only.
+        self._memo: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._memo_lock = threading.Lock()
         self.base_url = os.environ.get(
             "OVERPASS_BASE_URL",
             "https://overpass-api.de/api/interpreter",
         )
-        # Reuse session for TCP/TLS connection pooling across Overpass queries.
-        # requests.Session is thread-safe for concurrent reads.
-        self._session = requests.Session()
-        self._session.trust_env = False
+        # All clients share one session so the TCP/TLS connection survives
+        # across instances (tests and scripts build their own clients).
+        self._session = _SESSION
 
     def query(
         self,
@@ -86,7 +205,8 @@ class OverpassHTTPClient:
             ttl_days: Cache TTL in days for this lookup; None uses default (7 days).
 
         Returns:
-            Parsed JSON response dict from Overpass.
+            Parsed JSON response dict from Overpass.  Repeat lookups may
+            return the same object, so callers must not mutate it.
 
         Raises:
             OverpassRateLimitError: If Overpass returns 429 or rate-limit
@@ -97,17 +217,30 @@ class OverpassHTTPClient:
         if timeout is None:
             timeout = self.DEFAULT_TIMEOUT
 
-        # --- Cache check (no lock needed, no rate limiter engagement) ---
+        # --- Cache check (no rate limiter engagement) ---
         cache_key = overpass_cache_key(overpass_ql)
-        try:
-            cached = get_overpass_cache(cache_key, ttl_days=ttl_days)
-        except Exception:
-            logger.warning(
-                "Overpass cache read failed for key, falling through to HTTP",
-                exc_info=True,
-            )
-            cached = None
-        if cached is not None:
+        data = self._memo_get(cache_key)
+        if data is None:
+            try:
+                cached = get_overpass_cache(cache_key, ttl_days=ttl_days)
+            except Exception:
+                logger.warning(
+                    "Overpass cache read failed for key, falling through to HTTP",
+                    exc_info=True,
+                )
+                cached = None
+            if cached is not None:
+                try:
+                    data = _json_loads(cached)
+                except (json.JSONDecodeError, TypeError):
+                    # Corrupted cache entry — fall through to HTTP
+                    logger.warning(
+                        "Corrupted Overpass cache entry for key %s, falling through to HTTP",
+                        cache_key,
+                    )
+                else:
+                    self._memo_put(cache_key, data)
+        if data is not None:
             trace = get_trace()
             if trace:
                 trace.record_api_call(
@@ -117,24 +250,20 @@ class OverpassHTTPClient:
                     status_code=200,
                     provider_status="cache_hit",
                 )
-            try:
-                return json.loads(cached)
-            except (json.JSONDecodeError, TypeError):
-                # Corrupted cache entry — fall through to HTTP
-                logger.warning(
-                    "Corrupted Overpass cache entry for key %s, falling through to HTTP",
-                    cache_key,
-                )
+            return data
 
         # --- Rate-limited HTTP ---
         try:
             last_exception = None
+            delay = self.RETRY_BASE
+            backoff = 0.0  # slept inside the rate limiter, not here
             for attempt in range(1 + self.MAX_RETRIES):
                 try:
-                    result = self._do_request(overpass_ql, caller, timeout)
+                    result = self._do_request(overpass_ql, caller, timeout, backoff)
                     # Cache on success
+                    self._memo_put(cache_key, result)
                     try:
-                        set_overpass_cache(cache_key, json.dumps(result))
+                        set_overpass_cache(cache_key, _json_dumps(result))
                     except Exception:
                         logger.warning(
                             "Failed to write Overpass cache for key %s",
@@ -145,29 +274,29 @@ class OverpassHTTPClient:
                 except OverpassRateLimitError as e:
                     last_exception = e
                     if attempt < self.MAX_RETRIES:
-                        sleep_time = self.RETRY_BACKOFF[attempt]
+                        delay = self._backoff_delay(e, delay)
                         logger.info(
-                            "Overpass rate limited (attempt %d/%d), sleeping %ds before retry [caller=%s]",
+                            "Overpass rate limited (attempt %d/%d), sleeping %.1fs before retry [caller=%s]",
                             attempt + 1,
                             1 + self.MAX_RETRIES,
-                            sleep_time,
+                            delay,
                             caller,
                         )
-                        time.sleep(sleep_time)
+                        backoff = delay
                         continue
                     raise
                 except OverpassQueryError as e:
                     last_exception = e
                     if attempt < self.MAX_RETRIES and self._is_retryable_error(e):
-                        sleep_time = self.RETRY_BACKOFF[attempt]
+                        delay = self._backoff_delay(e, delay)
                         logger.info(
-                            "Overpass query error (attempt %d/%d), sleeping %ds before retry [caller=%s]",
+                            "Overpass query error (attempt %d/%d), sleeping %.1fs before retry [caller=%s]",
                             attempt + 1,
                             1 + self.MAX_RETRIES,
-                            sleep_time,
+                            delay,
                             caller,
                         )
-                        time.sleep(sleep_time)
+                        backoff = delay
                         continue
                     raise
 
@@ -186,18 +315,50 @@ class OverpassHTTPClient:
         ) as e:
             return self._try_stale_fallback(cache_key, caller, e)
 
+    def _backoff_delay(self, exc: Exception, prev: float) -> float:
+        """Seconds to wait before the next attempt.
+
+        Honors the server's Retry-After when it sent one; otherwise uses
+        decorrelated jitter so workers that hit the same 429 spread out
+        instead of retrying in lockstep.
+        """
+        retry_after = getattr(exc, "retry_after", None)
+        if retry_after is not None:
+            return min(self.MAX_BACKOFF, retry_after)
+        return min(self.MAX_BACKOFF, random.uniform(self.RETRY_BASE, prev * 3))
+
+    # ------------------------------------------------------------------
+    # In-process cache
+    # ------------------------------------------------------------------
+
+    def _memo_get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        with self._memo_lock:
+            entry = self._memo.get(cache_key)
+            if entry is None:
+                return None
+            stored_at, data = entry
+            if time.monotonic() - stored_at > self.MEMO_TTL:
+                del self._memo[cache_key]
+                return None
+            self._memo.move_to_end(cache_key)
+            return data
+
+    def _memo_put(self, cache_key: str, data: Dict[str, Any]) -> None:
+        with self._memo_lock:
+            self._memo[cache_key] = (time.monotonic(), data)
+            self._memo.move_to_end(cache_key)
+            while len(self._memo) > self.MEMO_MAX:
+                self._memo.popitem(last=False)
+
     def _do_request(
-        self, overpass_ql: str, caller: str, timeout: int
+        self, overpass_ql: str, caller: str, timeout: int, backoff: float = 0.0
     ) -> Dict[str, Any]:
-        """Make a single rate-limited HTTP request to Overpass."""
-        # Enforce minimum spacing
-        with self._lock:
-            now = time.monotonic()
-            elapsed_since_last = now - self._last_request_time
-            if elapsed_since_last < self.MIN_SPACING:
-                wait = self.MIN_SPACING - elapsed_since_last
-                time.sleep(wait)
-            self._last_request_time = time.monotonic()
+        """Make a single rate-limited HTTP request to Overpass.
+
+        backoff: minimum seconds to wait first (retry delay); it overlaps
+        with any rate-limiter wait rather than adding to it.
+        """
+        self._bucket.acquire(backoff)
 
         start = time.monotonic()
         trace = get_trace()
@@ -209,9 +370,14 @@ class OverpassHTTPClient:
             )
             elapsed_ms = int((time.monotonic() - start) * 1000)
             status_code = resp.status_code
+            retry_after = (
+                _parse_retry_after(resp.headers.get("Retry-After"))
+                if status_code >= 400 else None
+            )
 
             # Handle HTTP errors (trace each branch with provider_status)
             if status_code == 429:
+                self._bucket.on_failure()
                 if trace:
                     trace.record_api_call(
                         service="overpass",
@@ -220,9 +386,11 @@ class OverpassHTTPClient:
                         status_code=429,
                         provider_status="rate_limit",
                     )
-                raise OverpassRateLimitError(
+                err = OverpassRateLimitError(
                     f"Overpass 429 Too Many Requests [caller={caller}]"
                 )
+                err.retry_after = retry_after
+                raise err
             if status_code == 504:
                 if trace:
                     trace.record_api_call(
@@ -232,9 +400,11 @@ class OverpassHTTPClient:
                         status_code=504,
                         provider_status="timeout",
                     )
-                raise OverpassQueryError(
+                err = OverpassQueryError(
                     f"Overpass 504 Gateway Timeout [caller={caller}]"
                 )
+                err.retry_after = retry_after
+                raise err
             if status_code >= 400:
                 if trace:
                     trace.record_api_call(
@@ -244,13 +414,15 @@ class OverpassHTTPClient:
                         status_code=status_code,
                         provider_status="http_error",
                     )
-                raise OverpassQueryError(
+                err = OverpassQueryError(
                     f"Overpass HTTP {status_code} [caller={caller}]"
                 )
+                err.retry_after = retry_after
+                raise err
 
             # Parse JSON body
             try:
-                data = resp.json()
+                data = _json_loads(resp.content)
             except ValueError:
                 if trace:
                     trace.record_api_call(
@@ -275,6 +447,7 @@ class OverpassHTTPClient:
 
             remark_lower = remark.lower()
             if "too many requests" in remark_lower:
+                self._bucket.on_failure()
                 if trace:
                     trace.record_api_call(
                         service="overpass",
@@ -306,6 +479,8 @@ class OverpassHTTPClient:
                     f"Overpass server error in response body: {remark[:100]} [caller={caller}]"
                 )
 
+            self._bucket.on_success()
+
             # Success — record trace after all validation passed
             if trace:
                 trace.record_api_call(
@@ -385,7 +560,7 @@ class OverpassHTTPClient:
                     caller,
                     created_at,
                 )
-                result = json.loads(json_text)
+                result = _json_loads(json_text)
                 result["_stale"] = True
                 result["_stale_created_at"] = created_at
                 trace = get_trace()
@@ -406,14 +581,7 @@ class OverpassHTTPClient:
     @staticmethod
     def _is_retryable_error(e: OverpassQueryError) -> bool:
         """5xx errors, timeouts, and server body errors are retryable. 4xx are not."""
-        msg = str(e).lower()
-        if "timeout" in msg or "server error" in msg:
-            return True
-        # Match "HTTP 5xx" patterns (500, 502, 503, 504, etc.)
-        for code in ("500", "502", "503", "504"):
-            if code in msg:
-                return True
-        return False
+        return _is_retryable_msg(str(e))
 
 
 # Module-level singleton — all callers in this process share one instance
@@ -27,6 +27,7 @@ import statistics
 from dataclasses import dataclass, field
 from typing import Callable, Optional, List, Tuple, Dict, Any
 from enum import Enum
+import numpy as np
 import requests
 
 logger = logging.getLogger(__name__)
@@ -214,7 +215,7 @@ class CheckResult(Enum):
     UNKNOWN = "UNKNOWN"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Tier1Check:
     name: str
     result: CheckResult
@@ -608,8 +609,54 @@ def _distance_feet(lat1: float, lng1: float, lat2: float, lng2: float) -> int:
     return int(R * c)
 
 
+def _distance_feet_precomp(phi1_rad: float, cos_phi1: float, lng1: float, lat2: float, lng2: float) -> int:
+    """``_distance_feet`` with the fixed endpoint's latitude pre-converted.
+
+    For loops measuring from one point to many: callers compute
+    ``phi1_rad = math.radians(lat1)`` and ``cos_phi1 = math.cos(phi1_rad)`` once.
+    """
+    R = 20902231  # Earth's radius in feet
+    phi2 = math.radians(lat2)
+    a = (math.sin((phi2 - phi1_rad) * 0.5) ** 2
+         + cos_phi1 * math.cos(phi2) * math.sin(math.radians(lng2 - lng1) * 0.5) ** 2)
+    return int(R * 2 * math.asin(math.sqrt(a)))
+
+
+# Below this many resolved nodes the scalar loop beats NumPy's array setup.
+_BATCH_MIN_NODES = 32
+
+
+def _distance_feet_batch(lat0: float, lng0: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Vectorized ``_distance_feet`` from one point to many, in feet.
+
+    Truncates to integer feet like the scalar version so callers comparing
+    against it see the same values.
+    """
+    R = 20902231  # Earth's radius in feet
+    phi1 = math.radians(lat0)
+    phi2 = np.radians(lats)
+    dphi = phi2 - phi1
+    dl = np.radians(lngs - lng0)
+    a = np.sin(dphi * 0.5) ** 2 + math.cos(phi1) * np.cos(phi2) * np.sin(dl * 0.5) ** 2
+    return (2 * R * np.arcsin(np.sqrt(a))).astype(np.int64)
+
+
+# Feet per degree of latitude, rounded down so boxes built from it err wide.
+_FT_PER_DEG_LAT = 364000.0
+
+
+def _bbox_deltas(lat: float, radius_ft: float) -> Tuple[float, float]:
+    """(lat, lng) half-widths in degrees of a box enclosing *radius_ft* around *lat*."""
+    lat_delta = radius_ft / _FT_PER_DEG_LAT
+    return lat_delta, lat_delta / math.cos(math.radians(lat))
+
+
 def _closest_distance_to_way_ft(
-    prop_lat: float, prop_lng: float, way_node_ids: List[int], all_nodes: Dict[int, Tuple[float, float]]
+    prop_lat: float,
+    prop_lng: float,
+    way_node_ids: List[int],
+    all_nodes: Dict[int, Tuple[float, float]],
+    radius_ft: Optional[float] = None,
 ) -> float:
     """Minimum distance in feet from property to any resolved node of a way.
 
@@ -617,16 +664,26 @@ def _closest_distance_to_way_ft(
     *all_nodes* maps node-ID → (lat, lon) for every ``type=node`` element in
     the Overpass response.  Returns ``float('inf')`` when no nodes can be
     resolved (prevents false-positive warnings).
+
+    With *radius_ft*, nodes outside a lat/lng box of that radius are dropped
+    before any haversine, so a way entirely beyond it also returns ``inf``.
     """
-    min_dist = float("inf")
-    for nid in way_node_ids:
-        coords = all_nodes.get(nid)
-        if coords is None:
-            continue
-        d = _distance_feet(prop_lat, prop_lng, coords[0], coords[1])
-        if d < min_dist:
-            min_dist = d
-    return min_dist
+    resolved = [all_nodes[nid] for nid in way_node_ids if nid in all_nodes]
+    if radius_ft is not None:
+        lat_delta, lng_delta = _bbox_deltas(prop_lat, radius_ft)
+        resolved = [
+            c for c in resolved
+            if abs(c[0] - prop_lat) <= lat_delta and abs(c[1] - prop_lng) <= lng_delta
+        ]
+    if not resolved:
+        return float("inf")
+    if len(resolved) >= _BATCH_MIN_NODES:
+        lats = np.fromiter((c[0] for c in resolved), dtype=np.float64, count=len(resolved))
+        lngs = np.fromiter((c[1] for c in resolved), dtype=np.float64, count=len(resolved))
+        return int(_distance_feet_batch(prop_lat, prop_lng, lats, lngs).min())
+    phi1 = math.radians(prop_lat)
+    cphi1 = math.cos(phi1)
+    return min(_distance_feet_precomp(phi1, cphi1, prop_lng, lat, lng) for lat, lng in resolved)
 
 
 def _log_venue_cache(
@@ -745,18 +802,18 @@ class GoogleMapsClient:
 
     def _traced_get(self, endpoint_name: str, url: str, params: dict) -> dict:
         """GET request with automatic trace recording."""
-        t0 = time.time()
+        t0 = time.monotonic()
         _timeout = self._ENDPOINT_TIMEOUTS.get(endpoint_name, self.DEFAULT_TIMEOUT)
         try:
             response = self.session.get(url, params=params, timeout=_timeout)
         except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as exc:
-            elapsed_ms = int((time.time() - t0) * 1000)
+            elapsed_ms = int((time.monotonic() - t0) * 1000)
             logger.warning(
                 "API timeout: endpoint=%s elapsed_ms=%d timeout=%ds address=%s",
                 endpoint_name, elapsed_ms, _timeout, self._source_address,
             )
             raise
-        elapsed_ms = int((time.time() - t0) * 1000)
+        elapsed_ms = int((time.monotonic() - t0) * 1000)
         data = response.json()
         provider_status = data.get("status", "") if isinstance(data, dict) else ""
         trace = get_trace()
@@ -844,11 +901,11 @@ class GoogleMapsClient:
             try:
                 cat = _PLACE_TYPE_TO_CATEGORY.get(place_type, place_type)
                 ttl = _VENUE_CACHE_TTL_DAYS.get(cat, _VENUE_CACHE_TTL_DEFAULT)
-                t0 = time.time()
+                t0 = time.monotonic()
                 cached_venues = self._venue_cache.query_venues(
                     lat, lng, cat, radius_meters, max_age_days=ttl
                 )
-                elapsed_ms = int((time.time() - t0) * 1000)
+                elapsed_ms = int((time.monotonic() - t0) * 1000)
                 trace = get_trace()
                 if cached_venues is not None:
                     self._places_cache[cache_key] = cached_venues
@@ -1047,11 +1104,11 @@ class GoogleMapsClient:
                     ttl = _VENUE_CACHE_TTL_DAYS.get(
                         cat, _VENUE_CACHE_TTL_DEFAULT
                     )
-                    t0 = time.time()
+                    t0 = time.monotonic()
                     cached_venues = self._venue_cache.query_venues(
                         lat, lng, cat, radius_meters, max_age_days=ttl
                     )
-                    elapsed_ms = int((time.time() - t0) * 1000)
+                    elapsed_ms = int((time.monotonic() - t0) * 1000)
                     trace = get_trace()
                     if cached_venues is not None:
                         self._text_search_cache[cache_key] = cached_venues
@@ -1385,11 +1442,11 @@ def get_bike_score(address: str, lat: float, lon: float) -> Dict[str, Optional[A
     }
 
     try:
-        _t0 = time.time()
+        _t0 = time.monotonic()
         response = requests.get(url, params=params, timeout=8)
         response.raise_for_status()
         data = response.json()
-        _elapsed = int((time.time() - _t0) * 1000)
+        _elapsed = int((time.monotonic() - _t0) * 1000)
         _trace = get_trace()
         if _trace:
             _trace.record_api_call(
@@ -1400,7 +1457,7 @@ def get_bike_score(address: str, lat: float, lon: float) -> Dict[str, Optional[A
     except (requests.RequestException, ValueError) as exc:
         logger.warning(
             "API timeout: endpoint=walkscore_bike elapsed_ms=%d address=%s error=%s",
-            int((time.time() - _t0) * 1000), address, type(exc).__name__,
+            int((time.monotonic() - _t0) * 1000), address, type(exc).__name__,
         )
         return {"bike_score": None, "bike_rating": None, "bike_metadata": None}
 
@@ -1447,11 +1504,11 @@ def get_transit_score(address: str, lat: float, lon: float) -> Dict[str, Any]:
     }
 
     try:
-        _t0 = time.time()
+        _t0 = time.monotonic()
         response = requests.get(url, params=params, timeout=8)
         response.raise_for_status()
         data = response.json()
-        _elapsed = int((time.time() - _t0) * 1000)
+        _elapsed = int((time.monotonic() - _t0) * 1000)
         _trace = get_trace()
         if _trace:
             _trace.record_api_call(
@@ -1462,7 +1519,7 @@ def get_transit_score(address: str, lat: float, lon: float) -> Dict[str, Any]:
     except (requests.RequestException, ValueError) as exc:
         logger.warning(
             "API timeout: endpoint=walkscore_transit elapsed_ms=%d address=%s error=%s",
-            int((time.time() - _t0) * 1000), address, type(exc).__name__,
+            int((time.monotonic() - _t0) * 1000), address, type(exc).__name__,
         )
         return default_response
 
@@ -1535,11 +1592,11 @@ def get_walk_scores(address: str, lat: float, lon: float) -> Dict[str, Optional[
     }
 
     try:
-        _t0 = time.time()
+        _t0 = time.monotonic()
         response = requests.get(url, params=params, timeout=8)
         response.raise_for_status()
         data = response.json()
-        _elapsed = int((time.time() - _t0) * 1000)
+        _elapsed = int((time.monotonic() - _t0) * 1000)
         _trace = get_trace()
         if _trace:
             _trace.record_api_call(
@@ -1550,7 +1607,7 @@ def get_walk_scores(address: str, lat: float, lon: float) -> Dict[str, Optional[
     except (requests.RequestException, ValueError) as exc:
         logger.warning(
             "API timeout: endpoint=walkscore_walk elapsed_ms=%d address=%s error=%s",
-            int((time.time() - _t0) * 1000), address, type(exc).__name__,
+            int((time.monotonic() - _t0) * 1000), address, type(exc).__name__,
         )
         return default_scores
 
@@ -1981,6 +2038,13 @@ def _high_traffic_result(result: CheckResult, segment) -> Tier1Check:
 # ENVIRONMENTAL HEALTH PROXIMITY CHECKS (NES-57)
 # =============================================================================
 
+# One integer per semicolon-separated slot, in the forms int() accepts on
+# the stripped slot: an optional "+" and "_" digit grouping ("+115000",
+# "115_000").  Slots like "bad" or "115kV" are skipped.  Negative values
+# are not matched; they could never beat the 0 default anyway.
+_VOLTAGE_RE = re.compile(r"(?:^|;)\s*(\+?\d+(?:_\d+)*)\s*(?=;|$)")
+
+
 def _parse_max_voltage(voltage_str: str) -> int:
     """Parse an OSM voltage tag, returning the maximum value in volts.
 
@@ -1991,16 +2055,7 @@ def _parse_max_voltage(voltage_str: str) -> int:
     """
     if not voltage_str:
         return 0
-    max_v = 0
-    for part in voltage_str.split(";"):
-        part = part.strip()
-        try:
-            v = int(part)
-            if v > max_v:
-                max_v = v
-        except (ValueError, TypeError):
-            continue
-    return max_v
+    return max((int(v) for v in _VOLTAGE_RE.findall(voltage_str)), default=0)
 
 
 # =============================================================================
@@ -2124,6 +2179,13 @@ def _check_ejscreen_indicators(
     return checks
 
 
+# The hazard query centre is rounded to 3 decimals (~111 m grid) so
+# neighbouring addresses produce the same query text and share an Overpass
+# cache entry.  The radius is padded by the worst-case rounding offset (half a
+# cell diagonal, < 80 m) so everything within 200 m of the property is kept.
+_HAZARD_RADIUS_M = 200 + 80
+
+
 def _query_environmental_hazards(lat: float, lng: float) -> Optional[Dict[str, List[Dict]]]:
     """Query Overpass for environmental health hazards near a property.
 
@@ -2133,16 +2195,17 @@ def _query_environmental_hazards(lat: float, lng: float) -> Optional[Dict[str, L
 
     Returns None on any failure so check functions can fall back to UNKNOWN.
     """
+    around = f"around:{_HAZARD_RADIUS_M},{round(lat, 3)},{round(lng, 3)}"
     query = f"""
     [out:json][timeout:10];
     (
-      way["power"="line"](around:200,{lat},{lng});
-      node["power"="substation"](around:200,{lat},{lng});
-      way["power"="substation"](around:200,{lat},{lng});
-      node["man_made"="mast"]["communication:mobile_phone"="yes"](around:200,{lat},{lng});
-      node["man_made"="tower"]["tower:type"="communication"](around:200,{lat},{lng});
-      node["man_made"="communications_tower"](around:200,{lat},{lng});
-      way["landuse"="industrial"](around:200,{lat},{lng});
+      way["power"="line"]({around});
+      node["power"="substation"]({around});
+      way["power"="substation"]({around});
+      node["man_made"="mast"]["communication:mobile_phone"="yes"]({around});
+      node["man_made"="tower"]["tower:type"="communication"]({around});
+      node["man_made"="communications_tower"]({around});
+      way["landuse"="industrial"]({around});
     );
     out body;
     >;
@@ -2216,13 +2279,25 @@ def _query_environmental_hazards(lat: float, lng: float) -> Optional[Dict[str, L
 
 
 def _element_distance_ft(
-    prop_lat: float, prop_lng: float, el: Dict, all_nodes: Dict[int, Tuple[float, float]]
+    prop_lat: float,
+    prop_lng: float,
+    el: Dict,
+    all_nodes: Dict[int, Tuple[float, float]],
+    radius_ft: Optional[float] = None,
 ) -> float:
-    """Distance in feet from property to an Overpass element (node or way)."""
+    """Distance in feet from property to an Overpass element (node or way).
+
+    With *radius_ft*, anything outside a lat/lng box of that radius is
+    reported as ``inf`` without computing a haversine.
+    """
     if el.get("type") == "node" and "lat" in el and "lon" in el:
+        if radius_ft is not None:
+            lat_delta, lng_delta = _bbox_deltas(prop_lat, radius_ft)
+            if abs(el["lat"] - prop_lat) > lat_delta or abs(el["lon"] - prop_lng) > lng_delta:
+                return float("inf")
         return float(_distance_feet(prop_lat, prop_lng, el["lat"], el["lon"]))
     if el.get("type") == "way" and "nodes" in el:
-        return _closest_distance_to_way_ft(prop_lat, prop_lng, el["nodes"], all_nodes)
+        return _closest_distance_to_way_ft(prop_lat, prop_lng, el["nodes"], all_nodes, radius_ft)
     return float("inf")
 
 
@@ -2304,7 +2379,7 @@ def check_power_lines(
     all_nodes = hazard_results.get("_all_nodes", {})
     min_dist = float("inf")
     for el in hazard_results.get("power_lines", []):
-        d = _element_distance_ft(lat, lng, el, all_nodes)
+        d = _element_distance_ft(lat, lng, el, all_nodes, POWER_LINE_WARNING_DISTANCE_FT)
         if d < min_dist:
             min_dist = d
 
@@ -2344,7 +2419,7 @@ def check_substations(
     all_nodes = hazard_results.get("_all_nodes", {})
     min_dist = float("inf")
     for el in hazard_results.get("substations", []):
-        d = _element_distance_ft(prop_lat, prop_lng, el, all_nodes)
+        d = _element_distance_ft(prop_lat, prop_lng, el, all_nodes, SUBSTATION_WARNING_DISTANCE_FT)
         if d < min_dist:
             min_dist = d
 
@@ -2383,7 +2458,7 @@ def check_cell_towers(
     all_nodes = hazard_results.get("_all_nodes", {})
     min_dist = float("inf")
     for el in hazard_results.get("cell_towers", []):
-        d = _element_distance_ft(prop_lat, prop_lng, el, all_nodes)
+        d = _element_distance_ft(prop_lat, prop_lng, el, all_nodes, CELL_TOWER_WARNING_DISTANCE_FT)
         if d < min_dist:
             min_dist = d
 
@@ -2489,7 +2564,7 @@ def check_industrial_zones(
     all_nodes = hazard_results.get("_all_nodes", {})
     min_dist = float("inf")
     for el in hazard_results.get("industrial_zones", []):
-        d = _element_distance_ft(lat, lng, el, all_nodes)
+        d = _element_distance_ft(lat, lng, el, all_nodes, INDUSTRIAL_ZONE_WARNING_DISTANCE_FT)
         if d < min_dist:
             min_dist = d
 
@@ -3303,107 +3378,48 @@ def get_nearby_schools(
         return None
 
 
+# Yes/no amenities: (check name, listing attribute, detail if yes, detail if no)
+_LISTING_AMENITY_CHECKS = (
+    ("W/D in unit", "has_washer_dryer_in_unit", "Washer/dryer in unit confirmed", "No washer/dryer in unit"),
+    ("Central air", "has_central_air", "Central air confirmed", "No central air"),
+)
+
+# Numeric minimums: (check name, listing attribute, minimum, detail if unknown,
+# format for a value with its unit)
+_LISTING_MINIMUM_CHECKS = (
+    ("Size", "sqft", MIN_SQFT, "Square footage not specified", "{:,} sq ft"),
+    ("Bedrooms", "bedrooms", MIN_BEDROOMS, "Bedroom count not specified", "{} BR"),
+)
+
+
 def check_listing_requirements(listing: PropertyListing) -> List[Tier1Check]:
     """Check listing-based requirements (W/D, AC, size, etc.)"""
     checks = []
     is_required = False
-    
-    # Washer/dryer
-    if listing.has_washer_dryer_in_unit is None:
-        checks.append(Tier1Check(
-            name="W/D in unit",
-            result=CheckResult.UNKNOWN,
-            details="Not specified - verify manually",
-            required=is_required
-        ))
-    elif listing.has_washer_dryer_in_unit:
-        checks.append(Tier1Check(
-            name="W/D in unit",
-            result=CheckResult.PASS,
-            details="Washer/dryer in unit confirmed",
-            required=is_required
-        ))
-    else:
-        checks.append(Tier1Check(
-            name="W/D in unit",
-            result=CheckResult.FAIL,
-            details="No washer/dryer in unit",
-            required=is_required
-        ))
-    
-    # Central air
-    if listing.has_central_air is None:
-        checks.append(Tier1Check(
-            name="Central air",
-            result=CheckResult.UNKNOWN,
-            details="Not specified - verify manually",
-            required=is_required
-        ))
-    elif listing.has_central_air:
-        checks.append(Tier1Check(
-            name="Central air",
-            result=CheckResult.PASS,
-            details="Central air confirmed",
-            required=is_required
-        ))
-    else:
-        checks.append(Tier1Check(
-            name="Central air",
-            result=CheckResult.FAIL,
-            details="No central air",
-            required=is_required
-        ))
-    
-    # Size
-    if listing.sqft is None:
-        checks.append(Tier1Check(
-            name="Size",
-            result=CheckResult.UNKNOWN,
-            details="Square footage not specified",
-            required=is_required
-        ))
-    elif listing.sqft >= MIN_SQFT:
-        checks.append(Tier1Check(
-            name="Size",
-            result=CheckResult.PASS,
-            details=f"{listing.sqft:,} sq ft",
-            value=listing.sqft,
-            required=is_required
-        ))
-    else:
-        checks.append(Tier1Check(
-            name="Size",
-            result=CheckResult.FAIL,
-            details=f"{listing.sqft:,} sq ft < {MIN_SQFT:,} sq ft minimum",
-            value=listing.sqft,
-            required=is_required
-        ))
-    
-    # Bedrooms
-    if listing.bedrooms is None:
-        checks.append(Tier1Check(
-            name="Bedrooms",
-            result=CheckResult.UNKNOWN,
-            details="Bedroom count not specified",
-            required=is_required
-        ))
-    elif listing.bedrooms >= MIN_BEDROOMS:
-        checks.append(Tier1Check(
-            name="Bedrooms",
-            result=CheckResult.PASS,
-            details=f"{listing.bedrooms} BR",
-            value=listing.bedrooms,
-            required=is_required
-        ))
-    else:
+
+    for name, attr, yes_details, no_details in _LISTING_AMENITY_CHECKS:
+        has_it = getattr(listing, attr)
+        if has_it is None:
+            result, details = CheckResult.UNKNOWN, "Not specified - verify manually"
+        elif has_it:
+            result, details = CheckResult.PASS, yes_details
+        else:
+            result, details = CheckResult.FAIL, no_details
+        checks.append(Tier1Check(name=name, result=result, details=details, required=is_required))
+
+    for name, attr, minimum, unknown_details, unit_fmt in _LISTING_MINIMUM_CHECKS:
+        value = getattr(listing, attr)
+        if value is None:
+            result, details = CheckResult.UNKNOWN, unknown_details
+        elif value >= minimum:
+            result, details = CheckResult.PASS, unit_fmt.format(value)
+        else:
+            result = CheckResult.FAIL
+            details = f"{unit_fmt.format(value)} < {unit_fmt.format(minimum)} minimum"
         checks.append(Tier1Check(
-            name="Bedrooms",
-            result=CheckResult.FAIL,
-            details=f"{listing.bedrooms} BR < {MIN_BEDROOMS} BR minimum",
-            value=listing.bedrooms,
-            required=is_required
+            name=name, result=result, details=details, value=value, required=is_required
         ))
-    
+
     # Cost tier1 check removed — users never provide listing cost data.
     # Reintroduce when we support listing-data input.
 
@@ -3647,9 +3663,9 @@ def get_child_and_schooling_snapshot(
         if not website:
             return ""
         try:
-            _t0 = time.time()
+            _t0 = time.monotonic()
             response = requests.get(website, timeout=6)
-            _elapsed = int((time.time() - _t0) * 1000)
+            _elapsed = int((time.monotonic() - _t0) * 1000)
             _trace = get_trace()
             if _trace:
                 _trace.record_api_call(
@@ -6120,10 +6136,10 @@ def _timed_stage(stage_name, fn, *args, on_stage_complete=None, **kwargs):
     trace = get_trace()
     if trace:
         trace.start_stage(stage_name)
-    t0 = time.time()
+    t0 = time.monotonic()
     try:
         result = fn(*args, **kwargs)
-        t1 = time.time()
+        t1 = time.monotonic()
         if trace:
             trace.record_stage(stage_name, t0, t1)
         else:
@@ -6132,7 +6148,7 @@ def _timed_stage(stage_name, fn, *args, on_stage_complete=None, **kwargs):
             on_stage_complete(stage_name, t1 - t0)
         return result
     except Exception as exc:
-        t1 = time.time()
+        t1 = time.monotonic()
         if trace:
             trace.record_stage(
                 stage_name, t0, t1,
@@ -6177,7 +6193,7 @@ def evaluate_property(
         _notify(stage_name)
         return _timed_stage(stage_name, fn, *args, on_stage_complete=on_stage_complete, **kwargs)
 
-    eval_start = time.time()
+    eval_start = time.monotonic()
 
     _venue_cache = VenueCache()
     _walk_time_cache = WalkTimeCache()
@@ -6324,7 +6340,7 @@ def evaluate_property(
     trace = get_trace()
     if trace:
         trace.start_stage("tier1_checks")
-    _t0_tier1 = time.time()
+    _t0_tier1 = time.monotonic()
 
     # Location-based checks (local SpatiaLite where available)
     _spatial_store = SpatialDataStore()
@@ -6435,7 +6451,7 @@ def evaluate_property(
     result.tier1_checks.extend(check_listing_requirements(listing))
 
     if trace:
-        trace.record_stage("tier1_checks", _t0_tier1, time.time())
+        trace.record_stage("tier1_checks", _t0_tier1, time.monotonic())
 
     # Determine if passed tier 1
     fail_count = sum(
@@ -6568,7 +6584,7 @@ def evaluate_property(
     result.final_score = min(100, result.tier2_normalized + result.tier3_total)
     result.percentile_top, result.percentile_label = estimate_percentile(result.final_score)
 
-    elapsed_total = time.time() - eval_start
+    elapsed_total = time.monotonic() - eval_start
     logger.info("Evaluation complete for %r  score=%d  (%.1fs total)",
                 listing.address, result.final_score, elapsed_total)
 
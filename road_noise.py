@@ -21,10 +21,14 @@ Limitations:
 import logging
 import math
 import time
-from dataclasses import dataclass, field
+from bisect import bisect_right
+from dataclasses import dataclass
 from enum import Enum
+from functools import cached_property
 from typing import Optional, List, Tuple
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
@@ -79,6 +83,10 @@ SEVERITY_THRESHOLDS = [
 ]
 # Below 55 → QUIET
 
+# Ascending cut points and the band each bisect index maps to
+_SEVERITY_CUTS = [threshold for threshold, _ in reversed(SEVERITY_THRESHOLDS)]
+_SEVERITY_BANDS = [NoiseSeverity.QUIET] + [sev for _, sev in reversed(SEVERITY_THRESHOLDS)]
+
 SEVERITY_LABELS = {
     NoiseSeverity.VERY_LOUD: (
         "Very Loud \u2014 potential health impact, equivalent to "
@@ -107,14 +115,29 @@ METHODOLOGY_NOTE = (
 # DATA CLASSES
 # =============================================================================
 
-@dataclass
+@dataclass(frozen=True)
 class RoadSegment:
     """Internal representation of a road with geometry for distance calculation."""
     name: str
     ref: str
     highway_type: str
     lanes: int
-    nodes: List[Tuple[float, float]]  # list of (lat, lng) pairs
+    nodes: Tuple[Tuple[float, float], ...]  # (lat, lng) pairs
+
+    def __post_init__(self):
+        # Store nodes as a tuple so the cached coordinate arrays below can
+        # never drift from it.
+        object.__setattr__(self, "nodes", tuple(self.nodes))
+
+    @cached_property
+    def lats(self) -> np.ndarray:
+        """Node latitudes as a float64 array, for the vectorized scan."""
+        return np.fromiter((lat for lat, _ in self.nodes), dtype=np.float64, count=len(self.nodes))
+
+    @cached_property
+    def lngs(self) -> np.ndarray:
+        """Node longitudes as a float64 array, for the vectorized scan."""
+        return np.fromiter((lng for _, lng in self.nodes), dtype=np.float64, count=len(self.nodes))
 
 
 @dataclass
@@ -159,60 +182,108 @@ def _nearest_point_on_segment(
 ) -> Tuple[float, float]:
     """Return the closest point on segment A→B to point P.
 
-    Uses vector projection.  Works on lat/lng directly — at the scale
-    we operate (< 500 m), the planar approximation is sufficient.
+    Uses vector projection in a planar frame.  Callers pass lat/lng with
+    longitudes scaled by cos(latitude) (equirectangular), which at the scale
+    we operate (< 500 m) is effectively exact.
     """
     abx = bx - ax
     aby = by - ay
-    apx = px - ax
-    apy = py - ay
 
     ab_dot_ab = abx * abx + aby * aby
-    if ab_dot_ab == 0:
-        # Degenerate segment (A == B)
-        return (ax, ay)
-
-    t = (apx * abx + apy * aby) / ab_dot_ab
-    t = max(0.0, min(1.0, t))
+    # Degenerate segment (A == B) projects to A
+    t = ((px - ax) * abx + (py - ay) * aby) / ab_dot_ab if ab_dot_ab else 0.0
+    # Clamp inline; max()/min() calls cost more than the whole projection
+    if t < 0.0:
+        t = 0.0
+    elif t > 1.0:
+        t = 1.0
 
     return (ax + t * abx, ay + t * aby)
 
 
+# Polylines with at least this many nodes are scanned with NumPy; below it the
+# per-segment loop is cheaper than building the arrays.
+_VECTORIZE_MIN_NODES = 32
+
+
+def _nearest_distance_to_road_ft_vec(
+    prop_lat: float, prop_lng: float, road: RoadSegment
+) -> float:
+    """NumPy version of the segment scan in ``_nearest_distance_to_road_ft``."""
+    k = math.cos(math.radians(prop_lat))
+    lats, lngs = road.lats, road.lngs
+    # Equirectangular frame with the property at the origin
+    ax = lats[:-1] - prop_lat
+    ay = (lngs[:-1] - prop_lng) * k
+    abx = np.diff(lats)
+    aby = np.diff(lngs) * k
+
+    ab_dot_ab = abx * abx + aby * aby
+    ap_dot_ab = -(ax * abx + ay * aby)
+    # Degenerate segments (A == B) project to A
+    t = np.divide(ap_dot_ab, ab_dot_ab, out=np.zeros_like(ab_dot_ab), where=ab_dot_ab != 0)
+    np.clip(t, 0.0, 1.0, out=t)
+
+    fx = ax + t * abx
+    fy = ay + t * aby
+    i = int(np.argmin(fx * fx + fy * fy))
+    return _haversine_ft(prop_lat, prop_lng, prop_lat + fx[i], prop_lng + fy[i] / k)
+
+
 def _nearest_distance_to_road_ft(
     prop_lat: float, prop_lng: float, road: RoadSegment
 ) -> float:
-    """Minimum distance from property to any segment of the road polyline."""
-    min_dist = float("inf")
+    """Minimum distance from property to any segment of the road polyline.
+
+    Segments are compared in a local equirectangular frame (longitude scaled
+    by cos of the property latitude); only the nearest foot is measured with
+    haversine.
+    """
     nodes = road.nodes
+    if len(nodes) < 2:
+        return float("inf")
+    if len(nodes) >= _VECTORIZE_MIN_NODES:
+        return _nearest_distance_to_road_ft_vec(prop_lat, prop_lng, road)
+
+    k = math.cos(math.radians(prop_lat))
+    px, py = prop_lat, prop_lng * k
+    best_d2 = float("inf")
+    best_x = best_y = 0.0
 
     for i in range(len(nodes) - 1):
         a_lat, a_lng = nodes[i]
         b_lat, b_lng = nodes[i + 1]
 
-        nearest_lat, nearest_lng = _nearest_point_on_segment(
-            prop_lat, prop_lng, a_lat, a_lng, b_lat, b_lng,
-        )
-        dist = _haversine_ft(prop_lat, prop_lng, nearest_lat, nearest_lng)
+        fx, fy = _nearest_point_on_segment(px, py, a_lat, a_lng * k, b_lat, b_lng * k)
+        d2 = (fx - px) ** 2 + (fy - py) ** 2
 
-        if dist < min_dist:
-            min_dist = dist
+        if d2 < best_d2:
+            best_d2 = d2
+            best_x, best_y = fx, fy
 
-    return min_dist
+    return _haversine_ft(prop_lat, prop_lng, best_x, best_y / k)
 
 
 # =============================================================================
 # NOISE ESTIMATION
 # =============================================================================
 
+def _reference_dba(road: RoadSegment) -> float:
+    """FHWA reference dBA at 50 ft for this road, including the lane bonus.
+
+    This is also the loudest the road can be at any distance.
+    """
+    lane_bonus = max(0, (road.lanes - 2)) * LANE_ADJUSTMENT_DBA
+    return FHWA_REFERENCE_DBA[road.highway_type] + lane_bonus
+
+
 def _estimate_noise_dba(road: RoadSegment, distance_ft: float) -> float:
     """Estimate noise level at the property from a single road.
 
     Uses FHWA reference dBA at 50 ft with lane adjustment and
     logarithmic distance decay.
     """
-    base_dba = FHWA_REFERENCE_DBA[road.highway_type]
-    lane_bonus = max(0, (road.lanes - 2)) * LANE_ADJUSTMENT_DBA
-    reference_dba = base_dba + lane_bonus
+    reference_dba = _reference_dba(road)
 
     if distance_ft <= REFERENCE_DISTANCE_FT:
         return reference_dba
@@ -223,10 +294,9 @@ def _estimate_noise_dba(road: RoadSegment, distance_ft: float) -> float:
 
 def _classify_severity(dba: float) -> Tuple[NoiseSeverity, str]:
     """Map estimated dBA to a severity level and human-readable label."""
-    for threshold, severity in SEVERITY_THRESHOLDS:
-        if dba >= threshold:
-            return severity, SEVERITY_LABELS[severity]
-    return NoiseSeverity.QUIET, SEVERITY_LABELS[NoiseSeverity.QUIET]
+    # bisect_right puts a value equal to a cut point in the band above it (>=)
+    severity = _SEVERITY_BANDS[bisect_right(_SEVERITY_CUTS, dba)]
+    return severity, SEVERITY_LABELS[severity]
 
 
 # =============================================================================
@@ -341,6 +411,10 @@ def assess_road_noise(
     worst_distance = 0.0
 
     for road in roads:
+        # A road can't beat the current worst if even its 50 ft level doesn't;
+        # skip its geometry scan.
+        if _reference_dba(road) <= worst_dba:
+            continue
         distance = _nearest_distance_to_road_ft(lat, lng, road)
         dba = _estimate_noise_dba(road, distance)
 
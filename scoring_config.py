@@ -9,9 +9,12 @@ Frozen dataclasses provide type checking and IDE support without
 the indirection of YAML/JSON config files.
 """
 
+from bisect import bisect_left
 from dataclasses import dataclass, field
 from typing import Dict, List, Tuple, Optional
 
+import numpy as np
+
 
 # =============================================================================
 # Dataclasses
@@ -204,6 +207,61 @@ class ScoringModel:
 # Pure scoring functions
 # =============================================================================
 
+@dataclass(frozen=True, eq=False)
+class _KnotTable:
+    """Unpacked knot values for one curve, in scalar and array form.
+
+    ``slopes[i]`` is the slope from knot *i* to knot *i + 1*; zero-width
+    segments get 0.0 since neither evaluator interpolates across them.
+    """
+    xs: Tuple[float, ...]
+    ys: Tuple[float, ...]
+    slopes: Tuple[float, ...]
+    xs_arr: np.ndarray
+    ys_arr: np.ndarray
+    slopes_arr: np.ndarray
+
+
+# Knot tuples are module-level constants, so each curve is unpacked once.
+# Lookups go by id() plus an identity check instead of hashing the tuple,
+# which would run PiecewiseKnot.__hash__ for every knot on every call.
+# Entries hold their tuple so an id() can't be reused while cached, and the
+# dict is capped (oldest evicted first) so temporary tuples built by
+# callers and tests are not kept alive indefinitely.
+_KNOT_CACHE_SIZE = 32
+_KNOT_TABLES: Dict[int, Tuple[Tuple[PiecewiseKnot, ...], _KnotTable]] = {}
+
+
+def _knot_table(knots: Tuple[PiecewiseKnot, ...]) -> _KnotTable:
+    """Return the cached _KnotTable for *knots*, building it on first use."""
+    entry = _KNOT_TABLES.get(id(knots))
+    if entry is not None and entry[0] is knots:
+        return entry[1]
+    table = _build_knot_table(knots)
+    if len(_KNOT_TABLES) >= _KNOT_CACHE_SIZE:
+        del _KNOT_TABLES[next(iter(_KNOT_TABLES))]
+    _KNOT_TABLES[id(knots)] = (knots, table)
+    return table
+
+
+def _build_knot_table(knots: Tuple[PiecewiseKnot, ...]) -> _KnotTable:
+    """Unpack *knots* into a _KnotTable."""
+    xs = tuple(k.x for k in knots)
+    ys = tuple(k.y for k in knots)
+    slopes = tuple(
+        (y1 - y0) / (x1 - x0) if x1 != x0 else 0.0
+        for x0, x1, y0, y1 in zip(xs, xs[1:], ys, ys[1:])
+    )
+    return _KnotTable(
+        xs=xs,
+        ys=ys,
+        slopes=slopes,
+        xs_arr=np.array(xs, dtype=float),
+        ys_arr=np.array(ys, dtype=float),
+        slopes_arr=np.array(slopes, dtype=float),
+    )
+
+
 def apply_piecewise(knots: Tuple[PiecewiseKnot, ...], x: float) -> float:
     """Evaluate a piecewise linear curve at *x*.
 
@@ -214,29 +272,49 @@ def apply_piecewise(knots: Tuple[PiecewiseKnot, ...], x: float) -> float:
     """
     if not knots:
         raise ValueError("knots must not be empty")
+    table = _knot_table(knots)
+    xs, ys, slopes = table.xs, table.ys, table.slopes
 
     # Before first knot — clamp
-    if x <= knots[0].x:
-        return knots[0].y
+    if x <= xs[0]:
+        return ys[0]
 
     # After last knot — clamp
-    if x >= knots[-1].x:
-        return knots[-1].y
-
-    # Walk the knots to find the surrounding pair
-    for i in range(1, len(knots)):
-        if x <= knots[i].x:
-            k0 = knots[i - 1]
-            k1 = knots[i]
-            # Avoid division by zero for duplicate x values
-            dx = k1.x - k0.x
-            if dx == 0:
-                return k1.y
-            t = (x - k0.x) / dx
-            return k0.y + t * (k1.y - k0.y)
-
-    # Shouldn't reach here, but clamp to last value for safety
-    return knots[-1].y
+    if x >= xs[-1]:
+        return ys[-1]
+
+    # First knot with xs[i] >= x; the clamps above guarantee 1 <= i < len(xs)
+    # and xs[i - 1] < x, so the pair never has a zero-width span.  Anchoring
+    # on the right-hand knot keeps exact knot hits exact.
+    i = bisect_left(xs, x)
+    return ys[i] + (x - xs[i]) * slopes[i - 1]
+
+
+def apply_piecewise_batch(
+    knots: Tuple[PiecewiseKnot, ...],
+    xs: np.ndarray,
+) -> np.ndarray:
+    """Evaluate a piecewise linear curve at every value in *xs*.
+
+    Array counterpart of apply_piecewise() for sweeps over many inputs:
+    same interpolation and clamping, computed in one vectorized pass.
+
+    Requires at least one knot.
+    """
+    if not knots:
+        raise ValueError("knots must not be empty")
+    table = _knot_table(knots)
+    x = np.asarray(xs, dtype=float)
+    if len(table.xs) == 1:
+        return np.full(x.shape, table.ys[0])
+
+    # Same bracketing as the scalar path: first knot with xs[i] >= x, so a
+    # shared x resolves to the lower segment.  Out-of-range indices are
+    # clipped here and overwritten by the clamps below.
+    i = np.clip(np.searchsorted(table.xs_arr, x, side="left"), 1, len(table.xs) - 1)
+    out = table.ys_arr[i] + (x - table.xs_arr[i]) * table.slopes_arr[i - 1]
+    out = np.where(x <= table.xs_arr[0], table.ys_arr[0], out)
+    return np.where(x >= table.xs_arr[-1], table.ys_arr[-1], out)
 
 
 def apply_quality_multiplier(
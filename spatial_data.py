@@ -71,6 +71,11 @@ if sys.platform == "darwin":
                 break
 
 
+# DB paths whose SpatiaLite probe has succeeded in this process.  Only
+# successes are remembered so a DB ingested after startup is still picked up.
+_PROBED_OK: set = set()
+
+
 def _connect() -> sqlite3.Connection:
     """Open a SpatiaLite-enabled connection."""
     conn = sqlite3.connect(_spatial_db_path())
@@ -89,7 +94,7 @@ def _connect() -> sqlite3.Connection:
     )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FacilityRecord:
     """A spatial record returned from proximity queries."""
 
@@ -137,8 +142,10 @@ class SpatialDataStore:
                 )
                 self._available = False
                 return False
-            conn = _connect()
-            conn.close()
+            if db_path not in _PROBED_OK:
+                conn = _connect()
+                conn.close()
+                _PROBED_OK.add(db_path)
             self._available = True
             return True
         except Exception as e:
@@ -214,7 +221,7 @@ class SpatialDataStore:
         except Exception:
             pass
 
-        t0 = time.time()
+        t0 = time.monotonic()
         table_name = _validate_facility_type(facility_type)
         if table_name is None:
             return []
@@ -291,7 +298,7 @@ class SpatialDataStore:
             logger.warning("Spatial query failed for %s: %s", facility_type, e)
             return []
         finally:
-            t1 = time.time()
+            t1 = time.monotonic()
             elapsed_ms = int((t1 - t0) * 1000)
             if trace:
                 trace.record_api_call(
@@ -10,11 +10,23 @@ import tempfile
 
 import pytest
 
-# Point the DB at a temp file BEFORE importing app/models (they read DB_PATH at import time)
-_test_db_fd, _test_db_path = tempfile.mkstemp(suffix=".db")
+# Point the DB at a temp file BEFORE importing app/models (they read DB_PATH at import time).
+# Each pytest-xdist worker is its own process and gets its own file, so
+# `pytest -n auto` never has two workers contending for one SQLite lock.
+# On Linux the file goes in /dev/shm (tmpfs): every commit and the per-test
+# wipe stay in RAM, while WAL and multi-connection locking behave exactly
+# as in production, which a shared-cache ":memory:" DB would not.
+_xdist_worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+_test_db_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+_test_db_fd, _test_db_path = tempfile.mkstemp(
+    prefix=f"nestcheck_{_xdist_worker}_", suffix=".db", dir=_test_db_dir
+)
 os.close(_test_db_fd)  # close the fd immediately; sqlite3 opens its own handle
 os.environ["NESTCHECK_DB_PATH"] = _test_db_path
-atexit.register(lambda: os.unlink(_test_db_path) if os.path.exists(_test_db_path) else None)
+atexit.register(lambda: [
+    os.unlink(p) for p in (_test_db_path, _test_db_path + "-wal", _test_db_path + "-shm")
+    if os.path.exists(p)
+])
 
 # Suppress the SECRET_KEY startup guard
 os.environ.setdefault("SECRET_KEY", "test-secret-key")
@@ -23,11 +35,32 @@ os.environ.setdefault("SECRET_KEY", "test-secret-key")
 os.environ.setdefault("GOOGLE_MAPS_API_KEY", "fake-key-for-tests")
 
 from app import app  # noqa: E402
-from models import init_db, _get_db  # noqa: E402
+from models import init_db, _get_db, _return_conn  # noqa: E402
 
 # Base template expects csrf_token() to exist. Provide a benign test fallback.
 app.jinja_env.globals.setdefault("csrf_token", lambda: "")
 
+# Test-mode config is process-wide and never changes, so set it once here
+# rather than on every client fixture call.  CSRF is disabled: we're
+# testing logic, not CSRF.
+app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-slow", action="store_true", default=False,
+        help="Also run tests marked @pytest.mark.slow",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-slow"):
+        return
+    skip_slow = pytest.mark.skip(reason="needs --run-slow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
 
 @pytest.fixture(autouse=True)
 def _fresh_db():
@@ -35,6 +68,12 @@ def _fresh_db():
 
     Drops all rows from tables that payment tests touch, keeping the
     schema intact so init_db() doesn't need to run every time.
+
+    Together with the per-worker DB file above this is the whole isolation
+    story: tests in one worker run serially against a wiped DB, and
+    workers never share a file, so tests touching global tables (events,
+    evaluation_jobs, ...) are safe under ``pytest -n auto`` without
+    grouping or per-test table prefixes.
     """
     init_db()
     conn = _get_db()
@@ -47,10 +86,23 @@ def _fresh_db():
     yield
 
 
+@pytest.fixture(scope="session")
+def admin_conn():
+    """One shared connection for tests that need direct SQL access.
+
+    Callers commit their own writes; the connection is closed at session end.
+    """
+    conn = _get_db()
+    yield conn
+    _return_conn(conn)
+
+
 @pytest.fixture()
 def client():
-    """Flask test client with CSRF disabled (we're testing logic, not CSRF)."""
-    app.config["TESTING"] = True
-    app.config["WTF_CSRF_ENABLED"] = False
+    """Flask test client with CSRF disabled (we're testing logic, not CSRF).
+
+    Function-scoped on purpose: a shared client would carry session and
+    visitor cookies from one test into the next.  Building one is ~25 µs.
+    """
     with app.test_client() as c:
         yield c
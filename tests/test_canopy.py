@@ -1,5 +1,6 @@
 """Tests for canopy.py — NLCD tree canopy cover module."""
 
+import itertools
 import json
 import math
 import pytest
@@ -137,19 +138,12 @@ class TestGetCanopyCover:
     def test_mixed_valid_invalid_samples(self, mock_set, mock_get_cache, mock_requests_get):
         from canopy import get_canopy_cover
 
-        call_count = 0
-
-        def side_effect(*args, **kwargs):
-            nonlocal call_count
-            call_count += 1
-            if call_count % 3 == 0:
-                resp = MagicMock()
-                resp.status_code = 200
-                resp.json.return_value = {"type": "FeatureCollection", "features": []}
-                return resp
-            return self._mock_wms_response(30)
-
-        mock_requests_get.side_effect = side_effect
+        empty = MagicMock()
+        empty.status_code = 200
+        empty.json.return_value = {"type": "FeatureCollection", "features": []}
+        # Every third sample comes back empty.
+        valid = self._mock_wms_response(30)
+        mock_requests_get.side_effect = itertools.cycle([valid, valid, empty])
 
         result = get_canopy_cover(40.78, -73.97)
         assert result is not None
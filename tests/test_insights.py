@@ -7,6 +7,11 @@ dict in → dict/string (or None) out.
 _insight_neighborhood returns {"text": str|None, "car_dependent": bool}.
 """
 
+from types import MappingProxyType
+
+import pytest
+
+import app
 from app import (
     _insight_neighborhood,
     _insight_getting_around,
@@ -14,6 +19,7 @@ from app import (
     _insight_community_profile,
     _join_labels,
     _nearest_walk_time,
+    _park_osm_details,
     _weather_context,
     generate_insights,
 )
@@ -29,6 +35,16 @@ def _make_place(name: str, walk_min: int) -> dict:
     return {"name": name, "walk_time_min": walk_min}
 
 
+# Read-only default places, shared across every _build_inputs() call that
+# doesn't override a dimension.  The insight functions only read these.
+_DEFAULT_PLACES = {
+    "coffee": (MappingProxyType(_make_place("Blue Bottle", 5)),),
+    "grocery": (MappingProxyType(_make_place("Trader Joe's", 8)),),
+    "fitness": (MappingProxyType(_make_place("Planet Fitness", 10)),),
+    "parks": (MappingProxyType(_make_place("Memorial Park", 7)),),
+}
+
+
 def _build_inputs(
     coffee_score: int,
     grocery_score: int,
@@ -47,10 +63,10 @@ def _build_inputs(
     3-dimension test scenarios keep their intended branch routing.
     """
     neighborhood = {
-        "coffee": coffee_places if coffee_places is not None else [_make_place("Blue Bottle", 5)],
-        "grocery": grocery_places if grocery_places is not None else [_make_place("Trader Joe's", 8)],
-        "fitness": fitness_places if fitness_places is not None else [_make_place("Planet Fitness", 10)],
-        "parks": parks_places if parks_places is not None else [_make_place("Memorial Park", 7)],
+        "coffee": coffee_places if coffee_places is not None else _DEFAULT_PLACES["coffee"],
+        "grocery": grocery_places if grocery_places is not None else _DEFAULT_PLACES["grocery"],
+        "fitness": fitness_places if fitness_places is not None else _DEFAULT_PLACES["fitness"],
+        "parks": parks_places if parks_places is not None else _DEFAULT_PLACES["parks"],
     }
     tier2 = {
         "Coffee & Social Spots": {"points": coffee_score},
@@ -66,9 +82,11 @@ def _build_inputs(
 # ---------------------------------------------------------------------------
 
 class TestAllStrong:
-    def test_output_mentions_lead_and_others(self):
-        neighborhood, tier2 = _build_inputs(9, 8, 7, 7)
-        result = _insight_neighborhood(neighborhood, tier2)
+    @pytest.fixture(scope="class")
+    def result(self):
+        return _insight_neighborhood(*_build_inputs(9, 8, 7, 7))
+
+    def test_output_mentions_lead_and_others(self, result):
         text = result["text"]
         assert text is not None
         assert "Blue Bottle" in text  # lead (highest score)
@@ -77,9 +95,7 @@ class TestAllStrong:
         assert "parks and green spaces" in text
         assert result["car_dependent"] is False
 
-    def test_no_duplicate_labels(self):
-        neighborhood, tier2 = _build_inputs(9, 8, 7, 7)
-        result = _insight_neighborhood(neighborhood, tier2)
+    def test_no_duplicate_labels(self, result):
         text = result["text"]
         # Lead label should appear only in the lead clause, not the "also" clause
         parts = text.split("\u2014")  # split on em-dash
@@ -131,29 +147,30 @@ class TestAllWeakNoPlaces:
 # ---------------------------------------------------------------------------
 
 class TestOneStandoutRestMiddling:
-    def test_lead_appears_once(self):
+    @pytest.fixture(scope="class")
+    def result(self):
+        return _insight_neighborhood(*_build_inputs(5, 9, 4))
+
+    def test_lead_appears_once(self, result):
         """Grocery is strong, coffee+fitness+parks middling.
         'grocery' must not appear in the second sentence."""
-        neighborhood, tier2 = _build_inputs(5, 9, 4)
-        result = _insight_neighborhood(neighborhood, tier2)
         text = result["text"]
         assert text is not None
+        lower = text.lower()
         # Lead sentence mentions grocery by label
-        assert "grocery" in text.lower()
+        assert "grocery" in lower
         # The label should appear exactly once (in the lead sentence)
-        assert text.lower().count("grocery") == 1
+        assert lower.count("grocery") == 1
 
-    def test_other_dims_present(self):
+    def test_other_dims_present(self, result):
         """All non-lead dims (coffee, fitness, parks) in second sentence."""
-        neighborhood, tier2 = _build_inputs(5, 9, 4)
-        text = _insight_neighborhood(neighborhood, tier2)["text"]
-        assert "cafés and social spots" in text.lower()
-        assert "gyms and fitness options" in text.lower()
-        assert "parks and green spaces" in text.lower()
-
-    def test_lead_place_name_in_output(self):
-        neighborhood, tier2 = _build_inputs(5, 9, 4)
-        text = _insight_neighborhood(neighborhood, tier2)["text"]
+        lower = result["text"].lower()
+        assert "cafés and social spots" in lower
+        assert "gyms and fitness options" in lower
+        assert "parks and green spaces" in lower
+
+    def test_lead_place_name_in_output(self, result):
+        text = result["text"]
         assert "Trader Joe's" in text
 
 
@@ -162,22 +179,24 @@ class TestOneStandoutRestMiddling:
 # ---------------------------------------------------------------------------
 
 class TestTwoStrongRestMiddling:
-    def test_no_dropped_dims(self):
+    @pytest.fixture(scope="class")
+    def result(self):
+        return _insight_neighborhood(*_build_inputs(8, 9, 5))
+
+    def test_no_dropped_dims(self, result):
         """All four dimension labels must appear in the output."""
-        neighborhood, tier2 = _build_inputs(8, 9, 5)
-        result = _insight_neighborhood(neighborhood, tier2)
         text = result["text"]
         assert text is not None
         # Lead is grocery (score 9)
         assert "Trader Joe's" in text
         # Remaining strong (coffee) and middling (fitness, parks) all in output
-        assert "cafés and social spots" in text.lower()
-        assert "gyms and fitness options" in text.lower()
-        assert "parks and green spaces" in text.lower()
+        lower = text.lower()
+        assert "cafés and social spots" in lower
+        assert "gyms and fitness options" in lower
+        assert "parks and green spaces" in lower
 
-    def test_lead_not_in_others(self):
-        neighborhood, tier2 = _build_inputs(8, 9, 5)
-        text = _insight_neighborhood(neighborhood, tier2)["text"]
+    def test_lead_not_in_others(self, result):
+        text = result["text"]
         # "grocery" should appear once (lead sentence), not in the others list
         assert text.lower().count("grocery") == 1
 
@@ -187,12 +206,14 @@ class TestTwoStrongRestMiddling:
 # ---------------------------------------------------------------------------
 
 class TestMixedStrongAndWeak:
-    def test_strength_and_weakness_mentioned(self):
-        neighborhood, tier2 = _build_inputs(
+    @pytest.fixture(scope="class")
+    def result(self):
+        return _insight_neighborhood(*_build_inputs(
             8, 2, 5,
             grocery_places=[_make_place("Distant Grocery", 20)],
-        )
-        result = _insight_neighborhood(neighborhood, tier2)
+        ))
+
+    def test_strength_and_weakness_mentioned(self, result):
         text = result["text"]
         assert text is not None
         # Strength lead
@@ -201,15 +222,11 @@ class TestMixedStrongAndWeak:
         assert "grocery" in text.lower()
         assert result["car_dependent"] is False
 
-    def test_no_duplicate_dim_in_both_sentences(self):
-        neighborhood, tier2 = _build_inputs(
-            8, 2, 5,
-            grocery_places=[_make_place("Distant Grocery", 20)],
-        )
-        text = _insight_neighborhood(neighborhood, tier2)["text"]
+    def test_no_duplicate_dim_in_both_sentences(self, result):
+        lower = result["text"].lower()
         # "café" label should not appear in the weakness sentence
-        assert "however" in text.lower()
-        parts = text.lower().split("however")
+        assert "however" in lower
+        parts = lower.split("however")
         assert "café" not in parts[1]
 
     def test_weak_with_no_places(self):
@@ -257,19 +274,21 @@ class TestNoStrongMiddlingAndWeak:
 # ---------------------------------------------------------------------------
 
 class TestAllMiddling:
-    def test_generic_phrasing(self):
-        neighborhood, tier2 = _build_inputs(5, 5, 5, 5)
-        text = _insight_neighborhood(neighborhood, tier2)["text"]
+    @pytest.fixture(scope="class")
+    def result(self):
+        return _insight_neighborhood(*_build_inputs(5, 5, 5, 5))
+
+    def test_generic_phrasing(self, result):
+        text = result["text"]
         assert text is not None
         assert "within reach" in text.lower()
 
-    def test_mentions_all_labels(self):
-        neighborhood, tier2 = _build_inputs(5, 5, 5, 5)
-        text = _insight_neighborhood(neighborhood, tier2)["text"]
-        assert "cafés and social spots" in text.lower()
-        assert "grocery stores" in text.lower()
-        assert "gyms and fitness options" in text.lower()
-        assert "parks and green spaces" in text.lower()
+    def test_mentions_all_labels(self, result):
+        lower = result["text"].lower()
+        assert "cafés and social spots" in lower
+        assert "grocery stores" in lower
+        assert "gyms and fitness options" in lower
+        assert "parks and green spaces" in lower
 
 
 # ---------------------------------------------------------------------------
@@ -287,6 +306,22 @@ class TestEdgeCases:
         assert result["text"] is None
         assert result["car_dependent"] is False
 
+    def test_identical_inputs_hit_cache(self):
+        # Look the wrapper up through the module: other test files reload
+        # app, which leaves a from-imported name pointing at a stale cache.
+        cached = app._insight_neighborhood_cached
+        cached.cache_clear()
+        app._insight_neighborhood(*_build_inputs(6, 3, 8, 2))
+        again = app._insight_neighborhood(*_build_inputs(6, 3, 8, 2))
+        info = cached.cache_info()
+        assert (info.currsize, info.hits) == (1, 1)
+        assert again["text"] is not None
+
+    def test_cached_result_dict_is_not_shared(self):
+        first = _insight_neighborhood(*_build_inputs(6, 3, 8, 2))
+        first["text"] = "mutated"
+        assert _insight_neighborhood(*_build_inputs(6, 3, 8, 2))["text"] != "mutated"
+
 
 # ===========================================================================
 # _insight_getting_around()
@@ -444,7 +479,8 @@ class TestGettingAroundBusOnly:
         transit = {"primary_stop": "Rt 9 / Main St", "walk_minutes": 6,
                    "frequency_bucket": "Infrequent"}
         result = _insight_getting_around(None, transit, None, "", _ga_tier2(2))
-        assert "car" in result.lower() or "rideshare" in result.lower()
+        lower = result.lower()
+        assert "car" in lower or "rideshare" in lower
 
 
 # ---------------------------------------------------------------------------
@@ -545,8 +581,9 @@ class TestParksHighScoreFarWalk:
         ge = {"best_daily_park": _make_park("Tibbetts Brook", 18),
               "nearby_green_spaces": []}
         result = _insight_parks(ge, _parks_tier2(8))
-        assert "regular visits" in result.lower()
-        assert "morning run" not in result.lower()
+        lower = result.lower()
+        assert "regular visits" in lower
+        assert "morning run" not in lower
 
 
 # ---------------------------------------------------------------------------
@@ -635,6 +672,10 @@ class TestParksOSMEnrichment:
         result = _insight_parks(ge, _parks_tier2(8))
         assert "4 paths" in result
 
+    def test_osm_details_helper(self):
+        assert _park_osm_details(80_000, True, 4) == ["20 acres", "trails", "4 paths"]
+        assert _park_osm_details(0, False, 2) == []
+
 
 # ---------------------------------------------------------------------------
 # Nearby green spaces notation
@@ -841,8 +882,9 @@ class TestProximitySynthesisConfirmed:
             _make_check("gas_station", "CLEAR"),
         ]
         result = proximity_synthesis(checks)
-        assert "close to a highway" in result.lower()
-        assert "other checks came back clear" in result.lower()
+        lower = result.lower()
+        assert "close to a highway" in lower
+        assert "other checks came back clear" in lower
 
     def test_confirmed_no_name_fields(self):
         """_label_with_article must also bottom out gracefully."""
@@ -855,8 +897,9 @@ class TestProximitySynthesisConfirmed:
     def test_confirmed_only_no_clears(self):
         checks = [_make_check("highway", "CONFIRMED_ISSUE")]
         result = proximity_synthesis(checks)
-        assert "close to a highway" in result.lower()
-        assert "remaining" not in result.lower()
+        lower = result.lower()
+        assert "close to a highway" in lower
+        assert "remaining" not in lower
 
     def test_multiple_confirmed(self):
         checks = [
@@ -879,9 +922,10 @@ class TestProximitySynthesisMixed:
             _make_check("rail_corridor", "VERIFICATION_NEEDED"),
         ]
         result = proximity_synthesis(checks)
-        assert "close to a highway" in result.lower()
-        assert "an active rail line" in result.lower()
-        assert "could not be verified" in result.lower()
+        lower = result.lower()
+        assert "close to a highway" in lower
+        assert "an active rail line" in lower
+        assert "could not be verified" in lower
 
 
 # ---------------------------------------------------------------------------
@@ -952,8 +996,9 @@ class TestWeatherContextSnowFreezing:
     def test_combined_sentence(self):
         w = _make_weather(["snow", "freezing"], _winter_monthly())
         result = _weather_context(w)
-        assert "snow" in result.lower()
-        assert "freezing" in result.lower()
+        lower = result.lower()
+        assert "snow" in lower
+        assert "freezing" in lower
 
     def test_month_range_included(self):
         w = _make_weather(["snow", "freezing"], _winter_monthly())
@@ -971,8 +1016,9 @@ class TestWeatherContextSnowOnly:
     def test_notable_snow(self):
         w = _make_weather(["snow"], _winter_monthly())
         result = _weather_context(w)
-        assert "notable snow" in result.lower()
-        assert "freezing" not in result.lower()
+        lower = result.lower()
+        assert "notable snow" in lower
+        assert "freezing" not in lower
 
 
 # ---------------------------------------------------------------------------
@@ -983,8 +1029,9 @@ class TestWeatherContextFreezingOnly:
     def test_freezing_temperatures(self):
         w = _make_weather(["freezing"])
         result = _weather_context(w)
-        assert "freezing" in result.lower()
-        assert "snow" not in result.lower()
+        lower = result.lower()
+        assert "freezing" in lower
+        assert "snow" not in lower
 
 
 # ---------------------------------------------------------------------------
@@ -1032,10 +1079,11 @@ class TestWeatherContextMaxSentences:
         ]
         w = _make_weather(["snow", "freezing", "extreme_heat"], monthly)
         result = _weather_context(w)
+        lower = result.lower()
         # Exactly 2 sentences joined by ". " → exactly 1 joiner
         assert result.count(". ") == 1
-        assert "snow" in result.lower()
-        assert "hot" in result.lower()
+        assert "snow" in lower
+        assert "hot" in lower
 
 
 # ===========================================================================
@@ -7,11 +7,13 @@ overpass/weather cache with TTL, payment operations, and free tier usage.
 import json
 import time
 from datetime import datetime, timezone, timedelta
+from unittest.mock import MagicMock
 
 import pytest
 
 from models import (
     init_db,
+    _get_db,
     generate_snapshot_id,
     save_snapshot,
     get_snapshot,
@@ -22,6 +24,7 @@ from models import (
     log_event,
     check_return_visit,
     get_event_counts,
+    with_db_session,
     get_recent_events,
     get_recent_snapshots,
     create_job,
@@ -34,6 +37,7 @@ from models import (
     requeue_stale_running_jobs,
     overpass_cache_key,
     _check_cache_ttl,
+    _now_iso,
     get_overpass_cache,
     set_overpass_cache,
     get_weather_cache,
@@ -53,8 +57,6 @@ from models import (
     update_user_stripe_customer,
     get_or_create_user,
     get_user_by_id,
-    _get_db,
-    _return_conn,
     backfill_city_state,
     get_city_snapshots,
     get_city_stats,
@@ -76,10 +78,31 @@ class TestGenerateSnapshotId:
         ids = {generate_snapshot_id() for _ in range(100)}
         assert len(ids) == 100
 
+    @pytest.mark.slow
+    def test_unique_large_sample(self):
+        # At N=10k a single birthday collision has ~1% odds, so allow a
+        # couple rather than make the nightly run flaky.
+        n = 10_000
+        ids = {generate_snapshot_id() for _ in range(n)}
+        assert len(ids) >= n - 2
+
     def test_hex_characters(self):
         sid = generate_snapshot_id()
         assert all(c in "0123456789abcdef" for c in sid)
 
+    def test_unique_across_buffer_refill(self, monkeypatch):
+        import models
+        # Shrink the entropy block to two IDs so three IDs cross one refill.
+        monkeypatch.setattr(models, "_RAND_BUF_SIZE", 2 * models._SNAPSHOT_ID_BYTES)
+        monkeypatch.setattr(models, "_rand_buf", b"")
+        monkeypatch.setattr(models, "_rand_pos", 0)
+        urandom = MagicMock(wraps=models.os.urandom)
+        monkeypatch.setattr(models.os, "urandom", urandom)
+
+        ids = {generate_snapshot_id() for _ in range(3)}
+        assert len(ids) == 3
+        assert urandom.call_count == 2
+
 
 # =========================================================================
 # Snapshot CRUD
@@ -218,10 +241,21 @@ class TestGetRecentSnapshots:
         assert len(snaps) == 2
 
 
+def _seed_events(event_type, visitor_ids):
+    """Insert one *event_type* row per visitor in a single transaction."""
+    now = _now_iso()
+    conn = _get_db()
+    conn.executemany(
+        "INSERT INTO events (event_type, visitor_id, created_at) VALUES (?, ?, ?)",
+        [(event_type, visitor_id, now) for visitor_id in visitor_ids],
+    )
+    conn.commit()
+    conn.close()
+
+
 class TestGetRecentEvents:
     def test_respects_limit(self):
-        for i in range(5):
-            log_event("test_event", visitor_id=f"v{i}")
+        _seed_events("test_event", [f"v{i}" for i in range(5)])
 
         events = get_recent_events(limit=3)
         assert len(events) == 3
@@ -231,6 +265,19 @@ class TestGetRecentEvents:
 # Job queue lifecycle
 # =========================================================================
 
+@pytest.fixture
+def queued_job():
+    """A freshly created job still in 'queued' status."""
+    return create_job("123 Main St")
+
+
+@pytest.fixture
+def running_job(queued_job):
+    """A job that has been claimed and is in 'running' status."""
+    claim_next_job()
+    return queued_job
+
+
 class TestCreateAndGetJob:
     def test_create_basic(self):
         job_id = create_job("123 Main St")
@@ -287,31 +334,36 @@ class TestClaimNextJob:
         claim_next_job()
         assert claim_next_job() is None
 
+    def test_claim_query_uses_status_created_index(self, admin_conn):
+        plan = admin_conn.execute(
+            """EXPLAIN QUERY PLAN
+               SELECT job_id FROM evaluation_jobs
+               WHERE status = 'queued'
+               ORDER BY created_at ASC LIMIT 1"""
+        ).fetchall()
+        details = " ".join(row["detail"] for row in plan)
+        assert "idx_jobs_status_created" in details
+        assert "TEMP B-TREE" not in details
 
-class TestUpdateJobStage:
-    def test_updates_stage(self):
-        job_id = create_job("123 Main St")
-        claim_next_job()
 
-        update_job_stage(job_id, "geocoding")
-        job = get_job(job_id)
+class TestUpdateJobStage:
+    def test_updates_stage(self, running_job):
+        update_job_stage(running_job, "geocoding")
+        job = get_job(running_job)
         assert job["current_stage"] == "geocoding"
 
-    def test_no_update_if_not_running(self):
-        job_id = create_job("123 Main St")
+    def test_no_update_if_not_running(self, queued_job):
         # job is still queued, not running
-        update_job_stage(job_id, "geocoding")
-        job = get_job(job_id)
+        update_job_stage(queued_job, "geocoding")
+        job = get_job(queued_job)
         assert job["current_stage"] is None
 
 
 class TestCompleteJob:
-    def test_marks_done(self):
-        job_id = create_job("123 Main St")
-        claim_next_job()
-        complete_job(job_id, "snap123")
+    def test_marks_done(self, running_job):
+        complete_job(running_job, "snap123")
 
-        job = get_job(job_id)
+        job = get_job(running_job)
         assert job["status"] == "done"
         assert job["snapshot_id"] == "snap123"
         assert job["completed_at"] is not None
@@ -319,57 +371,47 @@ class TestCompleteJob:
 
 
 class TestFailJob:
-    def test_marks_failed(self):
-        job_id = create_job("123 Main St")
-        claim_next_job()
-        fail_job(job_id, "API timeout")
+    def test_marks_failed(self, running_job):
+        fail_job(running_job, "API timeout")
 
-        job = get_job(job_id)
+        job = get_job(running_job)
         assert job["status"] == "failed"
         assert job["error"] == "API timeout"
         assert job["completed_at"] is not None
 
-    def test_truncates_long_error(self):
-        job_id = create_job("123 Main St")
-        claim_next_job()
-        fail_job(job_id, "x" * 5000)
+    def test_truncates_long_error(self, running_job):
+        fail_job(running_job, "x" * 5000)
 
-        job = get_job(job_id)
+        job = get_job(running_job)
         assert len(job["error"]) == 2000
 
 
 class TestCancelQueuedJob:
-    def test_cancel_queued(self):
-        job_id = create_job("123 Main St")
-        assert cancel_queued_job(job_id, "duplicate") is True
+    def test_cancel_queued(self, queued_job):
+        assert cancel_queued_job(queued_job, "duplicate") is True
 
-        job = get_job(job_id)
+        job = get_job(queued_job)
         assert job["status"] == "failed"
         assert job["error"] == "duplicate"
 
-    def test_cannot_cancel_running(self):
-        job_id = create_job("123 Main St")
-        claim_next_job()
-        assert cancel_queued_job(job_id, "too late") is False
+    def test_cannot_cancel_running(self, running_job):
+        assert cancel_queued_job(running_job, "too late") is False
 
-        job = get_job(job_id)
+        job = get_job(running_job)
         assert job["status"] == "running"
 
 
 class TestRequeueStaleRunningJobs:
-    def test_requeues_old_running_job(self):
-        job_id = create_job("123 Main St")
-        claimed = claim_next_job()
+    def test_requeues_old_running_job(self, admin_conn, running_job):
+        job_id = running_job
 
         # Manually backdate started_at to simulate a stale job
-        conn = _get_db()
         old_time = (datetime.now(timezone.utc) - timedelta(seconds=600)).isoformat()
-        conn.execute(
+        admin_conn.execute(
             "UPDATE evaluation_jobs SET started_at = ? WHERE job_id = ?",
             (old_time, job_id),
         )
-        conn.commit()
-        _return_conn(conn)
+        admin_conn.commit()
 
         count = requeue_stale_running_jobs(max_age_seconds=300)
         assert count == 1
@@ -378,10 +420,7 @@ class TestRequeueStaleRunningJobs:
         assert job["status"] == "queued"
         assert job["started_at"] is None
 
-    def test_does_not_requeue_recent(self):
-        job_id = create_job("123 Main St")
-        claim_next_job()
-
+    def test_does_not_requeue_recent(self, running_job):
         count = requeue_stale_running_jobs(max_age_seconds=300)
         assert count == 0
 
@@ -401,9 +440,20 @@ class TestOverpassCacheKey:
         assert k1 != k2
 
 
+class TestNowIso:
+    def test_parses_as_current_utc(self):
+        parsed = datetime.fromisoformat(_now_iso())
+        assert parsed.tzinfo is not None
+        assert abs(datetime.now(timezone.utc) - parsed) < timedelta(seconds=5)
+
+    def test_sub_second_ordering_preserved(self):
+        stamps = [_now_iso() for _ in range(50)]
+        assert stamps == sorted(stamps)
+
+
 class TestCheckCacheTtl:
     def test_recent_is_valid(self):
-        recent = datetime.now(timezone.utc).isoformat()
+        recent = _now_iso()
         assert _check_cache_ttl(recent, 7) is True
 
     def test_old_is_expired(self):
@@ -417,6 +467,14 @@ class TestCheckCacheTtl:
         recent = datetime.now(timezone.utc)
         assert _check_cache_ttl(recent, 7) is True
 
+    def test_naive_string_treated_as_utc(self):
+        old = (datetime.now(timezone.utc) - timedelta(days=10)).replace(tzinfo=None)
+        assert _check_cache_ttl(old.isoformat(), 7) is False
+        assert _check_cache_ttl(old.isoformat(), 11) is True
+
+    def test_unparseable_assumed_valid(self):
+        assert _check_cache_ttl("not-a-date", 7) is True
+
 
 class TestOverpassCache:
     def test_set_and_get(self):
@@ -552,6 +610,13 @@ class TestHashEmail:
     def test_strips_whitespace(self):
         assert hash_email("  test@example.com  ") == hash_email("test@example.com")
 
+    def test_digest_is_stable_sha256(self):
+        # Stored free_tier_usage.email_hash / subscriptions rows are keyed on
+        # this digest; changing the algorithm silently resets every quota.
+        assert hash_email("test@example.com") == (
+            "973dfe463ec85785f5f95af5ba3906eedb2d931c24e69824a89ea65dba4e813b"
+        )
+
 
 class TestFreeTierUsage:
     def test_record_and_check(self):
@@ -622,19 +687,94 @@ class TestUserStripeCustomer:
 # City/state denormalized columns (NES-352)
 # =========================================================================
 
-class TestCityStateColumns:
-    def test_snapshots_table_has_city_column(self):
-        from models import _get_db
+class TestConnectionPragmas:
+    def test_wal_with_normal_sync(self, admin_conn):
+        assert admin_conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        # 1 == NORMAL
+        assert admin_conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+        # 2 == MEMORY
+        assert admin_conn.execute("PRAGMA temp_store").fetchone()[0] == 2
+
+
+class TestConnectionPool:
+    def test_close_returns_connection_for_reuse(self):
         conn = _get_db()
-        cols = {row[1] for row in conn.execute("PRAGMA table_info(snapshots)").fetchall()}
         conn.close()
-        assert "city" in cols
+        again = _get_db()
+        try:
+            assert again is conn
+        finally:
+            again.close()
 
-    def test_snapshots_table_has_state_abbr_column(self):
-        from models import _get_db
+    def test_uncommitted_writes_discarded_on_close(self):
         conn = _get_db()
-        cols = {row[1] for row in conn.execute("PRAGMA table_info(snapshots)").fetchall()}
+        conn.execute(
+            "INSERT INTO events (event_type, created_at) VALUES ('x', 'now')"
+        )
         conn.close()
+        assert get_event_counts().get("x") is None
+
+    def test_double_close_does_not_duplicate(self):
+        conn = _get_db()
+        conn.close()
+        conn.close()
+        a, b = _get_db(), _get_db()
+        try:
+            assert a is not b
+        finally:
+            a.close()
+            b.close()
+
+
+class TestDbSession:
+    def test_helpers_share_one_connection(self):
+        seen = []
+
+        @with_db_session
+        def handler():
+            for _ in range(3):
+                conn = _get_db()
+                seen.append(conn)
+                conn.close()
+
+        handler()
+        assert seen[0] is seen[1] is seen[2]
+
+    def test_connection_returned_to_pool_after_session(self):
+        @with_db_session
+        def handler():
+            return _get_db()
+
+        pinned = handler()
+        conn = _get_db()
+        try:
+            assert conn is pinned
+        finally:
+            conn.close()
+
+    def test_close_inside_session_discards_uncommitted(self):
+        @with_db_session
+        def handler():
+            conn = _get_db()
+            conn.execute(
+                "INSERT INTO events (event_type, created_at) VALUES ('x', 'now')"
+            )
+            conn.close()
+            log_event("y")
+
+        handler()
+        counts = get_event_counts()
+        assert counts.get("x") is None
+        assert counts.get("y") == 1
+
+
+class TestCityStateColumns:
+    def test_snapshots_table_has_city_column(self, admin_conn):
+        cols = {row[1] for row in admin_conn.execute("PRAGMA table_info(snapshots)").fetchall()}
+        assert "city" in cols
+
+    def test_snapshots_table_has_state_abbr_column(self, admin_conn):
+        cols = {row[1] for row in admin_conn.execute("PRAGMA table_info(snapshots)").fetchall()}
         assert "state_abbr" in cols
 
 
@@ -687,10 +827,8 @@ class TestCityStateOnSave:
 
 
 class TestBackfillCityState:
-    def test_backfill_populates_from_demographics(self):
-        from models import _get_db, backfill_city_state, get_snapshot
-        conn = _get_db()
-        conn.execute(
+    def test_backfill_populates_from_demographics(self, admin_conn):
+        admin_conn.execute(
             """INSERT INTO snapshots
                (snapshot_id, address_input, address_norm, created_at, verdict,
                 final_score, passed_tier1, result_json, is_preview)
@@ -699,17 +837,14 @@ class TestBackfillCityState:
              "good", 80, 1,
              '{"demographics": {"place_name": "Rye", "state_fips": "36"}}', 0),
         )
-        conn.commit()
-        conn.close()
+        admin_conn.commit()
         backfill_city_state()
         snap = get_snapshot("bf_test_1")
         assert snap["city"] == "Rye"
         assert snap["state_abbr"] == "NY"
 
-    def test_backfill_skips_preview_snapshots(self):
-        from models import _get_db, backfill_city_state, get_snapshot
-        conn = _get_db()
-        conn.execute(
+    def test_backfill_skips_preview_snapshots(self, admin_conn):
+        admin_conn.execute(
             """INSERT INTO snapshots
                (snapshot_id, address_input, address_norm, created_at, verdict,
                 final_score, passed_tier1, result_json, is_preview)
@@ -718,16 +853,13 @@ class TestBackfillCityState:
              "ok", 60, 1,
              '{"demographics": {"place_name": "Yonkers", "state_fips": "36"}}', 1),
         )
-        conn.commit()
-        conn.close()
+        admin_conn.commit()
         backfill_city_state()
         snap = get_snapshot("bf_preview")
         assert snap["city"] is None
 
-    def test_backfill_handles_missing_demographics(self):
-        from models import _get_db, backfill_city_state, get_snapshot
-        conn = _get_db()
-        conn.execute(
+    def test_backfill_handles_missing_demographics(self, admin_conn):
+        admin_conn.execute(
             """INSERT INTO snapshots
                (snapshot_id, address_input, address_norm, created_at, verdict,
                 final_score, passed_tier1, result_json, is_preview)
@@ -735,18 +867,19 @@ class TestBackfillCityState:
             ("bf_no_demo", "30 Oak", "30 Oak", "2026-01-01T00:00:00",
              "ok", 70, 1, '{}', 0),
         )
-        conn.commit()
-        conn.close()
+        admin_conn.commit()
         backfill_city_state()
         snap = get_snapshot("bf_no_demo")
         assert snap["city"] is None
 
 
 class TestCityQueries:
+    @pytest.fixture(autouse=True)
+    def _bind_admin_conn(self, admin_conn):
+        self.conn = admin_conn
+
     def _insert_snapshot(self, sid, city, state, score, passed, is_preview=0):
-        from models import _get_db
-        conn = _get_db()
-        conn.execute(
+        self.conn.execute(
             """INSERT INTO snapshots
                (snapshot_id, address_input, address_norm, created_at, evaluated_at,
                 verdict, final_score, passed_tier1, result_json, is_preview,
@@ -756,8 +889,7 @@ class TestCityQueries:
              "2026-03-01T00:00:00", "ok", score, passed, '{}', is_preview,
              city, state),
         )
-        conn.commit()
-        conn.close()
+        self.conn.commit()
 
     def test_get_city_snapshots_returns_matching(self):
         self._insert_snapshot("cs1", "Rye", "NY", 80, 1)
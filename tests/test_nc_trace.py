@@ -4,6 +4,7 @@ Tests cover: TraceContext lifecycle, stage recording, API call recording,
 summary computation, serialization, and thread-local storage.
 """
 
+import contextvars
 import time
 import threading
 
@@ -122,6 +123,13 @@ class TestApiCallRecording:
 
         assert ctx.api_calls[0].retried is True
 
+    def test_records_are_slotted(self):
+        ctx = TraceContext(trace_id="test-1")
+        ctx.record_api_call("overpass", "query", 10, 200)
+        ctx.record_stage("geocode", 0.0, 0.1)
+        assert not hasattr(ctx.api_calls[0], "__dict__")
+        assert not hasattr(ctx.stages[0], "__dict__")
+
 
 # =========================================================================
 # Summary
@@ -265,3 +273,13 @@ class TestThreadLocal:
 
         assert results["thread-1"] == "thread-1"
         assert results["thread-2"] == "thread-2"
+
+    def test_copied_context_sees_trace(self):
+        """Work run in a copied context (asyncio tasks, executors that copy
+        context) keeps the caller's trace."""
+        ctx = TraceContext(trace_id="copied")
+        set_trace(ctx)
+        try:
+            assert contextvars.copy_context().run(get_trace) is ctx
+        finally:
+            clear_trace()
@@ -5,6 +5,8 @@ import unittest
 from nyc_subway_accessibility import (
     lookup_nyc_subway_accessibility,
     _approx_distance_m,
+    _MATCH_RADIUS_M,
+    _NYC_SUBWAY_STATIONS,
 )
 
 
@@ -120,5 +122,31 @@ class TestLookupNYCSubwayAccessibility(unittest.TestCase):
         self.assertIsNone(result[2])
 
 
+
+class TestGridIndexMatchesFullScan(unittest.TestCase):
+    """The grid-indexed lookup must agree with a brute-force nearest scan."""
+
+    @staticmethod
+    def _brute_force(lat, lng):
+        best, best_d = None, _MATCH_RADIUS_M
+        for slat, slng, step_free, elevator, note in _NYC_SUBWAY_STATIONS:
+            d = _approx_distance_m(lat, lng, slat, slng)
+            if d < best_d:
+                best, best_d = (step_free, elevator, note), d
+        return best
+
+    def test_points_around_every_station(self):
+        # Offsets up to ~280 m north/east/south/west, straddling cell edges
+        offsets = [(0, 0), (0.0025, 0), (-0.0025, 0), (0, 0.0033), (0, -0.0033)]
+        for slat, slng, *_ in _NYC_SUBWAY_STATIONS:
+            for dlat, dlng in offsets:
+                lat, lng = slat + dlat, slng + dlng
+                self.assertEqual(
+                    lookup_nyc_subway_accessibility(lat, lng),
+                    self._brute_force(lat, lng),
+                    msg=f"mismatch at ({lat}, {lng})",
+                )
+
+
 if __name__ == "__main__":
     unittest.main()
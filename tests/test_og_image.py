@@ -9,6 +9,8 @@ from unittest.mock import patch, MagicMock
 import pytest
 
 from og_image import (
+    _BAND_RGB,
+    _band_template,
     _load_font,
     generate_og_image,
     BAND_COLORS,
@@ -112,8 +114,23 @@ class TestGenerateOgImage:
         )
         assert result is not None
 
-    @patch("og_image.Image.new", side_effect=Exception("PIL error"))
-    def test_failure_returns_none(self, mock_new):
+    def test_band_rgb_matches_hex(self):
+        assert set(_BAND_RGB) == set(BAND_COLORS)
+        assert _BAND_RGB["band-poor"] == (0xef, 0x44, 0x44)
+
+    def test_template_not_mutated(self):
+        template = _band_template(_BAND_RGB["band-strong"])
+        before = template.tobytes()
+        generate_og_image(
+            address="123 Main Street, Scarsdale, NY",
+            score=78,
+            verdict="Strong Fit",
+            band_css_class="band-strong",
+        )
+        assert template.tobytes() == before
+
+    @patch("og_image.ImageDraw.Draw", side_effect=Exception("PIL error"))
+    def test_failure_returns_none(self, mock_draw):
         result = generate_og_image(
             address="Test",
             score=50,
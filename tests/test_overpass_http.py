@@ -6,16 +6,19 @@ response parsing, and trace recording.
 
 import json
 import time
-from unittest.mock import patch, MagicMock
+from dataclasses import dataclass
+from unittest.mock import patch
 
 import pytest
 import requests
 
+import overpass_http
 from overpass_http import (
     OverpassHTTPClient,
     OverpassRateLimitError,
     OverpassQueryError,
     overpass_query,
+    _TokenBucket,
 )
 
 
@@ -23,17 +26,44 @@ from overpass_http import (
 # Helpers
 # =========================================================================
 
-def _mock_response(status_code=200, json_data=None, text=""):
-    """Create a mock requests.Response object."""
-    resp = MagicMock(spec=requests.Response)
-    resp.status_code = status_code
-    resp.ok = 200 <= status_code < 300
-    resp.text = text
-    if json_data is not None:
-        resp.json.return_value = json_data
-    else:
-        resp.json.side_effect = ValueError("No JSON")
-    return resp
+@dataclass(slots=True)
+class _FakeResponse:
+    """The slice of requests.Response that overpass_http reads."""
+
+    status_code: int
+    content: bytes
+    text: str
+    headers: dict
+
+    @property
+    def ok(self):
+        return 200 <= self.status_code < 300
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def _mock_response(status_code=200, json_data=None, text="", headers=None):
+    """Create a fake requests.Response; no json_data means a non-JSON body."""
+    content = json.dumps(json_data).encode() if json_data is not None else text.encode()
+    return _FakeResponse(status_code, content, text, headers or {})
+
+
+@pytest.fixture(autouse=True)
+def _no_cache(request, monkeypatch):
+    """Stub both SQLite cache reads for tests marked cache_disabled.
+
+    A method-level @patch still wins, since it is applied after fixtures.
+    """
+    if request.node.get_closest_marker("cache_disabled"):
+        monkeypatch.setattr(overpass_http, "get_overpass_cache", lambda *a, **k: None)
+        monkeypatch.setattr(overpass_http, "get_overpass_cache_stale", lambda *a, **k: None)
+
+
+@pytest.fixture
+def overpass_client():
+    """Fresh client per test: its memo and rate limiter must not leak."""
+    return OverpassHTTPClient()
 
 
 # =========================================================================
@@ -42,220 +72,295 @@ def _mock_response(status_code=200, json_data=None, text=""):
 
 class TestCacheIntegration:
     @patch("overpass_http.get_overpass_cache")
-    def test_cache_hit_returns_cached_data(self, mock_cache):
+    def test_cache_hit_returns_cached_data(self, mock_cache, overpass_client):
         mock_cache.return_value = '{"elements": [{"id": 1}]}'
 
-        client = OverpassHTTPClient()
-        result = client.query("[out:json];node(1);out;", caller="test")
+        result = overpass_client.query("[out:json];node(1);out;", caller="test")
 
         assert result == {"elements": [{"id": 1}]}
         mock_cache.assert_called_once()
 
     @patch("overpass_http.set_overpass_cache")
     @patch("overpass_http.get_overpass_cache", return_value=None)
-    def test_cache_miss_fetches_and_caches(self, mock_get, mock_set):
-        client = OverpassHTTPClient()
-
+    def test_cache_miss_fetches_and_caches(self, mock_get, mock_set, overpass_client):
         mock_resp = _mock_response(200, {"elements": []})
         with patch.object(requests.Session, "post", return_value=mock_resp):
-            result = client.query("[out:json];node(1);out;", caller="test")
+            result = overpass_client.query("[out:json];node(1);out;", caller="test")
 
         assert result == {"elements": []}
         mock_set.assert_called_once()
 
     @patch("overpass_http.get_overpass_cache")
-    def test_corrupted_cache_falls_through(self, mock_cache):
+    def test_corrupted_cache_falls_through(self, mock_cache, overpass_client):
         mock_cache.return_value = "not valid json{{"
 
-        client = OverpassHTTPClient()
         mock_resp = _mock_response(200, {"elements": []})
         with patch.object(requests.Session, "post", return_value=mock_resp):
-            result = client.query("[out:json];node(1);out;", caller="test")
+            result = overpass_client.query("[out:json];node(1);out;", caller="test")
 
         assert result == {"elements": []}
 
+    @patch("overpass_http.get_overpass_cache")
+    def test_repeat_query_served_from_memory(self, mock_cache, overpass_client):
+        mock_cache.return_value = '{"elements": [{"id": 1}]}'
+
+        first = overpass_client.query("[out:json];node(1);out;", caller="test")
+        second = overpass_client.query("[out:json];node(1);out;", caller="test")
+
+        assert second == {"elements": [{"id": 1}]}
+        assert second is first  # parsed once, shared read-only
+        mock_cache.assert_called_once()
+
+    @patch("overpass_http.set_overpass_cache")
+    @patch("overpass_http.get_overpass_cache", return_value=None)
+    def test_http_result_served_from_memory(self, mock_get, mock_set, overpass_client):
+        with patch.object(requests.Session, "post",
+                          return_value=_mock_response(200, {"elements": []})) as post:
+            overpass_client.query("[out:json];node(1);out;", caller="test")
+            overpass_client.query("[out:json];node(1);out;", caller="test")
+
+        assert post.call_count == 1
+        mock_get.assert_called_once()
+
+    @patch("overpass_http.get_overpass_cache")
+    def test_expired_memory_entry_rechecks_sqlite(self, mock_cache, overpass_client):
+        mock_cache.return_value = '{"elements": []}'
+
+        overpass_client.MEMO_TTL = -1  # every entry is already expired
+        overpass_client.query("[out:json];node(1);out;", caller="test")
+        overpass_client.query("[out:json];node(1);out;", caller="test")
+
+        assert mock_cache.call_count == 2
+
 
 # =========================================================================
-# HTTP error handling
+# Rate limiting
 # =========================================================================
 
-class TestHTTPErrors:
+class TestTokenBucket:
+    @patch("overpass_http.time.sleep")
+    def test_burst_passes_without_sleeping(self, mock_sleep):
+        bucket = _TokenBucket(capacity=2, rate=1.0, min_rate=0.25)
+        bucket.acquire()
+        bucket.acquire()
+        mock_sleep.assert_not_called()
+
+    @patch("overpass_http.time.sleep")
+    def test_waits_for_next_token_once_drained(self, mock_sleep):
+        bucket = _TokenBucket(capacity=1, rate=2.0, min_rate=0.25)
+        bucket.acquire()
+        bucket.acquire()
+        assert mock_sleep.call_args.args[0] == pytest.approx(0.5, abs=0.05)
+
+    @patch("overpass_http.time.sleep")
+    def test_min_wait_overlaps_token_wait(self, mock_sleep):
+        bucket = _TokenBucket(capacity=1, rate=2.0, min_rate=0.25)
+        bucket.acquire(min_wait=3.0)  # token available: sleeps only min_wait
+        bucket.acquire(min_wait=0.1)  # token due in 0.5s: sleeps 0.5, not 0.6
+        waits = [c.args[0] for c in mock_sleep.call_args_list]
+        assert waits[0] == 3.0
+        assert waits[1] == pytest.approx(0.5, abs=0.05)
+
+    def test_failure_halves_rate_down_to_floor(self):
+        bucket = _TokenBucket(capacity=2, rate=1.0, min_rate=0.25)
+        for _ in range(5):
+            bucket.on_failure()
+        assert bucket.rate == 0.25
+
+    def test_success_recovers_up_to_base_rate(self):
+        bucket = _TokenBucket(capacity=2, rate=1.0, min_rate=0.25)
+        bucket.on_failure()
+        bucket.on_success()
+        assert bucket.rate == pytest.approx(0.6)
+        for _ in range(10):
+            bucket.on_success()
+        assert bucket.rate == 1.0
+
     @patch("overpass_http.get_overpass_cache_stale", return_value=None)
     @patch("overpass_http.get_overpass_cache", return_value=None)
-    def test_429_raises_rate_limit_error(self, mock_cache, mock_stale):
-        client = OverpassHTTPClient()
-        client.MAX_RETRIES = 0  # no retries for this test
+    def test_429_slows_the_client(self, mock_cache, mock_stale, overpass_client):
+        overpass_client.MAX_RETRIES = 0
+        with patch.object(requests.Session, "post", return_value=_mock_response(429)):
+            with pytest.raises(OverpassRateLimitError):
+                overpass_client.query("test query", caller="test")
+        assert overpass_client._bucket.rate == overpass_client.RATE_LIMIT / 2
+
+
+# =========================================================================
+# HTTP error handling
+# =========================================================================
+
+@pytest.mark.cache_disabled
+class TestHTTPErrors:
+    def test_429_raises_rate_limit_error(self, overpass_client):
+        overpass_client.MAX_RETRIES = 0  # no retries for this test
 
         mock_resp = _mock_response(429)
         with patch.object(requests.Session, "post", return_value=mock_resp):
             with pytest.raises(OverpassRateLimitError):
-                client.query("test query", caller="test")
+                overpass_client.query("test query", caller="test")
 
-    @patch("overpass_http.get_overpass_cache_stale", return_value=None)
-    @patch("overpass_http.get_overpass_cache", return_value=None)
-    def test_504_raises_query_error(self, mock_cache, mock_stale):
-        client = OverpassHTTPClient()
-        client.MAX_RETRIES = 0
+    def test_504_raises_query_error(self, overpass_client):
+        overpass_client.MAX_RETRIES = 0
 
         mock_resp = _mock_response(504)
         with patch.object(requests.Session, "post", return_value=mock_resp):
             with pytest.raises(OverpassQueryError, match="504"):
-                client.query("test query", caller="test")
+                overpass_client.query("test query", caller="test")
 
-    @patch("overpass_http.get_overpass_cache_stale", return_value=None)
-    @patch("overpass_http.get_overpass_cache", return_value=None)
-    def test_400_raises_query_error(self, mock_cache, mock_stale):
-        client = OverpassHTTPClient()
-        client.MAX_RETRIES = 0
+    def test_400_raises_query_error(self, overpass_client):
+        overpass_client.MAX_RETRIES = 0
 
         mock_resp = _mock_response(400)
         with patch.object(requests.Session, "post", return_value=mock_resp):
             with pytest.raises(OverpassQueryError, match="400"):
-                client.query("test query", caller="test")
+                overpass_client.query("test query", caller="test")
 
-    @patch("overpass_http.get_overpass_cache_stale", return_value=None)
-    @patch("overpass_http.get_overpass_cache", return_value=None)
-    def test_non_json_response_raises(self, mock_cache, mock_stale):
-        client = OverpassHTTPClient()
-        client.MAX_RETRIES = 0
+    def test_non_json_response_raises(self, overpass_client):
+        overpass_client.MAX_RETRIES = 0
 
         mock_resp = _mock_response(200, json_data=None, text="<html>error</html>")
         with patch.object(requests.Session, "post", return_value=mock_resp):
             with pytest.raises(OverpassQueryError, match="non-JSON"):
-                client.query("test query", caller="test")
+                overpass_client.query("test query", caller="test")
 
-    @patch("overpass_http.get_overpass_cache_stale", return_value=None)
-    @patch("overpass_http.get_overpass_cache", return_value=None)
-    def test_timeout_raises_query_error(self, mock_cache, mock_stale):
-        client = OverpassHTTPClient()
-        client.MAX_RETRIES = 0
+    def test_timeout_raises_query_error(self, overpass_client):
+        overpass_client.MAX_RETRIES = 0
 
         with patch.object(
             requests.Session, "post", side_effect=requests.exceptions.Timeout("timed out")
         ):
             with pytest.raises(OverpassQueryError, match="timeout"):
-                client.query("test query", caller="test")
+                overpass_client.query("test query", caller="test")
 
 
 # =========================================================================
 # Response body error detection
 # =========================================================================
 
+@pytest.mark.cache_disabled
 class TestResponseBodyErrors:
-    @patch("overpass_http.get_overpass_cache_stale", return_value=None)
-    @patch("overpass_http.get_overpass_cache", return_value=None)
-    def test_rate_limit_in_body(self, mock_cache, mock_stale):
-        client = OverpassHTTPClient()
-        client.MAX_RETRIES = 0
+    def test_rate_limit_in_body(self, overpass_client):
+        overpass_client.MAX_RETRIES = 0
 
         body = {"osm3s": {"remark": "Too many requests"}, "elements": []}
         mock_resp = _mock_response(200, body)
         with patch.object(requests.Session, "post", return_value=mock_resp):
             with pytest.raises(OverpassRateLimitError):
-                client.query("test query", caller="test")
+                overpass_client.query("test query", caller="test")
 
-    @patch("overpass_http.get_overpass_cache_stale", return_value=None)
-    @patch("overpass_http.get_overpass_cache", return_value=None)
-    def test_runtime_error_in_body(self, mock_cache, mock_stale):
-        client = OverpassHTTPClient()
-        client.MAX_RETRIES = 0
+    def test_runtime_error_in_body(self, overpass_client):
+        overpass_client.MAX_RETRIES = 0
 
         body = {"remark": "runtime error: Query timed out", "elements": []}
         mock_resp = _mock_response(200, body)
         with patch.object(requests.Session, "post", return_value=mock_resp):
             with pytest.raises(OverpassQueryError, match="server error"):
-                client.query("test query", caller="test")
+                overpass_client.query("test query", caller="test")
 
 
 # =========================================================================
 # Retry logic
 # =========================================================================
 
+@pytest.mark.cache_disabled
 class TestRetryLogic:
-    @patch("overpass_http.get_overpass_cache", return_value=None)
     @patch("overpass_http.time.sleep")
-    def test_retries_on_rate_limit(self, mock_sleep, mock_cache):
-        client = OverpassHTTPClient()
-        client.MAX_RETRIES = 2
+    def test_retries_on_rate_limit(self, mock_sleep, overpass_client):
+        overpass_client.MAX_RETRIES = 2
 
-        call_count = 0
+        responses = [
+            _mock_response(429),
+            _mock_response(429),
+            _mock_response(200, {"elements": []}),
+        ]
 
-        def side_effect(*args, **kwargs):
-            nonlocal call_count
-            call_count += 1
-            if call_count < 3:
-                return _mock_response(429)
-            return _mock_response(200, {"elements": []})
-
-        with patch.object(requests.Session, "post", side_effect=side_effect):
-            result = client.query("test query", caller="test")
+        with patch.object(requests.Session, "post", side_effect=responses) as post:
+            result = overpass_client.query("test query", caller="test")
 
         assert result == {"elements": []}
-        assert call_count == 3
-        assert mock_sleep.call_count >= 2  # rate limiter + retry backoff sleeps
+        assert post.call_count == 3
+        assert mock_sleep.call_count == 2  # one combined limiter/backoff sleep per retry
+
+    @patch("overpass_http.time.sleep")
+    def test_honors_retry_after_header(self, mock_sleep, overpass_client):
+        responses = [
+            _mock_response(429, headers={"Retry-After": "7"}),
+            _mock_response(200, {"elements": []}),
+        ]
+
+        with patch.object(requests.Session, "post", side_effect=responses):
+            overpass_client.query("test query", caller="test")
+
+        mock_sleep.assert_called_once_with(7.0)
+
+    @patch("overpass_http.time.sleep")
+    def test_backoff_is_jittered_and_capped(self, mock_sleep, overpass_client):
+        overpass_client._bucket = _TokenBucket(capacity=10, rate=1.0, min_rate=1.0)
+        overpass_client.MAX_RETRIES = 6
+
+        with patch.object(requests.Session, "post", return_value=_mock_response(503)), \
+                patch("overpass_http.get_overpass_cache_stale", return_value=None):
+            with pytest.raises(OverpassQueryError):
+                overpass_client.query("test query", caller="test")
+
+        delays = [c.args[0] for c in mock_sleep.call_args_list]
+        assert len(delays) == 6
+        assert all(overpass_client.RETRY_BASE <= d <= overpass_client.MAX_BACKOFF for d in delays)
 
-    @patch("overpass_http.get_overpass_cache_stale", return_value=None)
-    @patch("overpass_http.get_overpass_cache", return_value=None)
     @patch("overpass_http.time.sleep")
-    def test_exhausts_retries_and_raises(self, mock_sleep, mock_cache, mock_stale):
-        client = OverpassHTTPClient()
-        client.MAX_RETRIES = 1
+    def test_exhausts_retries_and_raises(self, mock_sleep, overpass_client):
+        overpass_client.MAX_RETRIES = 1
 
         mock_resp = _mock_response(429)
         with patch.object(requests.Session, "post", return_value=mock_resp):
             with pytest.raises(OverpassRateLimitError):
-                client.query("test query", caller="test")
+                overpass_client.query("test query", caller="test")
 
     @patch("overpass_http.get_overpass_cache_stale")
-    @patch("overpass_http.get_overpass_cache", return_value=None)
     @patch("overpass_http.time.sleep")
-    def test_stale_cache_fallback_when_http_fails(self, mock_sleep, mock_cache, mock_stale):
+    def test_stale_cache_fallback_when_http_fails(self, mock_sleep, mock_stale, overpass_client):
         """When HTTP fails and no fresh cache, serve stale cache if available."""
         stale_json = '{"elements": [{"id": 1, "type": "way"}], "version": 0.6}'
         mock_stale.return_value = (stale_json, "2024-01-15T12:00:00+00:00")
 
-        client = OverpassHTTPClient()
-        client.MAX_RETRIES = 0
+        overpass_client.MAX_RETRIES = 0
 
         mock_resp = _mock_response(504)
         with patch.object(requests.Session, "post", return_value=mock_resp):
-            result = client.query("test query", caller="test")
+            result = overpass_client.query("test query", caller="test")
 
         assert result["elements"] == [{"id": 1, "type": "way"}]
         assert result["_stale"] is True
         assert result["_stale_created_at"] == "2024-01-15T12:00:00+00:00"
 
     @patch("overpass_http.get_overpass_cache_stale")
-    @patch("overpass_http.get_overpass_cache", return_value=None)
     @patch("overpass_http.time.sleep")
-    def test_400_does_not_fall_back_to_stale_cache(self, mock_sleep, mock_cache, mock_stale):
+    def test_400_does_not_fall_back_to_stale_cache(self, mock_sleep, mock_stale, overpass_client):
         """Non-retryable client errors (400) must propagate, not serve stale data."""
         mock_stale.return_value = ('{"elements": []}', "2024-01-15T12:00:00+00:00")
 
-        client = OverpassHTTPClient()
-        client.MAX_RETRIES = 0
+        overpass_client.MAX_RETRIES = 0
 
         mock_resp = _mock_response(400)
         with patch.object(requests.Session, "post", return_value=mock_resp):
             with pytest.raises(OverpassQueryError, match="400"):
-                client.query("test query", caller="test")
+                overpass_client.query("test query", caller="test")
 
         mock_stale.assert_not_called()
 
     @patch("overpass_http.get_overpass_cache_stale")
-    @patch("overpass_http.get_overpass_cache", return_value=None)
     @patch("overpass_http.time.sleep")
-    def test_corrupted_stale_cache_reraises_original(self, mock_sleep, mock_cache, mock_stale):
+    def test_corrupted_stale_cache_reraises_original(self, mock_sleep, mock_stale, overpass_client):
         """Corrupted stale cache entry should re-raise the original HTTP error."""
         mock_stale.return_value = ("not valid json{{", "2024-01-01T00:00:00+00:00")
 
-        client = OverpassHTTPClient()
-        client.MAX_RETRIES = 0
+        overpass_client.MAX_RETRIES = 0
 
         mock_resp = _mock_response(504)
         with patch.object(requests.Session, "post", return_value=mock_resp):
             with pytest.raises(OverpassQueryError, match="504"):
-                client.query("test query", caller="test")
+                overpass_client.query("test query", caller="test")
 
 
 # =========================================================================
@@ -283,6 +388,18 @@ class TestIsRetryableError:
         e = OverpassQueryError("non-JSON response")
         assert OverpassHTTPClient._is_retryable_error(e) is False
 
+    def test_5xx_outside_http_prefix_is_retryable(self):
+        e = OverpassQueryError("Overpass request failed: 503 upstream [caller=test]")
+        assert OverpassHTTPClient._is_retryable_error(e) is True
+
+    def test_uppercase_timeout_is_retryable(self):
+        e = OverpassQueryError("Overpass 504 Gateway TIMEOUT")
+        assert OverpassHTTPClient._is_retryable_error(e) is True
+
+    def test_501_is_not_retryable(self):
+        e = OverpassQueryError("Overpass HTTP 501 [caller=test]")
+        assert OverpassHTTPClient._is_retryable_error(e) is False
+
 
 # =========================================================================
 # Module-level convenience function
@@ -3,10 +3,11 @@
 Tests the full payment state machine, route handlers, and edge cases
 using mocked Stripe calls. No real Stripe API traffic.
 
-See MANUAL RUNBOOK at the bottom of this file for the one-time
-Stripe test-mode verification to run on Railway before launch.
+See docs/stripe-smoke-test-runbook.md for the one-time Stripe
+test-mode verification to run on Railway before launch.
 """
 
+from dataclasses import dataclass
 from unittest.mock import patch, MagicMock
 
 import pytest
@@ -31,6 +32,15 @@ def _make_payment(payment_id="pay_abc123", stripe_session_id="cs_test_123",
     return payment_id
 
 
+@dataclass(slots=True)
+class _FakeStripeSession:
+    """Stand-in for stripe.checkout.Session: only the fields app.py reads."""
+
+    id: str = "cs_fake"
+    url: str = ""
+    payment_status: str = "paid"
+
+
 def _post_json(client, url, data=None, **kwargs):
     """POST form data and parse the JSON response."""
     resp = client.post(url, data=data, **kwargs)
@@ -82,36 +92,35 @@ class TestUpdatePaymentStatus:
 
 
 class TestRedeemPayment:
-    def test_redeem_paid(self):
+    @pytest.mark.parametrize("history, expected, final_status", [
+        pytest.param([PAYMENT_PAID], True, PAYMENT_REDEEMED, id="paid"),
+        # Second redemption of the same token must be rejected.
+        pytest.param([PAYMENT_PAID, "redeem"], False, PAYMENT_REDEEMED,
+                     id="double-redeem"),
+        # Credits reissued after failure can be redeemed again.
+        pytest.param([PAYMENT_PAID, "redeem", PAYMENT_FAILED_REISSUED], True,
+                     PAYMENT_REDEEMED, id="failed-reissued"),
+        # Cannot redeem an unpaid (pending) payment.
+        pytest.param([], False, PAYMENT_PENDING, id="pending"),
+    ])
+    def test_redeem_state_machine(self, history, expected, final_status):
+        pid = _make_payment()
+        for step in history:
+            if step == "redeem":
+                assert redeem_payment(pid) is True
+            else:
+                update_payment_status(pid, step)
+        assert redeem_payment(pid, job_id="job_1") is expected
+        assert get_payment_by_id(pid)["status"] == final_status
+
+    def test_redeem_records_job_and_timestamp(self):
         pid = _make_payment()
         update_payment_status(pid, PAYMENT_PAID)
         assert redeem_payment(pid, job_id="job_1") is True
         p = get_payment_by_id(pid)
-        assert p["status"] == PAYMENT_REDEEMED
         assert p["redeemed_at"] is not None
         assert p["job_id"] == "job_1"
 
-    def test_double_redeem_fails(self):
-        """Second redemption of the same token must be rejected."""
-        pid = _make_payment()
-        update_payment_status(pid, PAYMENT_PAID)
-        assert redeem_payment(pid) is True
-        assert redeem_payment(pid) is False  # already redeemed
-
-    def test_redeem_failed_reissued(self):
-        """Credits reissued after failure can be redeemed again."""
-        pid = _make_payment()
-        update_payment_status(pid, PAYMENT_PAID)
-        redeem_payment(pid)
-        update_payment_status(pid, PAYMENT_FAILED_REISSUED)
-        assert redeem_payment(pid, job_id="job_retry") is True
-        assert get_payment_by_id(pid)["status"] == PAYMENT_REDEEMED
-
-    def test_redeem_pending_fails(self):
-        """Cannot redeem an unpaid (pending) payment."""
-        pid = _make_payment()
-        assert redeem_payment(pid) is False
-
     def test_lookup_by_job_id(self):
         pid = _make_payment()
         update_payment_status(pid, PAYMENT_PAID)
@@ -182,9 +191,10 @@ class TestCheckoutCreate:
     @patch("app.STRIPE_AVAILABLE", True)
     @patch("app.stripe")
     def test_happy_path(self, mock_stripe, client):
-        mock_session = MagicMock()
-        mock_session.id = "cs_test_session_001"
-        mock_session.url = "https://checkout.stripe.com/pay/cs_test_session_001"
+        mock_session = _FakeStripeSession(
+            id="cs_test_session_001",
+            url="https://checkout.stripe.com/pay/cs_test_session_001",
+        )
         mock_stripe.checkout.Session.create.return_value = mock_session
 
         resp, body = _post_json(client, "/checkout/create", data={
@@ -243,9 +253,10 @@ class TestCheckoutSubscription:
     @patch("app._STRIPE_SUBSCRIPTION_PRICES", {"30d": "price_30d", "60d": "price_60d", "90d": "price_90d"})
     @patch("app.stripe")
     def test_happy_path(self, mock_stripe, client):
-        mock_session = MagicMock()
-        mock_session.id = "cs_sub_001"
-        mock_session.url = "https://checkout.stripe.com/pay/cs_sub_001"
+        mock_session = _FakeStripeSession(
+            id="cs_sub_001",
+            url="https://checkout.stripe.com/pay/cs_sub_001",
+        )
         mock_stripe.checkout.Session.create.return_value = mock_session
 
         resp, body = _post_json(client, "/checkout-subscription", json={
@@ -267,8 +278,7 @@ class TestCheckoutSubscription:
     @patch("app.stripe")
     def test_all_plan_slugs(self, mock_stripe, client):
         """Each valid plan slug routes to its price ID."""
-        mock_session = MagicMock()
-        mock_session.url = "https://checkout.stripe.com/pay/cs_test"
+        mock_session = _FakeStripeSession(url="https://checkout.stripe.com/pay/cs_test")
         mock_stripe.checkout.Session.create.return_value = mock_session
 
         for plan, expected_price in [("30d", "price_30d"), ("60d", "price_60d"), ("90d", "price_90d")]:
@@ -396,6 +406,36 @@ class TestStripeWebhook:
         assert resp.status_code == 200
         assert get_payment_by_id(pid)["status"] == PAYMENT_REDEEMED  # unchanged
 
+    @patch("app.STRIPE_AVAILABLE", True)
+    @patch("app.stripe")
+    def test_invoice_payment_failed_marks_past_due(self, mock_stripe, client):
+        from models import create_subscription, get_subscription_by_stripe_id
+        create_subscription("sub_local_1", "buyer@example.com", "sub_wh_001",
+                            "cus_1", "2026-01-01T00:00:00+00:00",
+                            "2026-02-01T00:00:00+00:00")
+
+        mock_stripe.Webhook.construct_event.return_value = {
+            "type": "invoice.payment_failed",
+            "data": {"object": {"subscription": "sub_wh_001"}},
+        }
+
+        resp = client.post("/webhook/stripe", data=b"payload",
+                           headers={"Stripe-Signature": "sig_test"})
+        assert resp.status_code == 200
+        assert get_subscription_by_stripe_id("sub_wh_001")["status"] == "past_due"
+
+    @patch("app.STRIPE_AVAILABLE", True)
+    @patch("app.stripe")
+    def test_unhandled_event_type_acknowledged(self, mock_stripe, client):
+        mock_stripe.Webhook.construct_event.return_value = {
+            "type": "charge.refunded",
+            "data": {"object": {"id": "ch_1"}},
+        }
+
+        resp = client.post("/webhook/stripe", data=b"payload",
+                           headers={"Stripe-Signature": "sig_test"})
+        assert resp.status_code == 200
+
     @patch("app.STRIPE_AVAILABLE", True)
     @patch("app.stripe")
     def test_invalid_signature(self, mock_stripe, client):
@@ -482,8 +522,7 @@ class TestReturnFromStripe:
         """Webhook hasn't arrived: direct Stripe verify confirms payment."""
         pid = _make_payment(stripe_session_id="cs_pending_verify")
 
-        mock_session = MagicMock()
-        mock_session.payment_status = "paid"
+        mock_session = _FakeStripeSession(payment_status="paid")
         mock_stripe.checkout.Session.retrieve.return_value = mock_session
 
         resp, body = _post_json(client, "/", data={
@@ -502,8 +541,7 @@ class TestReturnFromStripe:
         """Pending token + Stripe says not paid → 402."""
         pid = _make_payment(stripe_session_id="cs_unpaid")
 
-        mock_session = MagicMock()
-        mock_session.payment_status = "unpaid"
+        mock_session = _FakeStripeSession(payment_status="unpaid")
         mock_stripe.checkout.Session.retrieve.return_value = mock_session
 
         resp, body = _post_json(client, "/", data={
@@ -689,9 +727,10 @@ class TestCheckoutStripeCustomer:
         mock_customer.id = "cus_new_123"
         mock_stripe.Customer.create.return_value = mock_customer
 
-        mock_session = MagicMock()
-        mock_session.id = "cs_cust_001"
-        mock_session.url = "https://checkout.stripe.com/pay/cs_cust_001"
+        mock_session = _FakeStripeSession(
+            id="cs_cust_001",
+            url="https://checkout.stripe.com/pay/cs_cust_001",
+        )
         mock_stripe.checkout.Session.create.return_value = mock_session
 
         user, _ = get_or_create_user(email="alice@example.com", name="Alice")
@@ -733,9 +772,10 @@ class TestCheckoutStripeCustomer:
         """User with existing stripe_customer_id skips Customer.create."""
         from models import get_or_create_user, update_user_stripe_customer
 
-        mock_session = MagicMock()
-        mock_session.id = "cs_cust_002"
-        mock_session.url = "https://checkout.stripe.com/pay/cs_cust_002"
+        mock_session = _FakeStripeSession(
+            id="cs_cust_002",
+            url="https://checkout.stripe.com/pay/cs_cust_002",
+        )
         mock_stripe.checkout.Session.create.return_value = mock_session
 
         user, _ = get_or_create_user(email="bob@example.com", name="Bob")
@@ -765,9 +805,10 @@ class TestCheckoutStripeCustomer:
 
         mock_stripe.Customer.create.side_effect = Exception("Stripe API error")
 
-        mock_session = MagicMock()
-        mock_session.id = "cs_cust_003"
-        mock_session.url = "https://checkout.stripe.com/pay/cs_cust_003"
+        mock_session = _FakeStripeSession(
+            id="cs_cust_003",
+            url="https://checkout.stripe.com/pay/cs_cust_003",
+        )
         mock_stripe.checkout.Session.create.return_value = mock_session
 
         user, _ = get_or_create_user(email="carol@example.com", name="Carol")
@@ -790,9 +831,10 @@ class TestCheckoutStripeCustomer:
     @patch("app.stripe")
     def test_anonymous_checkout_no_customer(self, mock_stripe, client):
         """Anonymous user gets no customer or customer_email."""
-        mock_session = MagicMock()
-        mock_session.id = "cs_anon_001"
-        mock_session.url = "https://checkout.stripe.com/pay/cs_anon_001"
+        mock_session = _FakeStripeSession(
+            id="cs_anon_001",
+            url="https://checkout.stripe.com/pay/cs_anon_001",
+        )
         mock_stripe.checkout.Session.create.return_value = mock_session
 
         resp, body = _post_json(client, "/checkout/create", data={
@@ -809,80 +851,4 @@ class TestCheckoutStripeCustomer:
 # Step 10: Manual runbook
 # ===========================================================================
 
-MANUAL_RUNBOOK = """
-================================================================================
-MANUAL RUNBOOK — Stripe Test-Mode Smoke Test (NES-64)
-================================================================================
-
-Run this once on the deployed Railway environment before flipping
-REQUIRE_PAYMENT=true in production.
-
-PREREQUISITES
-─────────────
-- Railway env has STRIPE_SECRET_KEY (sk_test_...) set
-- Railway env has STRIPE_WEBHOOK_SECRET (whsec_...) set
-- Railway env has STRIPE_PRICE_ID (price_...) set
-- REQUIRE_PAYMENT=true on the staging/test deploy
-- Stripe Dashboard → Webhooks shows the /webhook/stripe endpoint
-  with 'checkout.session.completed' event selected
-
-OPTION A: TEST AGAINST DEPLOYED RAILWAY ENDPOINT (recommended)
-──────────────────────────────────────────────────────────────
-1. Open the Railway deployment URL in a browser.
-2. Enter a test address (e.g. "42 Elm St, White Plains, NY 10601").
-3. Click "Evaluate" — you should be redirected to Stripe Checkout.
-4. Use test card: 4242 4242 4242 4242
-   - Expiry: any future date (e.g. 12/34)
-   - CVC: any 3 digits (e.g. 123)
-   - Name/ZIP: anything
-5. After payment, you should be redirected back to NestCheck.
-6. The evaluation should start automatically (progress stages visible).
-7. Expected outcome: report loads at /s/{snapshot_id}.
-
-VERIFY IN STRIPE DASHBOARD:
-  - Payments → shows a $9.00 test payment (succeeded)
-  - Webhooks → Recent deliveries → checkout.session.completed → 200 OK
-  - The payment_id in the client_reference_id matches the DB
-
-VERIFY IN RAILWAY LOGS:
-  - "Payment confirmed via webhook: pay_xxx" log line
-  - "Created evaluation job xxx" log line
-  - No 402 or 500 errors
-
-OPTION B: LOCAL TESTING WITH STRIPE CLI
-───────────────────────────────────────
-1. Install Stripe CLI: brew install stripe/stripe-cli/stripe
-2. Login: stripe login
-3. Forward webhooks: stripe listen --forward-to localhost:5000/webhook/stripe
-4. Copy the webhook signing secret (whsec_...) and set it in .env
-5. Start the app: REQUIRE_PAYMENT=true flask run
-6. Follow steps 2–7 from Option A using http://localhost:5000
-7. The Stripe CLI terminal should show webhook delivery + 200 response.
-
-FAILURE PATH TEST
-─────────────────
-1. Complete a payment (steps 1–5 above).
-2. Before the evaluation finishes, stop the worker (kill the process).
-   Or: temporarily set GOOGLE_MAPS_API_KEY to an invalid value so the
-   evaluation fails.
-3. Verify the job shows status 'failed' in /job/{job_id}.
-4. Check the DB: the payment status should be 'failed_reissued'.
-5. Re-enter the same address with the same payment_token URL param.
-6. Expected outcome: evaluation starts again without requiring new payment.
-
-DOUBLE-REDEMPTION TEST
-──────────────────────
-1. Complete a successful paid evaluation (steps 1–7).
-2. Copy the payment_token from the URL and try to submit it again
-   (manually construct: POST / with payment_token + address).
-3. Expected outcome: 402 error "Invalid or expired payment".
-
-CHECKLIST
-─────────
-[ ] Happy path: payment → report delivery works
-[ ] Stripe Dashboard shows successful payment + webhook 200
-[ ] Failure path: failed eval → credit reissued → retry works
-[ ] Double-redemption: second use of same token rejected
-[ ] Builder mode: evaluation works without payment when BUILDER_MODE=true
-================================================================================
-"""
+# See docs/stripe-smoke-test-runbook.md
@@ -11,6 +11,7 @@ Covers the most critical business logic in the codebase:
 import math
 from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pytest
 
 from property_evaluator import (
@@ -27,8 +28,11 @@ from property_evaluator import (
     _closest_distance_to_way_ft,
     _coerce_score,
     _distance_feet,
+    _distance_feet_batch,
+    _distance_feet_precomp,
     _element_distance_ft,
     _parse_max_voltage,
+    _query_environmental_hazards,
     check_cell_towers,
     check_gas_stations,
     check_high_traffic_road,
@@ -50,6 +54,74 @@ from property_evaluator import (
     MIN_BEDROOMS,
     MIN_SQFT,
 )
+from spatial_data import FacilityRecord
+
+
+# ============================================================================
+# Shared fixtures
+# ============================================================================
+
+@pytest.fixture
+def make_store():
+    """Factory for spatial store stubs.
+
+    ``make_store(lines_within=[...])`` returns an available store whose
+    named query methods return the given values; ``available=False``
+    stubs a store with no local data.
+    """
+    def _make(available=True, **returns):
+        store = MagicMock()
+        store.is_available.return_value = available
+        for method, value in returns.items():
+            getattr(store, method).return_value = value
+        return store
+    return _make
+
+
+@pytest.fixture
+def unavailable_store(make_store):
+    """Spatial store stub with no local data."""
+    return make_store(available=False)
+
+
+@pytest.fixture
+def available_store(make_store):
+    """Spatial store stub with local data; tests prime its query methods."""
+    return make_store()
+
+
+class _FakeMaps:
+    """Stand-in for GoogleMapsClient exposing only what check_gas_stations calls.
+
+    Cheaper than ``MagicMock(spec=GoogleMapsClient)``, which introspects the
+    whole class on every construction.
+    """
+
+    def __init__(self, stations):
+        self.places_nearby = MagicMock(return_value=stations)
+
+
+@pytest.fixture
+def make_maps():
+    """Factory for a maps stub whose places_nearby returns *stations*."""
+    def _make(stations=()):
+        return _FakeMaps(list(stations))
+    return _make
+
+
+@pytest.fixture
+def make_hpms():
+    """Factory for HPMS road segments at *distance_m* with the given AADT."""
+    def _make(aadt, distance_m=100.0, name="HPMS", route_id="", **metadata):
+        return FacilityRecord(
+            facility_type="hpms",
+            name=name,
+            lat=40.0, lng=-74.0,
+            distance_meters=distance_m,
+            distance_feet=distance_m * 3.28084,
+            metadata={"aadt": aadt, "route_id": route_id, **metadata},
+        )
+    return _make
 
 
 # ============================================================================
@@ -111,6 +183,33 @@ class TestClosestDistanceToWay:
         result = _closest_distance_to_way_ft(40.0, -74.0, [1, 2], nodes)
         assert result < float("inf")
 
+    def test_long_way_matches_scalar(self):
+        # Enough nodes to take the vectorized path
+        nodes = {i: (40.0 + i * 0.0003, -74.0 + i * 0.0002) for i in range(1, 101)}
+        result = _closest_distance_to_way_ft(40.0, -74.0, list(nodes), nodes)
+        expected = min(_distance_feet(40.0, -74.0, lat, lng) for lat, lng in nodes.values())
+        assert result == expected
+
+
+class TestDistanceFeetPrecomp:
+    """Pre-converted fixed endpoint gives the same distance as the scalar helper."""
+
+    def test_matches_scalar(self):
+        phi1 = math.radians(40.6892)
+        result = _distance_feet_precomp(phi1, math.cos(phi1), -74.0445, 40.7484, -73.9857)
+        assert abs(result - _distance_feet(40.6892, -74.0445, 40.7484, -73.9857)) <= 1
+
+
+class TestDistanceFeetBatch:
+    """Vectorized haversine agrees with the scalar helper."""
+
+    def test_matches_scalar(self):
+        lats = np.array([40.7128, 40.7484, 41.0, 40.0])
+        lngs = np.array([-74.0060, -73.9857, -73.0, -74.0])
+        result = _distance_feet_batch(40.6892, -74.0445, lats, lngs)
+        for d, lat, lng in zip(result, lats, lngs):
+            assert abs(int(d) - _distance_feet(40.6892, -74.0445, lat, lng)) <= 1
+
 
 class TestElementDistanceFt:
     """Distance from property to an Overpass element (node or way)."""
@@ -141,6 +240,22 @@ class TestElementDistanceFt:
         dist = _element_distance_ft(40.0, -74.0, el, {})
         assert dist == float("inf")
 
+    def test_radius_keeps_node_inside_box(self):
+        el = {"type": "node", "lat": 40.001, "lon": -74.0, "id": 1}
+        assert _element_distance_ft(40.0, -74.0, el, {}, 400) == _element_distance_ft(40.0, -74.0, el, {})
+
+    def test_radius_rejects_node_outside_box(self):
+        # ~0.002 deg lng at 40°N ≈ 560 ft, outside a 300 ft box
+        el = {"type": "node", "lat": 40.0, "lon": -74.002, "id": 1}
+        assert _element_distance_ft(40.0, -74.0, el, {}, 300) == float("inf")
+
+    def test_radius_keeps_only_way_nodes_inside_box(self):
+        el = {"type": "way", "id": 1, "nodes": [10, 11]}
+        all_nodes = {10: (40.01, -74.0), 11: (40.001, -74.0)}
+        dist = _element_distance_ft(40.0, -74.0, el, all_nodes, 400)
+        assert 300 < dist < 400
+        assert _element_distance_ft(40.0, -74.0, el, all_nodes, 200) == float("inf")
+
 
 # ============================================================================
 # Voltage parsing
@@ -168,6 +283,19 @@ class TestParseMaxVoltage:
     def test_whitespace_handling(self):
         assert _parse_max_voltage(" 115000 ; 230000 ") == 230000
 
+    def test_unit_suffix_slot_ignored(self):
+        assert _parse_max_voltage("115kV;69000") == 69000
+
+    @pytest.mark.parametrize("tag, expected", [
+        pytest.param("+115000", 115000, id="plus-sign"),
+        pytest.param("115_000;69000", 115000, id="digit-grouping"),
+        pytest.param("-230000;69000", 69000, id="negative-ignored"),
+        pytest.param("1__000;69000", 69000, id="double-underscore-rejected"),
+        pytest.param("115000;", 115000, id="trailing-separator"),
+    ])
+    def test_accepts_int_literal_forms(self, tag, expected):
+        assert _parse_max_voltage(tag) == expected
+
 
 # ============================================================================
 # _coerce_score
@@ -202,64 +330,46 @@ class TestCheckGasStations:
     returns no results but active underground tanks exist.
     """
 
-    def _make_maps(self, stations):
-        """Create a mock GoogleMapsClient that returns *stations* from places_nearby."""
-        maps = MagicMock(spec=GoogleMapsClient)
-        maps.places_nearby.return_value = stations
-        return maps
-
-    def _make_unavailable_store(self):
-        store = MagicMock()
-        store.is_available.return_value = False
-        return store
-
-    def _make_store(self, facilities=None):
-        """Create a mock spatial store returning *facilities* (default empty)."""
-        store = MagicMock()
-        store.is_available.return_value = True
-        store.find_facilities_within.return_value = facilities or []
-        return store
-
     @staticmethod
     def _station(lat, lng, name="Shell"):
         return {"geometry": {"location": {"lat": lat, "lng": lng}}, "name": name}
 
     # --- Places-primary path ---
 
-    def test_no_stations_pass(self):
-        maps = self._make_maps([])
-        result = check_gas_stations(40.0, -74.0, self._make_unavailable_store(), maps)
+    def test_no_stations_pass(self, unavailable_store, make_maps):
+        maps = make_maps([])
+        result = check_gas_stations(40.0, -74.0, unavailable_store, maps)
         assert result.result == CheckResult.PASS
 
-    def test_station_beyond_warn_threshold_pass(self):
+    def test_station_beyond_warn_threshold_pass(self, unavailable_store, make_maps):
         # Station at ~600 ft away (haversine)
         station = self._station(40.0018, -74.0, "Shell")
-        maps = self._make_maps([station])
-        result = check_gas_stations(40.0, -74.0, self._make_unavailable_store(), maps)
+        maps = make_maps([station])
+        result = check_gas_stations(40.0, -74.0, unavailable_store, maps)
         assert result.result == CheckResult.PASS
 
-    def test_station_within_fail_threshold_fail(self):
+    def test_station_within_fail_threshold_fail(self, unavailable_store, make_maps):
         """Station very close — inside CA 300 ft setback → FAIL."""
         # ~0.0007 degrees lat ≈ 255 ft
         station = self._station(40.0007, -74.0, "BP")
-        maps = self._make_maps([station])
-        result = check_gas_stations(40.0, -74.0, self._make_unavailable_store(), maps)
+        maps = make_maps([station])
+        result = check_gas_stations(40.0, -74.0, unavailable_store, maps)
         assert result.result == CheckResult.FAIL
         assert "TOO CLOSE" in result.details
 
-    def test_station_in_warning_band(self):
+    def test_station_in_warning_band(self, unavailable_store, make_maps):
         """Station at ~350 ft — beyond CA setback, within MD 500 ft → WARNING."""
         # ~0.001 degrees lat ≈ 364 ft
         station = self._station(40.001, -74.0, "Sunoco")
-        maps = self._make_maps([station])
-        result = check_gas_stations(40.0, -74.0, self._make_unavailable_store(), maps)
+        maps = make_maps([station])
+        result = check_gas_stations(40.0, -74.0, unavailable_store, maps)
         assert result.result == CheckResult.WARNING
         assert "NEARBY" in result.details
 
-    def test_api_error_with_no_ust_returns_unknown(self):
-        maps = MagicMock(spec=GoogleMapsClient)
+    def test_api_error_with_no_ust_returns_unknown(self, unavailable_store, make_maps):
+        maps = make_maps([])
         maps.places_nearby.side_effect = ValueError("API error")
-        result = check_gas_stations(40.0, -74.0, self._make_unavailable_store(), maps)
+        result = check_gas_stations(40.0, -74.0, unavailable_store, maps)
         assert result.result == CheckResult.UNKNOWN
 
     def test_no_store_no_maps_returns_unknown(self):
@@ -268,80 +378,76 @@ class TestCheckGasStations:
 
     # --- UST enrichment of Places results ---
 
-    def test_places_result_enriched_with_ust_tank_count(self):
-        from spatial_data import FacilityRecord
+    def test_places_result_enriched_with_ust_tank_count(self, make_maps, make_store):
         station = self._station(40.001, -74.0, "Shell")
-        maps = self._make_maps([station])
+        maps = make_maps([station])
         ust_match = FacilityRecord(
             facility_type="ust", name="Shell Oil",
             lat=40.001, lng=-74.0,
             distance_meters=10.0, distance_feet=33.0,
             metadata={"open_usts": 3, "closed_usts": 1},
         )
-        store = self._make_store([ust_match])
+        store = make_store(find_facilities_within=[ust_match])
         result = check_gas_stations(40.0, -74.0, store, maps)
         assert "3 active tanks" in result.details
 
     # --- UST-only caution (no Places match) ---
 
-    def test_ust_active_no_places_returns_warning(self):
+    def test_ust_active_no_places_returns_warning(self, make_maps, make_store):
         """Active UST facility but no Places gas station → unverified WARNING."""
-        from spatial_data import FacilityRecord
         facility = FacilityRecord(
             facility_type="ust", name="JSM SERVICE INC",
             lat=40.001, lng=-74.0,
             distance_meters=47.0, distance_feet=154.0,
             metadata={"open_usts": 2, "closed_usts": 0},
         )
-        store = self._make_store([facility])
-        maps = self._make_maps([])  # Places returns nothing
+        store = make_store(find_facilities_within=[facility])
+        maps = make_maps([])  # Places returns nothing
         result = check_gas_stations(40.0, -74.0, store, maps)
         assert result.result == CheckResult.WARNING
         assert "no operating gas station was confirmed" in result.details
         assert "JSM SERVICE INC" in result.details
 
-    def test_ust_closed_only_no_places_returns_pass(self):
+    def test_ust_closed_only_no_places_returns_pass(self, make_maps, make_store):
         """Closed-only UST facility, no Places gas station → PASS."""
-        from spatial_data import FacilityRecord
         facility = FacilityRecord(
             facility_type="ust", name="Old Tank",
             lat=40.001, lng=-74.0,
             distance_meters=30.0, distance_feet=98.0,
             metadata={"open_usts": 0, "closed_usts": 3},
         )
-        store = self._make_store([facility])
-        maps = self._make_maps([])
+        store = make_store(find_facilities_within=[facility])
+        maps = make_maps([])
         result = check_gas_stations(40.0, -74.0, store, maps)
         assert result.result == CheckResult.PASS
 
-    def test_ust_no_facilities_no_places_pass(self):
-        store = self._make_store([])
-        maps = self._make_maps([])
+    def test_ust_no_facilities_no_places_pass(self, make_maps, make_store):
+        store = make_store(find_facilities_within=[])
+        maps = make_maps([])
         result = check_gas_stations(40.0, -74.0, store, maps)
         assert result.result == CheckResult.PASS
 
     # --- Fallback when Places API fails ---
 
-    def test_places_error_ust_active_returns_warning(self):
+    def test_places_error_ust_active_returns_warning(self, make_maps, make_store):
         """Places API fails, but UST data shows active tanks → WARNING caution."""
-        from spatial_data import FacilityRecord
         facility = FacilityRecord(
             facility_type="ust", name="Corner Fuel",
             lat=40.001, lng=-74.0,
             distance_meters=60.0, distance_feet=197.0,
             metadata={"open_usts": 1},
         )
-        store = self._make_store([facility])
-        maps = MagicMock(spec=GoogleMapsClient)
+        store = make_store(find_facilities_within=[facility])
+        maps = make_maps([])
         maps.places_nearby.side_effect = ValueError("API error")
         result = check_gas_stations(40.0, -74.0, store, maps)
         assert result.result == CheckResult.WARNING
         assert "no operating gas station was confirmed" in result.details
 
-    def test_places_error_ust_empty_returns_pass_with_note(self):
+    def test_places_error_ust_empty_returns_pass_with_note(self, make_maps, make_store):
         """Places API fails, UST has no active tanks → PASS with confidence note."""
-        store = self._make_store([])
-        maps = MagicMock(spec=GoogleMapsClient)
+        store = make_store(find_facilities_within=[])
+        maps = make_maps([])
         maps.places_nearby.side_effect = ValueError("API error")
         result = check_gas_stations(40.0, -74.0, store, maps)
         assert result.result == CheckResult.PASS
@@ -360,235 +466,84 @@ class TestCheckHighTrafficRoad:
         assert result.result == CheckResult.UNKNOWN
         assert result.name == "High-traffic road"
 
-    def test_unavailable_store_returns_unknown(self):
-        store = MagicMock()
-        store.is_available.return_value = False
-        result = check_high_traffic_road(40.0, -74.0, store)
+    def test_unavailable_store_returns_unknown(self, unavailable_store):
+        result = check_high_traffic_road(40.0, -74.0, unavailable_store)
         assert result.result == CheckResult.UNKNOWN
 
-    def test_no_segments_returns_pass(self):
-        store = MagicMock()
-        store.is_available.return_value = True
-        store.lines_within.return_value = []
-        result = check_high_traffic_road(40.0, -74.0, store)
-        assert result.result == CheckResult.PASS
-
-    def test_high_aadt_within_150m_returns_fail(self):
-        from spatial_data import FacilityRecord
-        segment = FacilityRecord(
-            facility_type="hpms",
-            name="I-95",
-            lat=40.0, lng=-74.0,
-            distance_meters=100.0,
-            distance_feet=100.0 * 3.28084,
-            metadata={"aadt": 75000, "route_id": "I-95"},
-        )
-        store = MagicMock()
-        store.is_available.return_value = True
-        store.lines_within.return_value = [segment]
-        result = check_high_traffic_road(40.0, -74.0, store)
-        assert result.result == CheckResult.FAIL
-        assert "75,000" in result.details
-
-    def test_high_aadt_in_warning_band_returns_warning(self):
-        from spatial_data import FacilityRecord
-        segment = FacilityRecord(
-            facility_type="hpms",
-            name="I-95",
-            lat=40.0, lng=-74.0,
-            distance_meters=200.0,
-            distance_feet=200.0 * 3.28084,
-            metadata={"aadt": 60000, "route_id": "I-95"},
-        )
-        store = MagicMock()
-        store.is_available.return_value = True
-        store.lines_within.return_value = [segment]
-        result = check_high_traffic_road(40.0, -74.0, store)
-        assert result.result == CheckResult.WARNING
-
-    def test_null_aadt_excluded(self):
-        from spatial_data import FacilityRecord
-        segment = FacilityRecord(
-            facility_type="hpms",
-            name="Unknown Rd",
-            lat=40.0, lng=-74.0,
-            distance_meters=100.0,
-            distance_feet=100.0 * 3.28084,
-            metadata={"aadt": None, "route_id": ""},
-        )
-        store = MagicMock()
-        store.is_available.return_value = True
-        store.lines_within.return_value = [segment]
-        result = check_high_traffic_road(40.0, -74.0, store)
-        assert result.result == CheckResult.PASS
-
-    def test_below_threshold_aadt_returns_pass(self):
-        from spatial_data import FacilityRecord
-        segment = FacilityRecord(
-            facility_type="hpms",
-            name="Local Rd",
-            lat=40.0, lng=-74.0,
-            distance_meters=100.0,
-            distance_feet=100.0 * 3.28084,
-            metadata={"aadt": 30000, "route_id": ""},
-        )
-        store = MagicMock()
-        store.is_available.return_value = True
-        store.lines_within.return_value = [segment]
-        result = check_high_traffic_road(40.0, -74.0, store)
+    def test_no_segments_returns_pass(self, make_store):
+        result = check_high_traffic_road(40.0, -74.0, make_store(lines_within=[]))
         assert result.result == CheckResult.PASS
 
-    def test_multiple_segments_worst_wins(self):
+    @pytest.mark.parametrize("aadt,dist_m,expected,detail_subs", [
+        pytest.param(75000, 100.0, CheckResult.FAIL, ("75,000",), id="high_aadt_within_150m_fail"),
+        pytest.param(60000, 200.0, CheckResult.WARNING, (), id="high_aadt_in_warning_band"),
+        pytest.param(None, 100.0, CheckResult.PASS, (), id="null_aadt_excluded"),
+        pytest.param(30000, 100.0, CheckResult.PASS, (), id="below_threshold_aadt_pass"),
+        # 200m ≈ 656 ft
+        pytest.param(65000, 200.0, CheckResult.WARNING, ("65,000", "656"), id="warning_only_detail"),
+    ])
+    def test_single_segment(self, make_hpms, make_store, aadt, dist_m, expected, detail_subs):
+        segment = make_hpms(aadt, dist_m, name="I-95", route_id="I-95")
+        result = check_high_traffic_road(40.0, -74.0, make_store(lines_within=[segment]))
+        assert result.result == expected
+        for sub in detail_subs:
+            assert sub in result.details
+
+    def test_multiple_segments_worst_wins(self, make_hpms, make_store):
         """FAIL zone segment beats WARNING zone segment with higher AADT."""
-        from spatial_data import FacilityRecord
         segments = [
-            FacilityRecord(
-                facility_type="hpms", name="Local Rd",
-                lat=40.0, lng=-74.0,
-                distance_meters=100.0, distance_feet=100.0 * 3.28084,
-                metadata={"aadt": 40000, "route_id": ""},
-            ),
-            FacilityRecord(
-                facility_type="hpms", name="US-1",
-                lat=40.0, lng=-74.0,
-                distance_meters=120.0, distance_feet=120.0 * 3.28084,
-                metadata={"aadt": 60000, "route_id": "US-1"},
-            ),
-            FacilityRecord(
-                facility_type="hpms", name="I-95",
-                lat=40.0, lng=-74.0,
-                distance_meters=200.0, distance_feet=200.0 * 3.28084,
-                metadata={"aadt": 80000, "route_id": "I-95"},
-            ),
+            make_hpms(40000, 100.0, name="Local Rd"),
+            make_hpms(60000, 120.0, name="US-1", route_id="US-1"),
+            make_hpms(80000, 200.0, name="I-95", route_id="I-95"),
         ]
-        store = MagicMock()
-        store.is_available.return_value = True
-        store.lines_within.return_value = segments
-        result = check_high_traffic_road(40.0, -74.0, store)
+        result = check_high_traffic_road(40.0, -74.0, make_store(lines_within=segments))
         assert result.result == CheckResult.FAIL
         # Detail references the 60K fail-zone segment, not the 80K warn-zone one
         assert "60,000" in result.details
 
-    def test_fail_zone_takes_priority_over_warning(self):
+    def test_fail_zone_takes_priority_over_warning(self, make_hpms, make_store):
         """FAIL zone hit overrides WARNING zone hit regardless of AADT."""
-        from spatial_data import FacilityRecord
         segments = [
-            FacilityRecord(
-                facility_type="hpms", name="US-1",
-                lat=40.0, lng=-74.0,
-                distance_meters=140.0, distance_feet=140.0 * 3.28084,
-                metadata={"aadt": 55000, "route_id": "US-1"},
-            ),
-            FacilityRecord(
-                facility_type="hpms", name="I-95",
-                lat=40.0, lng=-74.0,
-                distance_meters=250.0, distance_feet=250.0 * 3.28084,
-                metadata={"aadt": 70000, "route_id": "I-95"},
-            ),
+            make_hpms(55000, 140.0, name="US-1", route_id="US-1"),
+            make_hpms(70000, 250.0, name="I-95", route_id="I-95"),
         ]
-        store = MagicMock()
-        store.is_available.return_value = True
-        store.lines_within.return_value = segments
-        result = check_high_traffic_road(40.0, -74.0, store)
+        result = check_high_traffic_road(40.0, -74.0, make_store(lines_within=segments))
         assert result.result == CheckResult.FAIL
         assert "55,000" in result.details
 
-    def test_warning_only_no_fail_zone_segments(self):
-        """Segment above threshold in warning band (150-300m) returns WARNING."""
-        from spatial_data import FacilityRecord
-        segment = FacilityRecord(
-            facility_type="hpms", name="I-287",
-            lat=40.0, lng=-74.0,
-            distance_meters=200.0, distance_feet=200.0 * 3.28084,
-            metadata={"aadt": 65000, "route_id": "I-287"},
-        )
-        store = MagicMock()
-        store.is_available.return_value = True
-        store.lines_within.return_value = [segment]
-        result = check_high_traffic_road(40.0, -74.0, store)
-        assert result.result == CheckResult.WARNING
-        assert "65,000" in result.details
-        assert "656" in result.details  # 200m ≈ 656 ft
-
-    def test_detail_format_named_road(self):
+    def test_detail_format_named_road(self, make_hpms, make_store):
         """Named road detail: '{name}: {aadt} vehicles/day, {dist} ft away'."""
-        from spatial_data import FacilityRecord
-        segment = FacilityRecord(
-            facility_type="hpms", name="HPMS segment",
-            lat=40.0, lng=-74.0,
-            distance_meters=100.0, distance_feet=100.0 * 3.28084,
-            metadata={"aadt": 75000, "route_id": "I-95"},
-        )
-        store = MagicMock()
-        store.is_available.return_value = True
-        store.lines_within.return_value = [segment]
-        result = check_high_traffic_road(40.0, -74.0, store)
+        segment = make_hpms(75000, name="HPMS segment", route_id="I-95")
+        result = check_high_traffic_road(40.0, -74.0, make_store(lines_within=[segment]))
         assert "I-95" in result.details
         assert "75,000" in result.details
 
-    def test_detail_format_anonymous_road(self):
+    def test_detail_format_anonymous_road(self, make_hpms, make_store):
         """Anonymous road detail: 'Road with {aadt} vehicles/day found ...'."""
-        from spatial_data import FacilityRecord
-        segment = FacilityRecord(
-            facility_type="hpms", name="",
-            lat=40.0, lng=-74.0,
-            distance_meters=100.0, distance_feet=100.0 * 3.28084,
-            metadata={"aadt": 75000, "route_id": "", "route_name": ""},
-        )
-        store = MagicMock()
-        store.is_available.return_value = True
-        store.lines_within.return_value = [segment]
-        result = check_high_traffic_road(40.0, -74.0, store)
+        segment = make_hpms(75000, name="", route_name="")
+        result = check_high_traffic_road(40.0, -74.0, make_store(lines_within=[segment]))
         assert "Road with" in result.details
         assert "75,000" in result.details
 
-    def test_all_segments_below_threshold_returns_pass(self):
+    def test_all_segments_below_threshold_returns_pass(self, make_hpms, make_store):
         """Multiple segments all with AADT < 50,000 within fail zone → PASS."""
-        from spatial_data import FacilityRecord
         segments = [
-            FacilityRecord(
-                facility_type="hpms", name="County Rd 1",
-                lat=40.0, lng=-74.0,
-                distance_meters=50.0, distance_feet=50.0 * 3.28084,
-                metadata={"aadt": 25000, "route_id": ""},
-            ),
-            FacilityRecord(
-                facility_type="hpms", name="County Rd 2",
-                lat=40.0, lng=-74.0,
-                distance_meters=100.0, distance_feet=100.0 * 3.28084,
-                metadata={"aadt": 35000, "route_id": ""},
-            ),
-            FacilityRecord(
-                facility_type="hpms", name="County Rd 3",
-                lat=40.0, lng=-74.0,
-                distance_meters=140.0, distance_feet=140.0 * 3.28084,
-                metadata={"aadt": 45000, "route_id": ""},
-            ),
+            make_hpms(25000, 50.0, name="County Rd 1"),
+            make_hpms(35000, 100.0, name="County Rd 2"),
+            make_hpms(45000, 140.0, name="County Rd 3"),
         ]
-        store = MagicMock()
-        store.is_available.return_value = True
-        store.lines_within.return_value = segments
-        result = check_high_traffic_road(40.0, -74.0, store)
+        result = check_high_traffic_road(40.0, -74.0, make_store(lines_within=segments))
         assert result.result == CheckResult.PASS
 
-    def test_high_aadt_beyond_warning_radius_returns_pass(self):
+    def test_high_aadt_beyond_warning_radius_returns_pass(self, make_hpms, make_store):
         """Segment with AADT >= 50K at 400m (beyond 300m warn radius) → PASS.
 
         Regression test for NES-266: warn_candidates filter was missing the
         upper distance bound (<= 300m), so segments up to 600m returned
         WARNING instead of PASS.
         """
-        from spatial_data import FacilityRecord
-        segment = FacilityRecord(
-            facility_type="hpms", name="I-95",
-            lat=40.0, lng=-74.0,
-            distance_meters=400.0, distance_feet=400.0 * 3.28084,
-            metadata={"aadt": 60000, "route_id": "I-95"},
-        )
-        store = MagicMock()
-        store.is_available.return_value = True
-        store.lines_within.return_value = [segment]
-        result = check_high_traffic_road(40.0, -74.0, store)
+        segment = make_hpms(60000, 400.0, name="I-95", route_id="I-95")
+        result = check_high_traffic_road(40.0, -74.0, make_store(lines_within=[segment]))
         assert result.result == CheckResult.PASS
         # Should report nearest high-traffic road in detail
         assert result.show_detail is True
@@ -599,81 +554,94 @@ class TestCheckHighTrafficRoad:
 # Tier 1: Environmental hazard checks
 # ============================================================================
 
+class TestQueryEnvironmentalHazards:
+    """Overpass hazard query shared by the power/substation/tower/industrial checks."""
+
+    def test_nearby_addresses_share_query_text(self):
+        with patch("overpass_http.overpass_query", return_value={"elements": []}) as mock_query:
+            _query_environmental_hazards(40.71281, -74.00601)
+            _query_environmental_hazards(40.71289, -74.00612)
+        first, second = (c.args[0] for c in mock_query.call_args_list)
+        assert first == second
+        assert "around:280,40.713,-74.006" in first
+
+    def test_buckets_elements_by_tag(self):
+        data = {"elements": [
+            {"type": "way", "id": 1, "nodes": [], "tags": {"power": "line", "voltage": "115000"}},
+            {"type": "node", "id": 2, "lat": 40.0, "lon": -74.0, "tags": {"power": "substation"}},
+            {"type": "node", "id": 3, "lat": 40.0, "lon": -74.0, "tags": {"man_made": "communications_tower"}},
+            {"type": "way", "id": 4, "nodes": [], "tags": {"landuse": "industrial"}},
+        ]}
+        with patch("overpass_http.overpass_query", return_value=data):
+            hazards = _query_environmental_hazards(40.0, -74.0)
+        assert [el["id"] for el in hazards["power_lines"]] == [1]
+        assert [el["id"] for el in hazards["substations"]] == [2]
+        assert [el["id"] for el in hazards["cell_towers"]] == [3]
+        assert [el["id"] for el in hazards["industrial_zones"]] == [4]
+
+
 class TestCheckPowerLines:
     """Tests for check_power_lines — HIFLD spatial data primary, Overpass fallback."""
 
-    def _make_unavailable_store(self):
-        store = MagicMock()
-        store.is_available.return_value = False
-        return store
-
     # --- Overpass fallback (spatial unavailable) ---
 
-    def test_none_hazard_results_unknown(self):
-        result = check_power_lines(40.0, -74.0, self._make_unavailable_store(), None)
+    def test_none_hazard_results_unknown(self, unavailable_store):
+        result = check_power_lines(40.0, -74.0, unavailable_store, None)
         assert result.result == CheckResult.UNKNOWN
 
-    def test_no_power_lines_pass(self):
+    def test_no_power_lines_pass(self, unavailable_store):
         hazards = {"power_lines": [], "_all_nodes": {}}
-        result = check_power_lines(40.0, -74.0, self._make_unavailable_store(), hazards)
+        result = check_power_lines(40.0, -74.0, unavailable_store, hazards)
         assert result.result == CheckResult.PASS
 
-    def test_close_power_line_warning(self):
+    def test_close_power_line_warning(self, unavailable_store):
         # Node 100 ft away
         line = {"type": "node", "id": 1, "lat": 40.0003, "lon": -74.0}
         hazards = {"power_lines": [line], "_all_nodes": {}}
-        result = check_power_lines(40.0, -74.0, self._make_unavailable_store(), hazards)
+        result = check_power_lines(40.0, -74.0, unavailable_store, hazards)
         assert result.result == CheckResult.WARNING
 
-    def test_far_power_line_pass(self):
+    def test_far_power_line_pass(self, unavailable_store):
         # Node ~1000 ft away
         line = {"type": "node", "id": 1, "lat": 40.003, "lon": -74.0}
         hazards = {"power_lines": [line], "_all_nodes": {}}
-        result = check_power_lines(40.0, -74.0, self._make_unavailable_store(), hazards)
+        result = check_power_lines(40.0, -74.0, unavailable_store, hazards)
         assert result.result == CheckResult.PASS
 
-    def test_required_is_false(self):
-        result = check_power_lines(40.0, -74.0, self._make_unavailable_store(), None)
+    def test_required_is_false(self, unavailable_store):
+        result = check_power_lines(40.0, -74.0, unavailable_store, None)
         assert result.required is False
 
     # --- HIFLD spatial data path ---
 
-    def test_spatial_no_lines_pass(self):
-        store = MagicMock()
-        store.is_available.return_value = True
-        store.lines_within.return_value = []
-        result = check_power_lines(40.0, -74.0, store)
+    def test_spatial_no_lines_pass(self, available_store):
+        available_store.lines_within.return_value = []
+        result = check_power_lines(40.0, -74.0, available_store)
         assert result.result == CheckResult.PASS
-        store.lines_within.assert_called_once_with(40.0, -74.0, 100, "hifld")
+        available_store.lines_within.assert_called_once_with(40.0, -74.0, 100, "hifld")
 
-    def test_spatial_close_line_warning(self):
-        from spatial_data import FacilityRecord
+    def test_spatial_close_line_warning(self, available_store):
         line = FacilityRecord(
             facility_type="hifld", name="345 kV - ConEd",
             lat=40.0, lng=-74.0,
             distance_meters=50.0, distance_feet=164.0,
             metadata={"voltage": 345, "volt_class": "230-345"},
         )
-        store = MagicMock()
-        store.is_available.return_value = True
-        store.lines_within.return_value = [line]
-        result = check_power_lines(40.0, -74.0, store)
+        available_store.lines_within.return_value = [line]
+        result = check_power_lines(40.0, -74.0, available_store)
         assert result.result == CheckResult.WARNING
         assert "345 kV" in result.details
         assert result.value == 164
 
-    def test_spatial_far_line_pass(self):
-        from spatial_data import FacilityRecord
+    def test_spatial_far_line_pass(self, available_store):
         line = FacilityRecord(
             facility_type="hifld", name="115 kV - NYSEG",
             lat=40.0, lng=-74.0,
             distance_meters=90.0, distance_feet=295.0,
             metadata={"voltage": 115, "volt_class": "100-161"},
         )
-        store = MagicMock()
-        store.is_available.return_value = True
-        store.lines_within.return_value = [line]
-        result = check_power_lines(40.0, -74.0, store)
+        available_store.lines_within.return_value = [line]
+        result = check_power_lines(40.0, -74.0, available_store)
         assert result.result == CheckResult.PASS
 
 
@@ -714,66 +682,53 @@ class TestCheckCellTowers:
 class TestCheckIndustrialZones:
     """Tests for check_industrial_zones — TRI spatial data primary, Overpass fallback."""
 
-    def _make_unavailable_store(self):
-        store = MagicMock()
-        store.is_available.return_value = False
-        return store
-
     # --- Overpass fallback (spatial unavailable) ---
 
-    def test_none_hazard_results_unknown(self):
-        result = check_industrial_zones(40.0, -74.0, self._make_unavailable_store(), None)
+    def test_none_hazard_results_unknown(self, unavailable_store):
+        result = check_industrial_zones(40.0, -74.0, unavailable_store, None)
         assert result.result == CheckResult.UNKNOWN
 
-    def test_no_zones_pass(self):
+    def test_no_zones_pass(self, unavailable_store):
         hazards = {"industrial_zones": [], "_all_nodes": {}}
-        result = check_industrial_zones(40.0, -74.0, self._make_unavailable_store(), hazards)
+        result = check_industrial_zones(40.0, -74.0, unavailable_store, hazards)
         assert result.result == CheckResult.PASS
 
-    def test_close_zone_warning(self):
+    def test_close_zone_warning(self, unavailable_store):
         zone = {"type": "node", "id": 1, "lat": 40.001, "lon": -74.0}
         hazards = {"industrial_zones": [zone], "_all_nodes": {}}
-        result = check_industrial_zones(40.0, -74.0, self._make_unavailable_store(), hazards)
+        result = check_industrial_zones(40.0, -74.0, unavailable_store, hazards)
         assert result.result == CheckResult.WARNING
 
     # --- TRI spatial data path ---
 
-    def test_spatial_no_facilities_pass(self):
-        store = MagicMock()
-        store.is_available.return_value = True
-        store.find_facilities_within.return_value = []
-        result = check_industrial_zones(40.0, -74.0, store)
+    def test_spatial_no_facilities_pass(self, available_store):
+        available_store.find_facilities_within.return_value = []
+        result = check_industrial_zones(40.0, -74.0, available_store)
         assert result.result == CheckResult.PASS
-        store.find_facilities_within.assert_called_once_with(40.0, -74.0, 200, "tri")
+        available_store.find_facilities_within.assert_called_once_with(40.0, -74.0, 200, "tri")
 
-    def test_spatial_close_facility_warning(self):
-        from spatial_data import FacilityRecord
+    def test_spatial_close_facility_warning(self, available_store):
         facility = FacilityRecord(
             facility_type="tri", name="Chemical Corp",
             lat=40.0, lng=-74.0,
             distance_meters=100.0, distance_feet=328.0,
             metadata={"industry_sector": "Chemical Manufacturing", "total_releases_lb": 5000},
         )
-        store = MagicMock()
-        store.is_available.return_value = True
-        store.find_facilities_within.return_value = [facility]
-        result = check_industrial_zones(40.0, -74.0, store)
+        available_store.find_facilities_within.return_value = [facility]
+        result = check_industrial_zones(40.0, -74.0, available_store)
         assert result.result == CheckResult.WARNING
         assert "Chemical Manufacturing" in result.details
         assert result.value == 328
 
-    def test_spatial_far_facility_pass(self):
-        from spatial_data import FacilityRecord
+    def test_spatial_far_facility_pass(self, available_store):
         facility = FacilityRecord(
             facility_type="tri", name="Far Factory",
             lat=40.01, lng=-74.0,
             distance_meters=180.0, distance_feet=590.0,
             metadata={"industry_sector": "Paper Manufacturing"},
         )
-        store = MagicMock()
-        store.is_available.return_value = True
-        store.find_facilities_within.return_value = [facility]
-        result = check_industrial_zones(40.0, -74.0, store)
+        available_store.find_facilities_within.return_value = [facility]
+        result = check_industrial_zones(40.0, -74.0, available_store)
         assert result.result == CheckResult.PASS
 
 
@@ -782,27 +737,22 @@ class TestCheckIndustrialZones:
 # ============================================================================
 
 class TestCheckSuperfundNpl:
-    def test_unavailable_store_returns_unknown(self):
+    def test_unavailable_store_returns_unknown(self, unavailable_store):
         with patch("property_evaluator.SpatialDataStore") as mock_store_cls:
-            mock_store = MagicMock()
-            mock_store.is_available.return_value = False
-            mock_store_cls.return_value = mock_store
+            mock_store_cls.return_value = unavailable_store
             result = check_superfund_npl(40.0, -74.0)
         assert result.result == CheckResult.UNKNOWN
         assert result.name == "Superfund (NPL)"
 
-    def test_empty_polygons_returns_pass(self):
+    def test_empty_polygons_returns_pass(self, available_store):
         """SEMS is a national dataset — empty results means no Superfund site."""
         with patch("property_evaluator.SpatialDataStore") as mock_store_cls:
-            mock_store = MagicMock()
-            mock_store.is_available.return_value = True
-            mock_store.point_in_polygons.return_value = []
-            mock_store_cls.return_value = mock_store
+            available_store.point_in_polygons.return_value = []
+            mock_store_cls.return_value = available_store
             result = check_superfund_npl(40.0, -74.0)
         assert result.result == CheckResult.PASS
 
-    def test_npl_final_site_returns_fail(self):
-        from spatial_data import FacilityRecord
+    def test_npl_final_site_returns_fail(self, available_store):
 
         npl_record = FacilityRecord(
             facility_type="sems",
@@ -814,17 +764,14 @@ class TestCheckSuperfundNpl:
             metadata={"npl_status_code": "F", "site_name": "Gowanus Canal"},
         )
         with patch("property_evaluator.SpatialDataStore") as mock_store_cls:
-            mock_store = MagicMock()
-            mock_store.is_available.return_value = True
-            mock_store.point_in_polygons.return_value = [npl_record]
-            mock_store_cls.return_value = mock_store
+            available_store.point_in_polygons.return_value = [npl_record]
+            mock_store_cls.return_value = available_store
             result = check_superfund_npl(40.0, -74.0)
         assert result.result == CheckResult.FAIL
         assert "Gowanus Canal" in result.details
         assert result.required is True
 
-    def test_npl_proposed_site_returns_fail(self):
-        from spatial_data import FacilityRecord
+    def test_npl_proposed_site_returns_fail(self, available_store):
 
         npl_record = FacilityRecord(
             facility_type="sems",
@@ -836,15 +783,12 @@ class TestCheckSuperfundNpl:
             metadata={"npl_status_code": "P", "site_name": "Proposed NPL Site"},
         )
         with patch("property_evaluator.SpatialDataStore") as mock_store_cls:
-            mock_store = MagicMock()
-            mock_store.is_available.return_value = True
-            mock_store.point_in_polygons.return_value = [npl_record]
-            mock_store_cls.return_value = mock_store
+            available_store.point_in_polygons.return_value = [npl_record]
+            mock_store_cls.return_value = available_store
             result = check_superfund_npl(40.0, -74.0)
         assert result.result == CheckResult.FAIL
 
-    def test_non_npl_polygon_returns_pass(self):
-        from spatial_data import FacilityRecord
+    def test_non_npl_polygon_returns_pass(self, available_store):
 
         non_npl_record = FacilityRecord(
             facility_type="sems",
@@ -856,10 +800,8 @@ class TestCheckSuperfundNpl:
             metadata={"npl_status_code": "N", "site_name": "Not on NPL"},
         )
         with patch("property_evaluator.SpatialDataStore") as mock_store_cls:
-            mock_store = MagicMock()
-            mock_store.is_available.return_value = True
-            mock_store.point_in_polygons.return_value = [non_npl_record]
-            mock_store_cls.return_value = mock_store
+            available_store.point_in_polygons.return_value = [non_npl_record]
+            mock_store_cls.return_value = available_store
             result = check_superfund_npl(40.0, -74.0)
         assert result.result == CheckResult.PASS
         assert "Not within" in result.details
@@ -870,10 +812,8 @@ class TestCheckSuperfundNpl:
 # ============================================================================
 
 class TestCheckTriFacilityProximity:
-    def test_unavailable_store_returns_unknown(self):
-        mock_store = MagicMock()
-        mock_store.is_available.return_value = False
-        result = check_tri_facility_proximity(40.0, -74.0, mock_store)
+    def test_unavailable_store_returns_unknown(self, unavailable_store):
+        result = check_tri_facility_proximity(40.0, -74.0, unavailable_store)
         assert result.result == CheckResult.UNKNOWN
         assert result.name == "TRI facility"
 
@@ -881,27 +821,22 @@ class TestCheckTriFacilityProximity:
         result = check_tri_facility_proximity(40.0, -74.0, None)
         assert result.result == CheckResult.UNKNOWN
 
-    def test_no_facilities_returns_pass(self):
-        mock_store = MagicMock()
-        mock_store.is_available.return_value = True
-        mock_store.find_facilities_within.return_value = []
-        mock_store.last_query_failed.return_value = False
-        result = check_tri_facility_proximity(40.0, -74.0, mock_store)
+    def test_no_facilities_returns_pass(self, available_store):
+        available_store.find_facilities_within.return_value = []
+        available_store.last_query_failed.return_value = False
+        result = check_tri_facility_proximity(40.0, -74.0, available_store)
         assert result.result == CheckResult.PASS
         assert "No EPA TRI facilities" in result.details
         assert result.required is False
 
-    def test_query_failure_returns_unknown(self):
-        mock_store = MagicMock()
-        mock_store.is_available.return_value = True
-        mock_store.find_facilities_within.return_value = []
-        mock_store.last_query_failed.return_value = True
-        result = check_tri_facility_proximity(40.0, -74.0, mock_store)
+    def test_query_failure_returns_unknown(self, available_store):
+        available_store.find_facilities_within.return_value = []
+        available_store.last_query_failed.return_value = True
+        result = check_tri_facility_proximity(40.0, -74.0, available_store)
         assert result.result == CheckResult.UNKNOWN
         assert "check skipped" in result.details
 
-    def test_nearby_facility_returns_warning(self):
-        from spatial_data import FacilityRecord
+    def test_nearby_facility_returns_warning(self, available_store):
 
         facility = FacilityRecord(
             facility_type="tri",
@@ -915,18 +850,15 @@ class TestCheckTriFacilityProximity:
                 "total_releases_lb": 15000,
             },
         )
-        mock_store = MagicMock()
-        mock_store.is_available.return_value = True
-        mock_store.find_facilities_within.return_value = [facility]
-        result = check_tri_facility_proximity(40.0, -74.0, mock_store)
+        available_store.find_facilities_within.return_value = [facility]
+        result = check_tri_facility_proximity(40.0, -74.0, available_store)
         assert result.result == CheckResult.WARNING
         assert "ACME Chemical Plant" in result.details
         assert "Chemicals" in result.details
         assert result.value == 2625
         assert result.required is False
 
-    def test_multiple_facilities_shows_count(self):
-        from spatial_data import FacilityRecord
+    def test_multiple_facilities_shows_count(self, available_store):
 
         facilities = [
             FacilityRecord(
@@ -948,26 +880,20 @@ class TestCheckTriFacilityProximity:
                 metadata={"industry_sector": "Petroleum"},
             ),
         ]
-        mock_store = MagicMock()
-        mock_store.is_available.return_value = True
-        mock_store.find_facilities_within.return_value = facilities
-        result = check_tri_facility_proximity(40.0, -74.0, mock_store)
+        available_store.find_facilities_within.return_value = facilities
+        result = check_tri_facility_proximity(40.0, -74.0, available_store)
         assert result.result == CheckResult.WARNING
         assert "2 TRI facilities" in result.details
 
-    def test_exception_returns_unknown(self):
-        mock_store = MagicMock()
-        mock_store.is_available.return_value = True
-        mock_store.find_facilities_within.side_effect = RuntimeError("DB error")
-        result = check_tri_facility_proximity(40.0, -74.0, mock_store)
+    def test_exception_returns_unknown(self, available_store):
+        available_store.find_facilities_within.side_effect = RuntimeError("DB error")
+        result = check_tri_facility_proximity(40.0, -74.0, available_store)
         assert result.result == CheckResult.UNKNOWN
 
-    def test_queries_correct_radius_and_type(self):
-        mock_store = MagicMock()
-        mock_store.is_available.return_value = True
-        mock_store.find_facilities_within.return_value = []
-        check_tri_facility_proximity(40.0, -74.0, mock_store)
-        mock_store.find_facilities_within.assert_called_once_with(40.0, -74.0, TRI_FACILITY_WARNING_RADIUS_M, "tri")
+    def test_queries_correct_radius_and_type(self, available_store):
+        available_store.find_facilities_within.return_value = []
+        check_tri_facility_proximity(40.0, -74.0, available_store)
+        available_store.find_facilities_within.assert_called_once_with(40.0, -74.0, TRI_FACILITY_WARNING_RADIUS_M, "tri")
 
 
 # ============================================================================
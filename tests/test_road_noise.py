@@ -4,11 +4,13 @@ Tests cover: haversine distance, nearest-point geometry, noise estimation,
 severity classification, Overpass data parsing, and the main assessment flow.
 """
 
+import dataclasses
 import math
 from unittest.mock import patch
 
 import pytest
 
+import road_noise
 from road_noise import (
     _haversine_ft,
     _nearest_point_on_segment,
@@ -113,6 +115,37 @@ class TestNearestDistanceToRoadFt:
         assert dist > 0
         assert dist < 1000  # Should be close (within ~300ft)
 
+    def test_long_road_matches_segment_loop(self, monkeypatch):
+        # Enough nodes to take the NumPy path; includes a repeated node
+        nodes = [(41.0 + i * 0.0001, -73.0 + (i % 3) * 0.0001) for i in range(60)]
+        nodes.insert(30, nodes[30])
+        road = RoadSegment("", "", "primary", 2, nodes)
+        vectorized = _nearest_distance_to_road_ft(41.002, -73.002, road)
+        monkeypatch.setattr(road_noise, "_VECTORIZE_MIN_NODES", len(nodes) + 1)
+        assert vectorized == pytest.approx(_nearest_distance_to_road_ft(41.002, -73.002, road))
+
+    def test_diagonal_road_at_high_latitude(self):
+        # At 60°N a degree of longitude is half a degree of latitude; the
+        # nearest foot must account for that.
+        a, b = (60.0, 0.0), (60.01, 0.02)
+        road = RoadSegment("", "", "primary", 2, [a, b])
+        samples = (
+            _haversine_ft(60.0, 0.01, a[0] + f * (b[0] - a[0]), a[1] + f * (b[1] - a[1]))
+            for f in (i / 10000 for i in range(10001))
+        )
+        assert _nearest_distance_to_road_ft(60.0, 0.01, road) == pytest.approx(min(samples), abs=1.0)
+
+    def test_single_node_road_is_infinite(self):
+        road = RoadSegment("", "", "primary", 2, [(41.0, -73.0)])
+        assert _nearest_distance_to_road_ft(41.0, -73.0, road) == float("inf")
+
+    def test_geometry_cannot_drift_from_arrays(self):
+        road = RoadSegment("", "", "primary", 2, [(41.0, -73.0), (41.001, -73.0)])
+        assert road.nodes == ((41.0, -73.0), (41.001, -73.0))
+        assert road.lats.tolist() == [41.0, 41.001]
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            road.nodes = ((0.0, 0.0), (1.0, 1.0))
+
 
 # =========================================================================
 # Noise estimation
@@ -224,6 +257,8 @@ class TestParseRoadsWithGeometry:
         assert roads[0].highway_type == "primary"
         assert roads[0].lanes == 4
         assert len(roads[0].nodes) == 2
+        assert roads[0].lats.tolist() == [41.0, 41.001]
+        assert roads[0].lngs.tolist() == [-73.0, -73.0]
 
     def test_skips_unknown_highway_types(self):
         data = {
@@ -318,3 +353,20 @@ class TestAssessRoadNoise:
     @patch("road_noise.fetch_all_roads", return_value=[])
     def test_no_roads_returns_none(self, mock_fetch):
         assert assess_road_noise(41.0, -73.0) is None
+
+    @patch("road_noise.fetch_all_roads")
+    def test_quieter_roads_skip_geometry_scan(self, mock_fetch):
+        """Roads whose 50 ft level can't beat the current worst aren't measured."""
+        motorway = RoadSegment("I-87", "", "motorway", 2, [(41.0, -73.0), (41.001, -73.0)])
+        residential = RoadSegment("Elm St", "", "residential", 2, [(41.0, -73.0), (41.0, -73.001)])
+        mock_fetch.return_value = [motorway, residential]
+
+        with patch(
+            "road_noise._nearest_distance_to_road_ft",
+            wraps=road_noise._nearest_distance_to_road_ft,
+        ) as mock_dist:
+            result = assess_road_noise(41.0, -73.0)
+
+        assert mock_dist.call_count == 1
+        assert result.worst_road_name == "I-87"
+        assert result.all_roads_assessed == 2
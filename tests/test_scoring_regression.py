@@ -9,12 +9,14 @@ Validates:
   - Score band classification
 """
 
+import numpy as np
 import pytest
 from scoring_config import (
     SCORING_MODEL,
     PiecewiseKnot,
     DimensionResult,
     apply_piecewise,
+    apply_piecewise_batch,
     apply_quality_multiplier,
 )
 from property_evaluator import get_score_band, SCORE_BANDS, Tier2Score
@@ -34,6 +36,13 @@ class TestApplyPiecewise:
         PiecewiseKnot(30, 0),
     )
 
+    STEP_KNOTS = (
+        PiecewiseKnot(0, 0),
+        PiecewiseKnot(10, 0),
+        PiecewiseKnot(10, 5),
+        PiecewiseKnot(20, 5),
+    )
+
     def test_exact_first_knot(self):
         assert apply_piecewise(self.SIMPLE_KNOTS, 0) == 10
 
@@ -73,6 +82,37 @@ class TestApplyPiecewise:
         with pytest.raises(ValueError, match="knots must not be empty"):
             apply_piecewise((), 5)
 
+    def test_step_uses_lower_segment_at_shared_x(self):
+        assert apply_piecewise(self.STEP_KNOTS, 10) == 0
+        assert apply_piecewise(self.STEP_KNOTS, 10.5) == 5
+
+    @pytest.mark.parametrize("knots", [
+        pytest.param(SIMPLE_KNOTS, id="simple"),
+        pytest.param(STEP_KNOTS, id="step"),
+        pytest.param(SCORING_MODEL.coffee.knots, id="coffee"),
+    ])
+    def test_batch_matches_scalar(self, knots):
+        xs = np.array([-10, 0, 2, 9.5, 10, 10.5, 12.5, 15, 20, 25, 30, 47, 60, 100])
+        expected = [apply_piecewise(knots, x) for x in xs]
+        np.testing.assert_array_equal(apply_piecewise_batch(knots, xs), expected)
+
+    def test_knot_cache_is_bounded(self):
+        import scoring_config
+        for i in range(2 * scoring_config._KNOT_CACHE_SIZE):
+            knots = (PiecewiseKnot(0, i), PiecewiseKnot(10, 0))
+            assert apply_piecewise(knots, 5) == pytest.approx(i / 2)
+        assert len(scoring_config._KNOT_TABLES) <= scoring_config._KNOT_CACHE_SIZE
+
+    def test_batch_single_knot(self):
+        single = (PiecewiseKnot(5, 7),)
+        np.testing.assert_array_equal(
+            apply_piecewise_batch(single, [0, 5, 99]), [7, 7, 7],
+        )
+
+    def test_batch_empty_knots_raises(self):
+        with pytest.raises(ValueError, match="knots must not be empty"):
+            apply_piecewise_batch((), np.arange(3))
+
 
 # =============================================================================
 # apply_quality_multiplier() unit tests
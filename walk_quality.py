@@ -252,9 +252,9 @@ def _gsv_metadata(lat: float, lng: float, api_key: str) -> Optional[dict]:
         "key": api_key,
     }
     try:
-        t0 = time.time()
+        t0 = time.monotonic()
         resp = requests.get(url, params=params, timeout=API_TIMEOUT)
-        elapsed = int((time.time() - t0) * 1000)
+        elapsed = int((time.monotonic() - t0) * 1000)
         data = resp.json()
 
         from nc_trace import get_trace
@@ -288,9 +288,9 @@ def _gsv_image(lat: float, lng: float, heading: int,
         "key": api_key,
     }
     try:
-        t0 = time.time()
+        t0 = time.monotonic()
         resp = requests.get(url, params=params, timeout=API_TIMEOUT)
-        elapsed = int((time.time() - t0) * 1000)
+        elapsed = int((time.monotonic() - t0) * 1000)
 
         from nc_trace import get_trace
         trace = get_trace()
@@ -810,7 +810,7 @@ def assess_walk_quality(
     Returns:
         WalkQualityAssessment or None on complete failure.
     """
-    t0 = time.time()
+    t0 = time.monotonic()
 
     # 1. Generate sample points
     sample_specs = _generate_sample_points(lat, lng)
@@ -900,7 +900,7 @@ def assess_walk_quality(
     # 7. Walk Score comparison
     comparison = _walk_score_comparison(overall_score, walk_score)
 
-    elapsed = time.time() - t0
+    elapsed = time.monotonic() - t0
     logger.info(
         "Walk quality assessment: score=%d rating=%s confidence=%s (%.1fs)",
         overall_score, _walk_quality_rating(overall_score), confidence, elapsed,
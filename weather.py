@@ -113,7 +113,7 @@ def _fetch_daily_data(lat: float, lng: float) -> Optional[dict]:
     Returns the raw JSON response dict, or None on failure.
     """
     trace = get_trace()
-    t0 = time.time()
+    t0 = time.monotonic()
 
     # Date range: 10 full calendar years ending last year
     import datetime as dt
@@ -135,7 +135,7 @@ def _fetch_daily_data(lat: float, lng: float) -> Optional[dict]:
 
     try:
         resp = requests.get(_API_BASE, params=params, timeout=_API_TIMEOUT)
-        elapsed_ms = (time.time() - t0) * 1000
+        elapsed_ms = (time.monotonic() - t0) * 1000
 
         if trace:
             trace.record_api_call(
@@ -163,7 +163,7 @@ def _fetch_daily_data(lat: float, lng: float) -> Optional[dict]:
 
     except requests.Timeout:
         logger.warning("Open-Meteo API timed out for (%.2f, %.2f)", lat, lng)
-        _elapsed_ms = int((time.time() - t0) * 1000)
+        _elapsed_ms = int((time.monotonic() - t0) * 1000)
         if trace:
             trace.record_api_call(
                 service="open_meteo",
@@ -185,7 +185,7 @@ def _fetch_daily_data(lat: float, lng: float) -> Optional[dict]:
         )
         try:
             from health_monitor import record_call
-            record_call("open_meteo", False, int((time.time() - t0) * 1000), "exception")
+            record_call("open_meteo", False, int((time.monotonic() - t0) * 1000), "exception")
         except Exception:
             pass
         return None